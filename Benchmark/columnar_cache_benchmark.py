@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+import sys
+import os
+main_folder_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, main_folder_path)
+
+import argparse
+import time
+import pandas as pd
+import utils
+import path
+
+
+'''
+Load time of the processed datasets: csv parsing (pd.read_csv) against the memory-mapped columnar binary copy
+(utils.read_processed_dataset). Missing or stale binary copies are written first.
+Both loads must give the same DataFrame, otherwise the benchmark stops with an error.
+'''
+
+
+def timed(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+# main
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark csv parsing against the columnar binary cache.')
+    parser.add_argument('--repeat', type=int, default=5, help='Repetitions, the best time is reported.')
+    args = parser.parse_args()
+
+    total_csv = total_binary = 0
+    print(f"{'dataset':<55} {'rows':>7} {'cols':>5} {'csv (ms)':>9} {'binary (ms)':>12} {'speed-up':>9}")
+    for dataset_name in utils.get_dataset_name_list(path.processed_dir):
+        if not utils.is_processed_binary_fresh(dataset_name):
+            if utils.save_processed_binary(dataset_name) is None:
+                sys.exit(1)
+        csv_df, csv_time = timed(lambda: pd.read_csv(path.processed_dir + dataset_name + '.csv'), args.repeat)
+        binary_df, binary_time = timed(lambda: utils.read_processed_dataset(dataset_name), args.repeat)
+        pd.testing.assert_frame_equal(binary_df, csv_df)
+        total_csv += csv_time
+        total_binary += binary_time
+        print(f"{dataset_name[:55]:<55} {csv_df.shape[0]:>7} {csv_df.shape[1]:>5} {csv_time * 1000:>9.2f} {binary_time * 1000:>12.2f} {csv_time / binary_time:>8.1f}x")
+    print(f"{'Total':<55} {'':>7} {'':>5} {total_csv * 1000:>9.2f} {total_binary * 1000:>12.2f} {total_csv / total_binary:>8.1f}x")
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+import sys
+import os
+main_folder_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, main_folder_path)
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from scipy.stats import chi2_contingency
+import contingency_table
+
+
+'''
+Benchmark of the integer-coded contingency tables (contingency_table.factorize_columns, one np.bincount per pair and
+contingency_table.chi_square_tests over all pairs) against the former per-pair path (pd.crosstab, np.outer expected
+frequencies and chi2_contingency) on a synthetic table of categorical columns.
+Columns have 2 to --max_categories categories, some depend on a latent category and some have missing values.
+The largest absolute difference between the chi-square p-values of both paths is reported (it must stay under 1e-10),
+as well as any pair where both paths disagree on the prerequisites.
+'''
+
+
+def make_synthetic_table(rows, cols, max_categories, seed):
+    rng = np.random.default_rng(seed)
+    latent = rng.integers(0, 4, rows)
+    columns = {}
+    for col in range(cols):
+        size = int(rng.integers(2, max_categories + 1))
+        values = np.where(rng.random(rows) < 0.3, latent % size, rng.integers(0, size, rows)).astype(float)
+        if col % 4 == 3:
+            values[rng.random(rows) < 0.05] = np.nan
+        columns[f'col_{col}'] = values
+    return pd.DataFrame(columns)
+
+
+def per_pair_chi_square(df, col1, col2):
+    observed = pd.crosstab(df[col1], df[col2])
+    expected = np.outer(observed.sum(axis=1), observed.sum(axis=0)) / observed.sum().sum()
+    if np.any(expected < 1) or np.sum(expected < 5) > 0.2 * expected.size:
+        return False, np.nan
+    return True, chi2_contingency(observed)[1]
+
+
+# main
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark integer-coded contingency tables against per-pair crosstab.')
+    parser.add_argument('--rows', type=int, default=100000, help='Rows of the synthetic table.')
+    parser.add_argument('--cols', type=int, default=40, help='Categorical columns of the synthetic table.')
+    parser.add_argument('--max_categories', type=int, default=8, help='Largest number of categories of a column.')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed.')
+    args = parser.parse_args()
+
+    df = make_synthetic_table(args.rows, args.cols, args.max_categories, args.seed)
+    columns = list(df.columns)
+    column_pairs = [(i, j) for i in range(len(columns)) for j in range(i + 1, len(columns))]
+    print(f"[i] Synthetic table: {args.rows} rows x {args.cols} columns, {len(column_pairs)} pairs")
+
+    start = time.perf_counter()
+    codes, sizes = contingency_table.factorize_columns(df, columns)
+    tables = [contingency_table.contingency_table(codes[:, i], codes[:, j], sizes[i], sizes[j]) for i, j in column_pairs]
+    applicable, p_values, _ = contingency_table.chi_square_tests(tables)
+    batch_time = time.perf_counter() - start
+    print(f"[+] Integer-coded path: {batch_time:.2f}s, {int(applicable.sum())} pairs meet the chi-square prerequisites")
+
+    start = time.perf_counter()
+    results = [per_pair_chi_square(df, columns[i], columns[j]) for i, j in column_pairs]
+    pair_time = time.perf_counter() - start
+    print(f"[+] Per-pair path: {pair_time:.2f}s")
+    print(f"[i] Speed-up: {pair_time / batch_time:.1f}x")
+
+    mismatches = sum(met != applicable[index] for index, (met, _) in enumerate(results))
+    max_diff = max([abs(p - p_values[index]) for index, (met, p) in enumerate(results) if met], default=0.0)
+    print(f"[i] Prerequisite mismatches: {mismatches}, max abs p-value difference: {max_diff:.2e}")
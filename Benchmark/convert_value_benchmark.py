@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+import sys
+import os
+main_folder_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, main_folder_path)
+sys.path.insert(0, os.path.join(main_folder_path, 'Construction'))
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+import utils
+import path
+from tabular_data_preprocess import convert_value, convert_column
+
+
+'''
+Throughput benchmark of the vectorized unit/suffix converters against the per-cell Series.apply path:
+- tabular_data_preprocess.convert_column vs series.apply(convert_value)
+- utils.process_special_cont_data vs series.apply(utils.convert_special_cont_value)
+Results of both paths must be identical (values and dtype), otherwise the benchmark stops with an error.
+'''
+
+
+# Mixed values covering suffixes, percentages, units, invalid text and values needing the per-cell fallback
+sample_values = ['1.5M', '20k', '$3.2K', '12.5%', 'abc%', '75kg', '180 cm', '$1.16 ', 'N/A', '', '1.2.3',
+                 ' 42 ', '7e3', 'inf', '1_000', '١٢', '5m2', '0.5 %', '-3%', '12,300', np.nan, 3.5]
+
+
+def timed(func, series, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(series)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def check_and_time(series, per_cell_func, vectorized_func, repeat):
+    expected, per_cell_time = timed(lambda s: s.apply(per_cell_func), series, repeat)
+    result, vectorized_time = timed(vectorized_func, series, repeat)
+    pd.testing.assert_series_equal(result, expected)
+    return per_cell_time, vectorized_time
+
+
+def report(title, rows):
+    print(f"### {title}")
+    print(f"{'column':<60} {'cells':>9} {'apply (Mcell/s)':>16} {'vectorized (Mcell/s)':>21} {'speed-up':>9}")
+    for name, cells, per_cell_time, vectorized_time in rows:
+        print(f"{name[:60]:<60} {cells:>9} {cells / per_cell_time / 1e6:>16.3f} {cells / vectorized_time / 1e6:>21.3f} {per_cell_time / vectorized_time:>8.1f}x")
+
+
+# main
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark vectorized unit/suffix parsing.')
+    parser.add_argument('--synthetic_rows', type=int, default=1000000, help='Rows of the synthetic mixed column.')
+    parser.add_argument('--repeat', type=int, default=3, help='Repetitions, the best time is reported.')
+    args = parser.parse_args()
+
+    converters = [('convert_value', convert_value, convert_column),
+                  ('process_special_cont_data', utils.convert_special_cont_value, utils.process_special_cont_data)]
+    for converter_name, per_cell_func, vectorized_func in converters:
+        rows = []
+        # All non-numeric columns of the origin datasets (e.g. Fruits and Vegetables Prices)
+        for dataset_name in sorted(utils.get_dataset_name_list(path.dataset_dir)):
+            df = pd.read_csv(path.dataset_dir + dataset_name + '.csv')
+            for col in df.columns:
+                if df[col].dtype == object:
+                    per_cell_time, vectorized_time = check_and_time(df[col], per_cell_func, vectorized_func, args.repeat)
+                    rows.append((f"{dataset_name}: {col}", len(df), per_cell_time, vectorized_time))
+        # Large synthetic column
+        rng = np.random.default_rng(0)
+        synthetic = pd.Series(rng.choice(np.array(sample_values, dtype=object), size=args.synthetic_rows), name='synthetic')
+        per_cell_time, vectorized_time = check_and_time(synthetic, per_cell_func, vectorized_func, args.repeat)
+        rows.append(('synthetic mixed column', len(synthetic), per_cell_time, vectorized_time))
+        total_cells = sum(row[1] for row in rows)
+        rows.append(('TOTAL', total_cells, sum(row[2] for row in rows), sum(row[3] for row in rows)))
+        report(converter_name, rows)
+    print('[+] Vectorized results are identical to the per-cell path.')
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+import sys
+import os
+main_folder_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, main_folder_path)
+
+import argparse
+import time
+import numpy as np
+import utils
+import column_profile
+import correlation_matrix
+
+
+'''
+Benchmark of the screening mode of the correlation extraction against the exhaustive mode, on a wide table.
+Exhaustive: Pearson, Spearman, partial correlation and Kendall of every pair. Screening: candidate pairs screened
+with matrix products (correlation_matrix.screened_pairs), then the same exact coefficients on the candidates and a
+random sample of the other pairs. For every screening threshold, the recall of the strongly correlated pairs of the
+exhaustive mode (any coefficient above 0.5 in absolute value, as correlation_info_extraction), the share of pairs
+computed exactly and the wall-clock times are reported.
+The synthetic table has quant columns driven by a few latent factors (sparse loadings) plus noise, heavy-tailed
+for some columns and with missing values in others; --datasets uses processed datasets instead.
+'''
+
+
+def make_synthetic_table(rows, cols, factors, seed):
+    rng = np.random.default_rng(seed)
+    latent = rng.normal(size=(rows, factors))
+    loadings = rng.normal(size=(factors, cols)) * (rng.random((factors, cols)) < 2.0 / factors) * 1.5
+    X = latent @ loadings + rng.normal(size=(rows, cols))
+    X[:, ::3] = np.exp(X[:, ::3] / 2)  # Monotone transform: Spearman / Kendall stronger than Pearson
+    for col in range(1, cols, 4):
+        X[rng.random(rows) < 0.1, col] = np.nan
+    return X
+
+
+# Pairs recorded as strongly correlated by correlation_info_extraction, from the exact coefficients
+def strong_pairs(matrices, kendall, rows):
+    with np.errstate(invalid='ignore'):
+        strong = np.abs(kendall) > 0.5
+        if rows >= 50:
+            strong |= (np.abs(matrices['pearson']) > 0.5) | (np.abs(matrices['spearman']) > 0.5) | (np.abs(matrices['pcorr']) > 0.5)
+    return np.triu(strong & matrices['valid'], 1)
+
+
+def extract(X, pairs=None, precomputed=None):
+    matrices = correlation_matrix.pairwise_correlation_matrices(X, pairs=pairs, precomputed=precomputed)
+    kendall = correlation_matrix.pairwise_kendall_tau(X, pairs=matrices['valid'])
+    return strong_pairs(matrices, kendall, len(X)), matrices['valid']
+
+
+def benchmark(name, X, thresholds, sample_size):
+    k = X.shape[1]
+    start = time.perf_counter()
+    reference, valid = extract(X)
+    exhaustive_time = time.perf_counter() - start
+    print(f"[i] {name}: {X.shape[0]} rows, {k} quant columns, {np.triu(valid, 1).sum()} valid pairs, "
+          f"{reference.sum()} strongly correlated, exhaustive {exhaustive_time:.2f}s")
+    print(f"{'threshold':>10} {'candidates':>11} {'computed':>9} {'recall':>8} {'wall-clock (s)':>15} {'speed-up':>9}")
+    for threshold in thresholds:
+        start = time.perf_counter()
+        selected, candidates, precomputed = correlation_matrix.screened_pairs(X, threshold=threshold, sample_size=sample_size)
+        found, computed = extract(X, pairs=selected, precomputed=precomputed)
+        seconds = time.perf_counter() - start
+        recall = (found & reference).sum() / reference.sum() if reference.sum() else 1.0
+        print(f"{threshold:>10.2f} {np.triu(candidates, 1).sum():>11} {np.triu(computed, 1).sum() / max(np.triu(valid, 1).sum(), 1):>9.1%} "
+              f"{recall:>8.2%} {seconds:>15.2f} {exhaustive_time / seconds:>8.2f}x")
+
+
+# main
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the screening mode of the correlation extraction against the exhaustive mode.')
+    parser.add_argument('--rows', type=int, default=2000, help='Rows of the synthetic table.')
+    parser.add_argument('--cols', type=int, default=300, help='Quant columns of the synthetic table.')
+    parser.add_argument('--factors', type=int, default=30, help='Latent factors of the synthetic table.')
+    parser.add_argument('--thresholds', type=float, nargs='*', default=[0.1, 0.2, 0.25, 0.3, 0.4], help='Screening thresholds to test.')
+    parser.add_argument('--sample_size', type=int, default=200, help='Non-candidate pairs sampled in screening mode.')
+    parser.add_argument('--datasets', nargs='*', default=None, help='Processed datasets to use instead of the synthetic table.')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed.')
+    args = parser.parse_args()
+
+    tables = []
+    if args.datasets:
+        for dataset_name in args.datasets:
+            df = utils.load_processed_dataset(dataset_name)
+            profile = column_profile.get_column_profile(dataset_name)
+            columns = [col for col in df.columns if profile.at[col, 'data_type'] == 'quant']
+            tables.append((dataset_name, df[columns].to_numpy(dtype=float)))
+    else:
+        tables.append(('Synthetic table', make_synthetic_table(args.rows, args.cols, args.factors, args.seed)))
+    for name, X in tables:
+        benchmark(name, X, args.thresholds, args.sample_size)
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+import sys
+import os
+main_folder_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, main_folder_path)
+
+import argparse
+import glob
+import re
+import subprocess
+
+
+'''
+Import-time report of every entry point (scripts with a main block) of the repository.
+Each entry point is imported in a fresh interpreter started with '-X importtime', under a module name other than
+'__main__' so that its main block does not run. The self/cumulative times written by the interpreter are parsed, and
+the total import time of the entry point and its heaviest top-level imports are reported.
+An entry point importing for longer than the budget is marked 'OVER'; the exit status is 1 if any entry point is over budget.
+'''
+
+
+entry_point_dirs = ['', 'Construction', 'Extraction', 'Evaluation', 'Finetuning', 'Benchmark']
+main_block_pattern = re.compile(r'''^if\s+__name__\s*==\s*['"]__main__['"]\s*:''', re.MULTILINE)
+
+# Import an entry point from its file without running its main block
+loader_code = '''
+import sys, importlib.util
+sys.path.insert(0, {folder!r})
+spec = importlib.util.spec_from_file_location('entry_point', {file!r})
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+'''
+
+
+'''
+List the entry points (relative path) of the repository: python files with a main block
+'''
+def list_entry_points():
+    entry_points = []
+    for folder in entry_point_dirs:
+        for file_path in sorted(glob.glob(os.path.join(main_folder_path, folder, '*.py'))):
+            with open(file_path, encoding='utf-8', errors='ignore') as f:
+                if main_block_pattern.search(f.read()):
+                    entry_points.append(os.path.relpath(file_path, main_folder_path))
+    return entry_points
+
+
+'''
+Parse the output of '-X importtime'.
+Return a list of (module, self_us, cumulative_us, depth) in the order written by the interpreter.
+'''
+def parse_importtime(stderr: str):
+    records = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3:
+            continue
+        name = fields[2].rstrip()
+        # Nested imports are indented by 2 spaces per level
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        records.append((name.strip(), int(fields[0]), int(fields[1]), depth))
+    return records
+
+
+'''
+Import an entry point in a fresh interpreter with '-X importtime'.
+Return (total import time in ms, [(top-level module, cumulative ms)], error message or None).
+The entry point module itself is excluded from its own top-level imports.
+'''
+def measure_entry_point(entry_point: str):
+    file_path = os.path.join(main_folder_path, entry_point)
+    code = loader_code.format(folder=os.path.dirname(file_path), file=file_path)
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=main_folder_path,
+                             capture_output=True, text=True)
+    records = parse_importtime(process.stderr)
+    top_level = [(name, cumulative / 1000) for name, _, cumulative, depth in records if depth == 0]
+    total = sum(ms for _, ms in top_level)
+    error = None
+    if process.returncode != 0:
+        error_lines = [line for line in process.stderr.splitlines() if not line.startswith('import time:')]
+        error = error_lines[-1] if error_lines else f'exit status {process.returncode}'
+    return total, top_level, error
+
+
+# main
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Report the import time of every entry point.')
+    parser.add_argument('--entry', nargs='*', default=None, help='Entry points to measure (relative path), all by default.')
+    parser.add_argument('--budget_ms', type=float, default=1000, help='Import-time budget of an entry point in ms.')
+    parser.add_argument('--repeat', type=int, default=3, help='Repetitions, the best total is reported.')
+    parser.add_argument('--top', type=int, default=3, help='Number of heaviest top-level imports to show.')
+    args = parser.parse_args()
+
+    entry_points = args.entry if args.entry else list_entry_points()
+    over_budget = 0
+    print(f"{'entry point':<70} {'import (ms)':>12} {'status':>7}  heaviest imports (cumulative ms)")
+    for entry_point in entry_points:
+        best = None
+        for _ in range(max(args.repeat, 1)):
+            total, top_level, error = measure_entry_point(entry_point)
+            if best is None or total < best[0]:
+                best = (total, top_level, error)
+        total, top_level, error = best
+        heaviest = ', '.join(f'{name} {ms:.0f}' for name, ms in sorted(top_level, key=lambda item: -item[1])[:args.top])
+        if error is not None:
+            status = 'ERROR'
+            heaviest += f'  [{error}]'
+        elif total > args.budget_ms:
+            status = 'OVER'
+            over_budget += 1
+        else:
+            status = 'OK'
+        print(f"{entry_point[:70]:<70} {total:>12.1f} {status:>7}  {heaviest}")
+    if over_budget:
+        print(f"[!] {over_budget} entry point(s) over the budget of {args.budget_ms:.0f} ms.")
+        sys.exit(1)
+    print(f"[+] All measured entry points are within the budget of {args.budget_ms:.0f} ms.")
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+import sys
+import os
+main_folder_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, main_folder_path)
+
+import argparse
+import time
+import numpy as np
+import contingency_table
+import correlation_matrix
+import ks_comparison
+import variance_statistics
+
+
+'''
+Benchmark of the pair / triple kernels of the extractors on one wide table, with their pairs / triples sharded over
+worker processes (pair_sharding) against the serial run, as the number of workers grows.
+Synthetic quant columns are shifted / scaled positive normal samples (half of them rounded, some with missing values);
+binary columns depend on a latent binary variable. Every kernel reports its wall-clock time and speed-up per worker
+count, and whether its results are identical to the serial run (they must be: the blocks are merged in canonical
+order).
+'''
+
+
+def make_synthetic_tables(rows, quant_cols, binary_cols, seed):
+    rng = np.random.default_rng(seed)
+    X = 10 + rng.normal(size=(rows, quant_cols)) * rng.uniform(0.5, 2, quant_cols)
+    X[:, ::2] = np.round(X[:, ::2] * 10)
+    for col in range(1, quant_cols, 5):
+        X[rng.random(rows) < 0.05, col] = np.nan
+    latent = rng.random(rows) < 0.5
+    codes = np.where(rng.random((rows, binary_cols)) < 0.3, latent[:, None], rng.random((rows, binary_cols)) < 0.4).astype(np.int64)
+    return X, codes
+
+
+# Exact KS p-values are cached by sample sizes: every run starts cold (forked workers would inherit a warm cache)
+def ks_2samp_cold(samples, pairs, workers):
+    ks_comparison._exact_test.cache_clear()
+    return ks_comparison.pairwise_ks_2samp(samples, pairs, workers=workers)
+
+
+def identical(result, reference):
+    if isinstance(result, dict):
+        return all(identical(result[key], reference[key]) for key in reference)
+    if isinstance(result, tuple):
+        return all(identical(a, b) for a, b in zip(result, reference))
+    return np.array_equal(result, reference, equal_nan=True)
+
+
+# main
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the sharded pair / triple kernels against the serial run.')
+    parser.add_argument('--rows', type=int, default=2000, help='Rows of the synthetic table.')
+    parser.add_argument('--quant_cols', type=int, default=60, help='Quant columns (pairs for Kendall, KS and variance; triples for partial correlation).')
+    parser.add_argument('--binary_cols', type=int, default=40, help='Binary columns (triples for Mantel-Haenszel).')
+    parser.add_argument('--workers', type=int, nargs='*', default=[1, 2, 4], help='Worker counts to test (1: serial).')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed.')
+    args = parser.parse_args()
+
+    X, codes = make_synthetic_tables(args.rows, args.quant_cols, args.binary_cols, args.seed)
+    k, b = args.quant_cols, args.binary_cols
+    pairs = [(i, j) for i in range(k) for j in range(i + 1, k)]
+    partial_triples = [(j, l, i) for i in range(k) for j in range(i + 1, k) for l in range(k) if l != i and l != j]
+    binary_triples = [(i, j, l) for i in range(b) for j in range(i + 1, b) for l in range(j + 1, b)]
+    kernels = [
+        ('Kendall tau', len(pairs), lambda workers: correlation_matrix.pairwise_kendall_tau(X, workers=workers)),
+        ('Partial correlation', len(partial_triples), lambda workers: correlation_matrix.partial_correlation_triples(X, partial_triples, workers=workers)),
+        ('KS 2-sample', len(pairs), lambda workers: ks_2samp_cold([X[:, col] for col in range(k)], pairs, workers)),
+        ('Variance tests', len(pairs), lambda workers: variance_statistics.pairwise_variance_tests(X, pairs, workers=workers)),
+        ('Mantel-Haenszel', len(binary_triples), lambda workers: contingency_table.stratified_tables(codes, binary_triples, workers=workers)),
+    ]
+    print(f"[i] Synthetic table: {args.rows} rows, {k} quant and {b} binary columns; CPUs: {os.cpu_count()}")
+    print(f"{'kernel':>20} {'items':>7} {'workers':>7} {'wall-clock (s)':>15} {'speed-up':>9} {'identical':>10}")
+    for name, items, kernel in kernels:
+        start = time.perf_counter()
+        reference = kernel(1)
+        serial_time = time.perf_counter() - start
+        print(f"{name:>20} {items:>7} {1:>7} {serial_time:>15.2f} {1.0:>8.2f}x {'-':>10}")
+        for workers in args.workers:
+            if workers <= 1:
+                continue
+            start = time.perf_counter()
+            result = kernel(workers)
+            seconds = time.perf_counter() - start
+            print(f"{name:>20} {items:>7} {workers:>7} {seconds:>15.2f} {serial_time / seconds:>8.2f}x {str(identical(result, reference)):>10}")
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+import sys
+import os
+main_folder_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, main_folder_path)
+sys.path.insert(0, os.path.join(main_folder_path, 'Extraction'))
+
+import argparse
+import filecmp
+import shutil
+import tempfile
+import time
+import path
+import info_extraction
+
+
+'''
+Benchmark of the parallel extraction (info_extraction.run_extraction with a pool of worker processes) against the
+serial run, as the number of workers grows.
+Every run writes into its own temporary output folder; an untimed serial run first warms the caches (processed
+binaries, normality cache) so that all the timed runs start from the same state. The wall-clock time and speed-up of
+every run are reported, and its output files are compared byte for byte with the serial run (they must be identical:
+the frames are written by the parent process in dataset order).
+Run from the repository root, after Construction/tabular_data_preprocess.py.
+'''
+
+
+def run(workers, plugin_names, dataset_names, output_dir):
+    os.makedirs(output_dir, exist_ok=True)
+    path.info_dir = output_dir + '/'
+    start = time.perf_counter()
+    info_extraction.run_extraction(plugin_names=plugin_names, dataset_names=dataset_names, workers=workers)
+    return time.perf_counter() - start
+
+
+def same_outputs(reference_dir, output_dir):
+    reference_files = sorted(os.listdir(reference_dir))
+    if reference_files != sorted(os.listdir(output_dir)):
+        return False
+    _, mismatch, errors = filecmp.cmpfiles(reference_dir, output_dir, reference_files, shallow=False)
+    return not mismatch and not errors
+
+
+# main
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark parallel extraction across datasets against the serial run.')
+    parser.add_argument('--workers', type=int, nargs='*', default=[1, 2, 4], help='Worker counts to test (1: serial).')
+    parser.add_argument('--plugins', nargs='*', default=None, help='Plugins to run (default: all).')
+    parser.add_argument('--datasets', nargs='*', default=None, help='Datasets to extract (default: all processed datasets).')
+    args = parser.parse_args()
+
+    info_dir = path.info_dir
+    temp_dir = tempfile.mkdtemp(prefix='parallel_extraction_')
+    try:
+        run(1, args.plugins, args.datasets, os.path.join(temp_dir, 'warm_up'))
+        serial_time = run(1, args.plugins, args.datasets, os.path.join(temp_dir, 'serial'))
+        print(f"[i] CPUs: {os.cpu_count()}")
+        print(f"{'workers':>7} {'wall-clock (s)':>15} {'speed-up':>9} {'identical':>10}")
+        print(f"{1:>7} {serial_time:>15.2f} {1.0:>8.2f}x {'-':>10}")
+        for workers in args.workers:
+            if workers <= 1:
+                continue
+            output_dir = os.path.join(temp_dir, f'workers_{workers}')
+            seconds = run(workers, args.plugins, args.datasets, output_dir)
+            identical = same_outputs(os.path.join(temp_dir, 'serial'), output_dir)
+            print(f"{workers:>7} {seconds:>15.2f} {serial_time / seconds:>8.2f}x {str(identical):>10}")
+    finally:
+        path.info_dir = info_dir
+        shutil.rmtree(temp_dir)
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+import sys
+import os
+main_folder_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, main_folder_path)
+
+import argparse
+import time
+import warnings
+import numpy as np
+import pandas as pd
+import correlation_matrix
+
+
+'''
+Benchmark of the batched partial correlation (correlation_matrix.partial_correlation_triples and correlation_pvalues)
+against the former per-triple pingouin.partial_corr calls, on a synthetic table (50 columns by default).
+Every (col1, col2, control) triple of the partial correlation extraction is computed. The pingouin path is timed on
+a random sample of triples and extrapolated; the largest absolute differences of r and p-value on the sampled triples
+and the number of triples whose |r| > 0.5 partition differs are reported.
+'''
+
+
+def make_synthetic_table(rows, cols, missing_columns, seed):
+    rng = np.random.default_rng(seed)
+    factors = rng.normal(size=(rows, 4))
+    X = factors @ (rng.normal(size=(4, cols)) * (rng.random((4, cols)) < 0.4)) + rng.normal(size=(rows, cols))
+    X = X * rng.uniform(0.1, 100, cols)
+    for col in rng.choice(cols, missing_columns, replace=False):
+        X[rng.random(rows) < 0.05, col] = np.nan
+    return X
+
+
+# main
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark batched partial correlation against per-triple pingouin calls.')
+    parser.add_argument('--rows', type=int, default=5000, help='Rows of the synthetic table.')
+    parser.add_argument('--cols', type=int, default=50, help='Columns of the synthetic table.')
+    parser.add_argument('--missing_columns', type=int, default=5, help='Columns with missing values.')
+    parser.add_argument('--sample_triples', type=int, default=500, help='Triples timed with pingouin.')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed.')
+    args = parser.parse_args()
+    import pingouin as pg
+
+    X = make_synthetic_table(args.rows, args.cols, args.missing_columns, args.seed)
+    df = pd.DataFrame(X, columns=[f'col_{i}' for i in range(args.cols)])
+    triples = np.array([(j, k, i) for i in range(args.cols) for j in range(i + 1, args.cols)
+                        for k in range(args.cols) if k != i and k != j])
+    print(f"[i] Synthetic table: {args.rows} rows x {args.cols} columns, {len(triples)} triples")
+
+    start = time.perf_counter()
+    r, count = correlation_matrix.partial_correlation_triples(X, triples)
+    p_values = correlation_matrix.correlation_pvalues(r, count, covariates=1)
+    batched_time = time.perf_counter() - start
+    print(f"[+] Batched path: {batched_time:.2f}s for all triples")
+
+    rng = np.random.default_rng(args.seed)
+    sample = rng.choice(len(triples), min(args.sample_triples, len(triples)), replace=False)
+    max_r_diff = max_p_diff = 0.0
+    partition_diff = 0
+    start = time.perf_counter()
+    results = []
+    for index in sample:
+        x, y, control = triples[index]
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            results.append(pg.partial_corr(data=df, x=df.columns[x], y=df.columns[y], covar=df.columns[control]))
+    pingouin_time = (time.perf_counter() - start) / len(sample) * len(triples)
+    for index, result in zip(sample, results):
+        max_r_diff = max(max_r_diff, abs(result['r'].values[0] - r[index]))
+        max_p_diff = max(max_p_diff, abs(result['p-val'].values[0] - p_values[index]))
+        partition_diff += (abs(result['r'].values[0]) > 0.5) != (abs(r[index]) > 0.5)
+    print(f"[+] pingouin path: {pingouin_time:.2f}s estimated for all triples (from {len(sample)} sampled triples)")
+    print(f"[i] Speed-up: {pingouin_time / batched_time:.1f}x")
+    print(f"[i] Max abs difference on sampled triples: r {max_r_diff:.2e}, p-value {max_p_diff:.2e}, |r| > 0.5 partition differs for {partition_diff}")
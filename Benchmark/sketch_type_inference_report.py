@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+import sys
+import os
+main_folder_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, main_folder_path)
+
+import argparse
+import time
+import numpy as np
+import pandas as pd
+import utils
+import path
+import column_sketch
+
+
+'''
+Error report of the streaming (sketch-based) column type inference against the exact path
+(pandas.read_csv of the whole file, exact nunique, utils.is_categorical / utils.is_quantitative) on the bundled datasets.
+For every dataset: relative error of the approximate distinct counts (mean / max over columns),
+number of columns whose type differs, and the time of both paths.
+'''
+
+
+'''
+Exact column summary of a csv file: column_header, nunique, data_type
+'''
+def exact_summary(csv_file: str) -> pd.DataFrame:
+    df = pd.read_csv(csv_file)
+    return pd.DataFrame({'column_header': list(df.columns),
+                         'nunique': df.nunique().values,
+                         'data_type': utils.check_column_types_for_a_file(csv_file)})
+
+
+# main
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare sketch-based column type inference with the exact path.')
+    parser.add_argument('--dataset_dir', type=str, default=path.dataset_dir, help='Folder of the source csv files.')
+    parser.add_argument('--chunksize', type=int, default=1000, help='Rows per chunk (small to exercise sketch merging).')
+    parser.add_argument('--precision', type=int, default=14, help='HyperLogLog precision p (2^p registers).')
+    args = parser.parse_args()
+
+    all_errors = []
+    total_columns = total_mismatches = 0
+    print(f"{'dataset':<55} {'cols':>5} {'mean err':>9} {'max err':>9} {'type diff':>9} {'exact (s)':>10} {'sketch (s)':>11}")
+    for dataset_name in utils.get_dataset_name_list(args.dataset_dir):
+        csv_file = args.dataset_dir + dataset_name + '.csv'
+        try:
+            start = time.perf_counter()
+            exact = exact_summary(csv_file)
+            exact_time = time.perf_counter() - start
+            start = time.perf_counter()
+            approx = column_sketch.summarize_csv_columns(csv_file, chunksize=args.chunksize, p=args.precision)
+            sketch_time = time.perf_counter() - start
+        except Exception as e:
+            print(f"[!] Dataset: {dataset_name} Error: {e}")
+            continue
+        if exact['column_header'].tolist() != approx['column_header'].tolist():
+            print(f"[!] Dataset: {dataset_name} Error: column headers differ")
+            continue
+        errors = np.abs(approx['approx_nunique'].values - exact['nunique'].values) / np.maximum(exact['nunique'].values, 1)
+        mismatches = exact['data_type'].values != approx['data_type'].values
+        for col in exact['column_header'][mismatches]:
+            row = approx[approx['column_header'] == col].iloc[0]
+            print(f"    [i] {col}: exact {exact.loc[exact['column_header'] == col, 'data_type'].iloc[0]}, "
+                  f"sketch {row['data_type']} (numeric ratio {row['numeric_ratio']:.3f})")
+        all_errors.extend(errors.tolist())
+        total_columns += len(errors)
+        total_mismatches += int(mismatches.sum())
+        print(f"{dataset_name[:55]:<55} {len(errors):>5} {errors.mean():>9.4%} {errors.max():>9.4%} {int(mismatches.sum()):>9} {exact_time:>10.3f} {sketch_time:>11.3f}")
+    if all_errors:
+        print(f"[+] {total_columns} columns: mean relative error of distinct counts {np.mean(all_errors):.4%}, "
+              f"max {np.max(all_errors):.4%}, type mismatches {total_mismatches} ({total_mismatches / total_columns:.2%}).")
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+import sys
+import os
+main_folder_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, main_folder_path)
+
+import argparse
+import json
+import subprocess
+import utils
+import path
+
+
+'''
+Memory report of utils.load_processed_dataset against the default pandas.read_csv on the bundled processed datasets.
+Every load runs in a fresh interpreter, so that its peak RSS (ru_maxrss) is not hidden by earlier loads;
+the peak RSS of an interpreter that only imports the modules is reported as the base and subtracted.
+DataFrame memory (memory_usage(deep=True)) is reported as well.
+'''
+
+
+# Load one dataset in the given mode and print peak RSS and DataFrame memory (bytes) as json
+measure_code = '''
+import sys, os, json, resource
+sys.path.insert(0, {main_folder!r})
+os.chdir({main_folder!r})
+import pandas as pd
+import utils, path
+mode = {mode!r}
+df = None
+if mode == 'read_csv':
+    df = pd.read_csv(path.processed_dir + {dataset!r} + '.csv')
+elif mode == 'typed':
+    df = utils.load_processed_dataset({dataset!r}, use_cache=False)
+elif mode == 'typed_downcast':
+    df = utils.load_processed_dataset({dataset!r}, downcast=True, use_cache=False)
+memory = int(df.memory_usage(deep=True).sum()) if df is not None else 0
+print(json.dumps({{'peak_rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024, 'memory': memory}}))
+'''
+
+modes = ['read_csv', 'typed', 'typed_downcast']
+
+
+def measure(dataset_name, mode):
+    code = measure_code.format(main_folder=main_folder_path, dataset=dataset_name, mode=mode)
+    process = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+# main
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Report peak RSS and DataFrame memory of the typed dataset loader.')
+    parser.add_argument('--datasets', nargs='*', default=None, help='Datasets to measure, all processed datasets by default.')
+    args = parser.parse_args()
+
+    dataset_names = args.datasets if args.datasets else utils.get_dataset_name_list(path.processed_dir)
+    base_rss = measure(dataset_names[0], 'none')['peak_rss']
+    print(f"[i] Base peak RSS (imports only): {base_rss / 2**20:.1f} MB")
+    print(f"{'dataset':<55} " + ' '.join(f"{mode + ' RSS/df (MB)':>28}" for mode in modes))
+    totals = {mode: [0, 0] for mode in modes}
+    for dataset_name in dataset_names:
+        cells = []
+        for mode in modes:
+            result = measure(dataset_name, mode)
+            rss = max(result['peak_rss'] - base_rss, 0)
+            totals[mode][0] += rss
+            totals[mode][1] += result['memory']
+            cells.append(f"{rss / 2**20:>17.2f} / {result['memory'] / 2**20:>8.2f}")
+        print(f"{dataset_name[:55]:<55} " + ' '.join(cells))
+    print(f"{'Total':<55} " + ' '.join(f"{totals[mode][0] / 2**20:>17.2f} / {totals[mode][1] / 2**20:>8.2f}" for mode in modes))
@@ -109,9 +109,8 @@ def update_refined_question_in_csv(file_name: str, csv_batch_size: int = 20):
             current_end_index = min(current_start_index + csv_batch_size, total_rows)
             for i in range(current_start_index, current_end_index):
                 # Extract description of columns involved
-                metadata_df = utils.get_metadata(df.loc[i, 'dataset'])
                 relevant_col_list = df['relevant_column'].iloc[i]
-                relevant_col_info = utils.get_relevant_columns_info(metadata_df, relevant_col_list)
+                relevant_col_info = utils.get_relevant_columns_info(df.loc[i, 'dataset'], relevant_col_list)
                 num_relevent_col = len(relevant_col_info)
                 description_str_list = []
                 for j in range(num_relevent_col):
@@ -156,9 +155,8 @@ def retry_refine_for_errors(dataset_name: str):
     # Go through all the wrong rows and call the API again
     for index in error_indices:
         origin_question = df.at[index, 'origin_question']
-        metadata_df = utils.get_metadata(df.loc[index, 'dataset'])
         relevant_col_list = df['relevant_column'].iloc[index]
-        relevant_col_info = utils.get_relevant_columns_info(metadata_df, relevant_col_list)
+        relevant_col_info = utils.get_relevant_columns_info(df.loc[index, 'dataset'], relevant_col_list)
         num_relevent_col = len(relevant_col_info)
         description_str_list = []
         for j in range(num_relevent_col):
@@ -20,13 +20,12 @@ question_file_suffix = '_withPreliminaryQuestions'
 def process_single_dataset(file_path, task):
     df = pd.read_csv(file_path)
     processed_data = []
+    # Column metadata is read once per dataset through the shared store and looked up by column header
+    col_meta_store = utils.col_meta_store
 
     for _, row in df.iterrows():
         # Get dataset name from the 'Dataset Name' column
         dataset_name = row['Dataset Name']
-        # Read column metadata
-        col_metadata_file = f"{path.meta_dir + path.col_meta_dir}{dataset_name}_col_meta.csv"
-        col_meta_df = pd.read_csv(col_metadata_file)
 
         '''
         Extract column information and corresponding column metadata
@@ -38,8 +37,8 @@ def process_single_dataset(file_path, task):
             # Common case: there is no strata collumn, and no control column
             if ('Strata Column' not in df.columns) and ('Control Column' not in df.columns):
                 # There are 2 columns involved in analysis
-                selected_row1 = col_meta_df[col_meta_df['column_header'] == row['Column 1']]
-                selected_row2 = col_meta_df[col_meta_df['column_header'] == row['Column 2']]
+                selected_row1 = col_meta_store.lookup(dataset_name, row['Column 1'])
+                selected_row2 = col_meta_store.lookup(dataset_name, row['Column 2'])
                 # deal with possible empty value
                 if not selected_row1.empty:
                     type1 = selected_row1['data_type'].iloc[0]
@@ -77,9 +76,9 @@ def process_single_dataset(file_path, task):
             # End for common case: there is no strata collumn, and no control column
             # For Mentel-Haenszel test: include strata column
             elif ('Strata Column' in df.columns) and ('Control Column' not in df.columns):
-                selected_row_s1 = col_meta_df[col_meta_df['column_header'] == row['Column 1']]
-                selected_row_s2 = col_meta_df[col_meta_df['column_header'] == row['Column 2']]
-                selected_row_ss = col_meta_df[col_meta_df['column_header'] == row['Strata Column']] # strata column
+                selected_row_s1 = col_meta_store.lookup(dataset_name, row['Column 1'])
+                selected_row_s2 = col_meta_store.lookup(dataset_name, row['Column 2'])
+                selected_row_ss = col_meta_store.lookup(dataset_name, row['Strata Column']) # strata column
                 # deal with possible empty value
                 if not selected_row_s1.empty:
                     type_s1 = selected_row_s1['data_type'].iloc[0]
@@ -133,9 +132,9 @@ def process_single_dataset(file_path, task):
             # End of Mentel-Haenszel test case: include strata column
             # For Partial correlation coefficent: include control column
             elif ('Strata Column' not in df.columns) and ('Control Column' in df.columns):
-                selected_row_c1 = col_meta_df[col_meta_df['column_header'] == row['Column 1']]
-                selected_row_c2 = col_meta_df[col_meta_df['column_header'] == row['Column 2']]
-                selected_row_cc = col_meta_df[col_meta_df['column_header'] == row['Control Column']] # control column
+                selected_row_c1 = col_meta_store.lookup(dataset_name, row['Column 1'])
+                selected_row_c2 = col_meta_store.lookup(dataset_name, row['Column 2'])
+                selected_row_cc = col_meta_store.lookup(dataset_name, row['Control Column']) # control column
                 # deal with possible empty value
                 if not selected_row_c1.empty:
                     type_c1 = selected_row_c1['data_type'].iloc[0]
@@ -191,7 +190,7 @@ def process_single_dataset(file_path, task):
         
         # Only one column involved: Column
         elif 'Column' in df.columns:
-            selected_row0 = col_meta_df[col_meta_df['column_header'] == row['Column']]
+            selected_row0 = col_meta_store.lookup(dataset_name, row['Column'])
             if not selected_row0.empty:
                 type0 = selected_row0['data_type'].iloc[0]
                 des0 = selected_row0['column_description'].iloc[0] if not pd.isna(selected_row0['column_description'].iloc[0]) else ""
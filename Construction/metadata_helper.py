@@ -4,10 +4,15 @@ import os
 main_folder_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, main_folder_path)
 
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import pandas as pd
 import numpy as np
 import utils
 import path
+import column_sketch
+from metadata_catalog import metadata_catalog
 
 
 '''
@@ -35,52 +40,163 @@ def create_dataset_preliminary_metadata_table(file_list, output_csv):
 
 
 '''
-Create metadata tables for columns in a dataset
-Skip if existing
+Whether the column metadata table of a dataset already exists (and records the dataset)
 '''
-def create_column_preliminary_metadata_tables(file_name):
-    meta_folder = path.meta_dir + path.col_meta_dir
-    file_path = path.dataset_dir + file_name + '.csv'
+def column_metadata_exists(file_name):
     output_path = path.meta_dir + path.col_meta_dir + file_name + "_col_meta.csv"
-
     if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
         # Read existing metadata file
         existing_df = pd.read_csv(output_path)
-        if file_name in existing_df['dataset'].unique():
-            print(f'[ ] Exist, skipping: Column metadata for dataset {file_name}')
-            return
-    try:
-        df = pd.read_csv(file_path)
-        column_headers = df.columns
-        col_meta_df = pd.DataFrame(columns=["dataset", "column_header", "data_type", "column_description"])
-        col_meta_df["column_header"] = column_headers
+        return file_name in existing_df['dataset'].unique()
+    return False
+
+
+'''
+Profile the columns of a dataset: return its preliminary column metadata table (not written).
+streaming: read the dataset in chunks and classify columns with approximate distinct counts (see column_sketch),
+for source tables that do not fit in memory
+'''
+def profile_column_metadata(file_name, streaming=False, chunksize=100000):
+    file_path = path.dataset_dir + file_name + '.csv'
+    col_meta_df = pd.DataFrame(columns=["dataset", "column_header", "data_type", "column_description"])
+    if streaming:
+        summary = column_sketch.summarize_csv_columns(file_path, chunksize=chunksize)
+        col_meta_df["column_header"] = summary['column_header']
         col_meta_df["dataset"] = file_name
-        # Determine the type of each column
-        for col in column_headers:
-            if utils.is_categorical(df[col]):
-                col_meta_df.loc[col_meta_df["column_header"] == col, "data_type"] = "cate" # categorical
-            elif utils.is_quantitative(df[col]):
-                col_meta_df.loc[col_meta_df["column_header"] == col, "data_type"] = "quant" # quantitative
-            else:
-                col_meta_df.loc[col_meta_df["column_header"] == col, "data_type"] = "other" # other
+        col_meta_df["data_type"] = summary['data_type']
+        return col_meta_df
+    df = pd.read_csv(file_path)
+    column_headers = df.columns
+    col_meta_df["column_header"] = column_headers
+    col_meta_df["dataset"] = file_name
+    # Determine the type of each column
+    for col in column_headers:
+        if utils.is_categorical(df[col]):
+            col_meta_df.loc[col_meta_df["column_header"] == col, "data_type"] = "cate" # categorical
+        elif utils.is_quantitative(df[col]):
+            col_meta_df.loc[col_meta_df["column_header"] == col, "data_type"] = "quant" # quantitative
+        else:
+            col_meta_df.loc[col_meta_df["column_header"] == col, "data_type"] = "other" # other
+    return col_meta_df
+
+
+'''
+Write the preliminary column metadata table of a dataset (appended, skipped if the dataset is already recorded)
+'''
+def write_column_metadata_table(file_name, col_meta_df):
+    output_path = path.meta_dir + path.col_meta_dir + file_name + "_col_meta.csv"
+    if column_metadata_exists(file_name):
+        print(f'[ ] Exist, skipping: Column metadata for dataset {file_name}')
+        return False
+    col_meta_df.to_csv(output_path, mode='a', index=False, header=not os.path.exists(output_path))
+    return True
+
+
+'''
+Create metadata tables for columns in a dataset
+Skip if existing
+streaming: read the dataset in chunks and classify columns with approximate distinct counts (see column_sketch)
+'''
+def create_column_preliminary_metadata_tables(file_name, streaming=False, chunksize=100000):
+    if column_metadata_exists(file_name):
+        print(f'[ ] Exist, skipping: Column metadata for dataset {file_name}')
+        return
+    try:
+        col_meta_df = profile_column_metadata(file_name, streaming=streaming, chunksize=chunksize)
         # save in new csv
-        col_meta_df.to_csv(output_path, mode='a', index=False, header=not os.path.exists(output_path))
-        print('[+] Column metadata table for dataset ' + file_name + ' created!')
+        if write_column_metadata_table(file_name, col_meta_df):
+            print('[+] Column metadata table for dataset ' + file_name + ' created' + (' (streaming)' if streaming else '') + '!')
     except Exception as e:
         print("[!] Dataset: " + file_name + f" Error: {e}")
 
 
+'''
+Worker of the parallel mode: profile one dataset and time it.
+Return (file_name, column metadata table or None, error message or None, seconds)
+'''
+def profile_column_metadata_worker(file_name, streaming, chunksize):
+    start = time.perf_counter()
+    try:
+        col_meta_df = profile_column_metadata(file_name, streaming=streaming, chunksize=chunksize)
+        return file_name, col_meta_df, None, time.perf_counter() - start
+    except Exception as e:
+        return file_name, None, str(e), time.perf_counter() - start
+
+
+'''
+Create the column metadata tables of many datasets in parallel.
+Datasets are profiled in a process pool; only this (parent) process writes metadata files, one dataset at a time,
+so no row is lost or duplicated. Datasets whose column metadata already exists are skipped before profiling.
+streaming_of: {file_name: whether to use the streaming mode}
+Per-dataset timings (profiling time in the worker) are reported at the end.
+'''
+def create_column_preliminary_metadata_tables_parallel(file_names, workers, streaming_of, chunksize=100000):
+    pending = []
+    for file_name in file_names:
+        if column_metadata_exists(file_name):
+            print(f'[ ] Exist, skipping: Column metadata for dataset {file_name}')
+        else:
+            pending.append(file_name)
+    timings = {}
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(profile_column_metadata_worker, file_name, streaming_of.get(file_name, False), chunksize)
+                   for file_name in pending]
+        # Single writer: results are written here as the workers finish
+        for future in as_completed(futures):
+            file_name, col_meta_df, error, seconds = future.result()
+            timings[file_name] = seconds
+            if error is not None:
+                print("[!] Dataset: " + file_name + f" Error: {error}")
+            elif write_column_metadata_table(file_name, col_meta_df):
+                print('[+] Column metadata table for dataset ' + file_name + ' created!')
+    wall_time = time.perf_counter() - start
+    if timings:
+        print(f"[i] Per-dataset profiling time ({workers} worker(s)):")
+        for file_name in pending:
+            print(f"    {file_name:<60} {timings[file_name]:>8.3f} s")
+        print(f"[i] Total profiling time {sum(timings.values()):.3f} s, wall time {wall_time:.3f} s.")
+
+
+
+'''
+Build the consolidated metadata catalog from the metadata csv files, or bring it up to date incrementally
+'''
+def build_metadata_catalog(rebuild=False):
+    imported, dropped = metadata_catalog.refresh(rebuild=rebuild)
+    print(f'[+] Metadata catalog {metadata_catalog.db_path} updated: {imported} file(s) imported, {dropped} file(s) dropped.')
+
+
 
 # main
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Create metadata framework tables and the metadata catalog.')
+    parser.add_argument('--build_catalog', action='store_true', help='Only build (incrementally) the metadata catalog from the metadata csv files.')
+    parser.add_argument('--rebuild_catalog', action='store_true', help='Re-import every metadata csv file into the catalog.')
+    parser.add_argument('--streaming', action='store_true', help='Infer column types of every dataset in chunks with approximate distinct counts.')
+    parser.add_argument('--streaming_min_mb', type=float, default=1024, help='Use the streaming mode for datasets larger than this size (MB).')
+    parser.add_argument('--chunksize', type=int, default=100000, help='Rows per chunk in the streaming mode.')
+    parser.add_argument('--workers', type=int, default=1, help='Number of processes profiling datasets in parallel (1: serial).')
+    args = parser.parse_args()
+    if args.build_catalog or args.rebuild_catalog:
+        build_metadata_catalog(rebuild=args.rebuild_catalog)
+        sys.exit(0)
+
     file_names = utils.get_dataset_name_list(path.dataset_dir)
     # create table for dataset metadata
     create_dataset_preliminary_metadata_table(file_names, "Dataset metadata")
     print('Dataset metadata framework table created.')
     # create tables for columns' metadata
-    for item in file_names:
-        create_column_preliminary_metadata_tables(item)
+    streaming_of = {item: args.streaming or os.path.getsize(path.dataset_dir + item + '.csv') > args.streaming_min_mb * 1024 * 1024
+                    for item in file_names}
+    if args.workers > 1:
+        create_column_preliminary_metadata_tables_parallel(file_names, args.workers, streaming_of, chunksize=args.chunksize)
+    else:
+        for item in file_names:
+            create_column_preliminary_metadata_tables(item, streaming=streaming_of[item], chunksize=args.chunksize)
 
     # create_column_preliminary_metadata_tables('Crop Production Dataset')
     print('Column metadata framework tables created.')
+    # keep the catalog in sync with the (new) metadata csv files
+    build_metadata_catalog()
     
\ No newline at end of file
@@ -99,7 +99,7 @@ def prompt_organization(row_index, curr_dataset: str, trick: str)->str:
     # Statistical question
     refined_question = extract_refined_question(row_index=row_index)
     # Extract all column metadata for the current dataset
-    curr_dataset_meta_df = utils.get_metadata(dataset_name=curr_dataset)
+    curr_dataset_meta_df = utils.col_meta_store.get_metadata(curr_dataset)
     meta_info_list = []
     # Replace some string
     for i in range(curr_dataset_meta_df.shape[0]):
@@ -9,6 +9,8 @@ import pandas as pd
 import re
 import utils
 import path
+import column_profile
+from metadata_catalog import metadata_catalog
 
 
 '''
@@ -38,6 +40,49 @@ def convert_value(val):
         return val
 
 
+# convert_value over a Series of distinct strings, see utils.convert_column_values
+def convert_strings(strings: pd.Series):
+    results = np.full(len(strings), None, dtype=object)
+    unconverted = np.zeros(len(strings), dtype=bool)
+    # 1. Values ending with M or K (e.g. '1.5M', '$20k'), same pattern as convert_value
+    m_or_k = strings.str.extract(r'(\d+(?:\.\d+)?)([mMkK])$')
+    is_m_or_k = m_or_k[0].notna().to_numpy(dtype=bool)
+    if is_m_or_k.any():
+        number, ok = utils.parse_plain_float_strings(m_or_k.loc[is_m_or_k, 0])
+        scale = np.where(m_or_k.loc[is_m_or_k, 1].str.lower().to_numpy(dtype=object) == 'm', 1000000, 1000)
+        pos = np.flatnonzero(is_m_or_k)
+        results[pos[ok]] = (number * scale)[ok].tolist()
+        unconverted[pos[~ok]] = True
+    # 2. Percentages (the original string is kept if it can not be parsed)
+    is_pct = ~is_m_or_k & strings.str.contains('%', regex=False).to_numpy(dtype=bool)
+    if is_pct.any():
+        number, ok = utils.parse_plain_float_strings(strings[is_pct].str.replace('%', '', regex=False))
+        pos = np.flatnonzero(is_pct)
+        results[pos[ok]] = (number * 0.01)[ok].tolist()
+        unconverted[pos[~ok]] = True
+    # 3. Remove non-numeric characters (units, currency, ...), the stripped string is kept if it can not be parsed
+    is_rest = ~(is_m_or_k | is_pct)
+    if is_rest.any():
+        stripped = strings[is_rest].str.replace(r'[^\d\.]', '', regex=True)
+        number, ok = utils.parse_plain_float_strings(stripped)
+        # Only ASCII digits and dots left but not a float (e.g. '' or '1.2.3'): float() fails as well
+        kept = ~ok & stripped.str.fullmatch(r'[0-9.]*').to_numpy(dtype=bool)
+        pos = np.flatnonzero(is_rest)
+        results[pos[ok]] = number[ok].tolist()
+        results[pos[kept]] = stripped[kept].tolist()
+        unconverted[pos[~(ok | kept)]] = True
+    return results, unconverted
+
+
+'''
+Vectorized convert_value over a whole column, the result is identical to series.apply(convert_value).
+Values ending with M/K, percentages and values with units are handled by whole-column string operations,
+and every distinct string is converted only once.
+'''
+def convert_column(series: pd.Series) -> pd.Series:
+    return utils.convert_column_values(series, convert_strings, convert_value)
+
+
 '''
 Preprocess dataset csv file
 '''
@@ -52,10 +97,11 @@ def preprocess_csv(file_name: str):
             data_type = utils.determine_data_type(df[col], file_name)
             # col metadata is quant but include non-numeric characters
             if data_type == 'quant' and (not utils.is_quantitative(df[col])):
-                df[col] = df[col].apply(convert_value)
+                df[col] = convert_column(df[col])
 
-        # Output the processed file
+        # Output the processed file, and its columnar binary copy for fast loading
         df.to_csv(output_path, index=False)
+        utils.save_processed_binary(file_name)
         return output_path
     except Exception as e:
         print(f"[!] Error processing file {file_name}: {e}")
@@ -79,8 +125,7 @@ def add_column_rows_and_normality_metadata(file_name):
         if 'is_normality' not in col_meta_df.columns:
             col_meta_df['is_normality'] = np.nan
             add_flag = 1
-        file_path = path.processed_dir + file_name + '.csv'
-        df = pd.read_csv(file_path)
+        df = utils.read_processed_dataset(file_name)
 
         for index, row in col_meta_df.iterrows():
             column_name = row['column_header']
@@ -88,7 +133,7 @@ def add_column_rows_and_normality_metadata(file_name):
             col_meta_df.at[index, 'num_of_rows'] = int(len(df[column_name]))
             # Check normality, only for quantitative data types; false for non-quant data column
             if row['data_type'] == 'quant' and not pd.isnull(df[column_name]).all():
-                col_meta_df.at[index, 'is_normality'] = utils.is_normality_ad(df[column_name])
+                col_meta_df.at[index, 'is_normality'] = utils.is_normality_ad_cached(df[column_name], file_name, column_name)
             else:
                 col_meta_df.at[index, 'is_normality'] = False
         # Before saving the updated metadata table, make sure the num_of_rows column is of type integer
@@ -118,5 +163,15 @@ if __name__=='__main__':
                 print(f"[!] Processing failed for file: {dataset_name}")
             # Add information of rows number and normality to metadata csv files
             add_column_rows_and_normality_metadata(dataset_name)
+            # Profile columns of the processed file once, extractors read facts from the profile
+            if processed_file:
+                column_profile.save_column_profile(dataset_name)
+                print(f"[+] Column profile saved: {dataset_name}")
+        utils.normality_cache.save()
+        print(utils.normality_cache.report())
+        # Bring the metadata catalog (if built) up to date with the column metadata files rewritten above
+        if os.path.exists(metadata_catalog.db_path):
+            imported, dropped = metadata_catalog.refresh()
+            print(f'[+] Metadata catalog updated: {imported} file(s) imported, {dropped} file(s) dropped.')
     except Exception as e:
         print(f"[!] Error in main process: {e}")
@@ -4,74 +4,63 @@ import os
 main_folder_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, main_folder_path)
 
-import pandas as pd
-from scipy.stats import ks_2samp
 import utils
 import json
 import path
+import column_profile
+import ks_comparison
+import pair_sharding
 
 
 '''
 Use Kolmogorov-Smirnov test to compare the differences of distribution of two quant variables
+Every pair is tested once and its row is routed to the output of each outcome it meets:
+output_names[0] for significantly different, output_names[1] for not significantly different.
 '''
-def extract_ks_test_info(file_name: str, output_name: str, flag=0):
+def extract_ks_test_info(file_name: str, output_names: list, df=None, profile=None):
     try:
-        file_path = path.processed_dir + file_name + '.csv'
-        output_path = path.info_dir + output_name + ".csv"
-        df = pd.read_csv(file_path)  # Load the dataset
+        if df is None:
+            df = utils.load_processed_dataset(file_name)  # Load the dataset
+        if profile is None:
+            profile = column_profile.get_column_profile(file_name)  # Column facts computed once per dataset
 
-        ks_test_info_list = []
-        columns = df.columns  # Get all column names
+        ks_test_info_lists = [[] for _ in output_names]  # One list of rows per outcome
+        # Only quant columns are compared, non-quant pairs never enter the loop
+        columns = [col for col in df.columns if profile.at[col, 'data_type'] == "quant"]
+        column_pairs = [(i, j) for i in range(len(columns)) for j in range(i + 1, len(columns))]
 
-        for i in range(len(columns)):
-            for j in range(i + 1, len(columns)):
-                # If NOT quant type of data, set 'null'
-                data_type_i = utils.determine_data_type(series=df[columns[i]], dataset_name=file_name)
-                data_type_j = utils.determine_data_type(series=df[columns[j]], dataset_name=file_name)
-                if data_type_i != "quant" or data_type_j != "quant":
-                    ks_test_info_list.append((file_name,columns[i],columns[j],'null'))
-                    continue
+        # Running the KS test of all the pairs, every column is sorted once (pairs sharded over pair_sharding.workers processes)
+        X = df[columns].to_numpy(dtype=float)
+        _, p_values = ks_comparison.pairwise_ks_2samp([X[:, col] for col in range(len(columns))], column_pairs, workers=pair_sharding.workers)
 
-                # Running the KS test
-                result = ks_2samp(df[columns[i]], df[columns[j]])
+        for index, (i, j) in enumerate(column_pairs):
+            p_value = float(p_values[index])
 
-                # If p-value < 0.05, reject the null hypothesis
-                # Consider there is a significant difference in the distribution of the two selected variables
-                # If p-value >= 0.05: Consider there is NOT a significant difference
-                sig_diff = (result.pvalue < 0.05)
-                not_sig_diff = (result.pvalue >= 0.05)
-                if flag == 0:
-                    sig_con = sig_diff
-                elif flag == 1:
-                    sig_con = not_sig_diff
-                if result.pvalue == 'null':
-                    sig_conclusion = 'Not applicable'
-                else:
-                    sig_conclusion = "Distribution significantly different" if (result.pvalue < 0.05) else "Distribution not significantly different"
+            # If p-value < 0.05, reject the null hypothesis
+            # Consider there is a significant difference in the distribution of the two selected variables
+            # If p-value >= 0.05: Consider there is NOT a significant difference
+            sig_diff = (p_value < 0.05)
+            not_sig_diff = (p_value >= 0.05)
+            if p_value == 'null':
+                sig_conclusion = 'Not applicable'
+            else:
+                sig_conclusion = "Distribution significantly different" if (p_value < 0.05) else "Distribution not significantly different"
+            ks_info = (
+                file_name,
+                columns[i],
+                columns[j],
+                json.dumps({'p value': round(p_value, 5), 'conclusion': sig_conclusion})
+            )
+            for ks_test_info_list, sig_con in zip(ks_test_info_lists, [sig_diff, not_sig_diff]):
                 if sig_con:
-                    # Append information to the list
-                    ks_test_info_list.append((
-                        file_name,
-                        columns[i],
-                        columns[j],
-                        json.dumps({'p value': round(result.pvalue, 5), 'conclusion': sig_conclusion})
-                    ))
+                    # Append information to the list of this outcome
+                    ks_test_info_list.append(ks_info)
 
-        # Prepare DataFrame for storing the KS test info
-        new_data = pd.DataFrame(ks_test_info_list, columns=[
-                                'Dataset Name', 'Column 1', 'Column 2', 'Kolmogorov-Smirnov Test'])
-        new_data = new_data.drop_duplicates()  # Remove potential duplicates
-        new_data = new_data[new_data['Kolmogorov-Smirnov Test'] != 'null'] # Only keep the rows where P value is not 'null'
-
-        # Check if output file exists and write the new data into it
-        if os.path.isfile(output_path) and os.path.getsize(output_path) > 0:
-            # Append new info to existing file
-            new_data.to_csv(output_path, mode='a', header=False, index=False)
-        else:
-            # Write to a new file if it doesn't exist
-            new_data.to_csv(output_path, mode='w', header=True, index=False)
+        # Write the KS test info of each outcome to its CSV file (append if it exists), removing potential duplicates
+        utils.save_extracted_info_by_outcome(ks_test_info_lists, [
+            'Dataset Name', 'Column 1', 'Column 2', 'Kolmogorov-Smirnov Test'], output_names)
         print(f"[+] Dataset: " + file_name + " Done!")
-        return ks_test_info_list  # Return the list of ks test info for further usage
+        return ks_test_info_lists  # Return the lists of ks test info for further usage
     except Exception as e:
         print("[!] Dataset: " + file_name + f" Error: {e}")
         return None  # Return None to indicate that there was an error during the execution
@@ -83,6 +72,6 @@ if __name__ == '__main__':
     dataset_names = utils.get_dataset_name_list(path.processed_dir)
     # Process each dataset and extract the KS test info
     for dataset_name in dataset_names:
-        ks_test_info_list = extract_ks_test_info(file_name=dataset_name, output_name='KS distribution comparison info extraction (Distribution significantly different)', flag=0)
-        ks_test_info_list = extract_ks_test_info(file_name=dataset_name, output_name='KS distribution comparison info extraction (Distribution not significantly different)', flag=1)
+        ks_test_info_lists = extract_ks_test_info(file_name=dataset_name, output_names=['KS distribution comparison info extraction (Distribution significantly different)',
+                                                                                        'KS distribution comparison info extraction (Distribution not significantly different)'])
     print('End.')
\ No newline at end of file
@@ -4,10 +4,14 @@ import os
 main_folder_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, main_folder_path)
 
-import pandas as pd
+import argparse
+import numpy as np
 import utils
 import json
 import path
+import column_profile
+import correlation_matrix
+import pair_sharding
 
 
 '''
@@ -17,50 +21,53 @@ For data that are continuous variables rather than categorical variables;
 Kendall correlation coefficients should be used for data with sample sizes less than 50, and unlimited for sample sizes greater than 50;
 For methods not applicable, the result is recorded as 'null';
 Any one correlation coefficient with an absolute value greater than 0.5 will be summarized and recorded in csv.
+Every pair is computed once and its row is routed to the output of each outcome it meets:
+output_names[0] for strongly correlated, output_names[1] for not strongly correlated.
+Screening mode (for wide tables): the pairs likely to be strongly correlated are first screened with matrix products
+(correlation_matrix.screen_correlated_pairs, score above screen_threshold), and only these candidates, plus a random
+sample of sample_size other pairs for the not strongly correlated output, are computed exactly and recorded.
 '''
-def extract_correlation_info(file_name: str, output_name: str, flag=0):
+def extract_correlation_info(file_name: str, output_names: list, df=None, profile=None, screening=False, screen_threshold=0.2, sample_size=200):
     try:
-        file_path = path.processed_dir + file_name + '.csv'
-        output_path = path.info_dir + output_name + ".csv"
-        df = pd.read_csv(file_path)  # Load the dataset
+        if df is None:
+            df = utils.load_processed_dataset(file_name)  # Load the dataset
+        if profile is None:
+            profile = column_profile.get_column_profile(file_name)  # Column facts computed once per dataset
+
+        correlation_info_lists = [[] for _ in output_names]  # One list of rows per outcome
+        # Only quant columns are measured, handled as one float matrix
+        columns = [col for col in df.columns if profile.at[col, 'data_type'] == "quant"]
+        # Pearson, Spearman and partial correlation of all the pairs at once (pairwise-complete, as DataFrame.corr);
+        # 'valid' is False for the pairs without complete rows or with a constant column on them, which are skipped
+        X = df[columns].to_numpy(dtype=float)
+        selected = precomputed = None
+        if screening:
+            # The sums of the screening are reused by the exact stage
+            selected, candidates, precomputed = correlation_matrix.screened_pairs(X, threshold=screen_threshold, sample_size=sample_size)
+            print(f"[i] Dataset: {file_name} {np.triu(candidates, 1).sum()} candidate pair(s) of {len(columns) * (len(columns) - 1) // 2} after screening")
+        matrices = correlation_matrix.pairwise_correlation_matrices(X, pairs=selected, precomputed=precomputed)
+        # Kendall tau-b of the valid pairs, every column sorted once (pairs sharded over pair_sharding.workers processes)
+        kendall_matrix = correlation_matrix.pairwise_kendall_tau(X, pairs=matrices['valid'], workers=pair_sharding.workers)
 
-        correlation_info_list = []
-        columns = df.columns  # Get all column names
-        
         # Measure and compare each pair of columns
         for i in range(len(columns)):
             for j in range(i + 1, len(columns)):
-                # Check if the variables are of quant type, skip if it's not.
-                data_type_i = utils.determine_data_type(df[columns[i]], dataset_name=file_name)
-                data_type_j = utils.determine_data_type(df[columns[j]], dataset_name=file_name)
-                # If any column is not a quant variable, skip and continue with the next loop
-                if data_type_i != "quant" or data_type_j != "quant":
-                    continue
-                # Check if the data has enough columns for correlation analysis
-                if df[[columns[i], columns[j]]].shape[1] < 2:
-                    continue  # If the number of columns is less than 2, skip
-                # Deal with invalid value
-                df_pair = df[[columns[i], columns[j]]].dropna()
-                # If the processed data is empty or any column is a constant, skip
-                if df_pair.empty or (df_pair.nunique() <= 1).any():
-                    continue
-                # Check if the denominator is not zero
-                if df_pair.std(numeric_only=True).eq(0).any():
+                if not matrices['valid'][i, j]:
                     continue
 
                 pearson_corr_value = spearman_corr_value = kendall_corr_value = partial_corr_value = None
                 # Based on sample size, decide which correlation methods to use
-                # Compute the correlation matrix and take the corresponding results
+                # Take the results from the correlation matrices
                 if len(df) >= 50:
                     # Calculate all possible correlation coefficients when sample size meets the requirement
                     # Calculate correlation coefficient: Pearsion, Spearman, Kendall, Partial
-                    pearson_corr_value = df[[columns[i], columns[j]]].corr(method='pearson', numeric_only=True).iloc[0, 1]
-                    spearman_corr_value = df[[columns[i], columns[j]]].corr(method='spearman', numeric_only=True).iloc[0, 1]
-                    kendall_corr_value = df[[columns[i], columns[j]]].corr(method='kendall', numeric_only=True).iloc[0, 1]
-                    partial_corr_value = df[[columns[i], columns[j]]].pcorr().iloc[0, 1]
+                    pearson_corr_value = matrices['pearson'][i, j]
+                    spearman_corr_value = matrices['spearman'][i, j]
+                    kendall_corr_value = kendall_matrix[i, j]
+                    partial_corr_value = matrices['pcorr'][i, j]
                 else:
                     # Only calculate Kendall when sample size is less than 50 (Small sample size)
-                    kendall_corr_value = df[[columns[i], columns[j]]].corr(method='kendall').iloc[0, 1]
+                    kendall_corr_value = kendall_matrix[i, j]
 
                 # Correlation coefficient with an absolute value greater than 0.5: Strongly correlated
                 # abs <= 0.5 for not strongly correlated
@@ -76,41 +83,30 @@ def extract_correlation_info(file_name: str, output_name: str, flag=0):
                     abs(kendall_corr_value or 0) <= 0.5 and
                     abs(partial_corr_value or 0) <= 0.5
                 )
-                if flag == 0:
-                    cor_condition = strong_cor_con
-                elif flag == 1:
-                    cor_condition = not_strong_cor_con
                 pearson_conclusion = 'Strongly correlated' if abs(pearson_corr_value or 0) > 0.5 else 'Not strongly correlated'
                 spearman_conclusion = 'Strongly correlated' if abs(spearman_corr_value or 0) > 0.5 else 'Not strongly correlated'
                 kendall_conclusion = 'Strongly correlated' if abs(kendall_corr_value or 0) > 0.5 else 'Not strongly correlated'
                 res_not_applicable = json.dumps({'coefficient': 'null', 'conclusion': 'Not applicable'})
-                if (cor_condition):
-                    # Append information to the list
-                    correlation_info_list.append((
-                        file_name,
-                        columns[i],
-                        columns[j],
-                        res_not_applicable if pearson_corr_value is None else json.dumps({'coefficient': round(pearson_corr_value, 5), 'conclusion': pearson_conclusion}),
-                        res_not_applicable if spearman_corr_value is None else json.dumps({'coefficient': round(spearman_corr_value, 5), 'conclusion': spearman_conclusion}),
-                        res_not_applicable if kendall_corr_value is None else json.dumps({'coefficient': round(kendall_corr_value, 5), 'conclusion': kendall_conclusion})
-                        # 'null' if partial_corr_value is None else round(partial_corr_value, 5)
-                    ))
-        
-        # Prepare DataFrame for storing the correlation info
-        new_data = pd.DataFrame(correlation_info_list, columns=[
-                                # 'Dataset Name', 'Column 1', 'Column 2', 'Pearson Correlation Coefficient', 'Spearman Correlation Coefficient', 'Kendall Correlation Coefficient', 'Partial Correlation Coefficient'])
-                                'Dataset Name', 'Column 1', 'Column 2', 'Pearson Correlation Coefficient', 'Spearman Correlation Coefficient', 'Kendall Correlation Coefficient'])
-        new_data = new_data.drop_duplicates()  # Remove potential duplicates
+                correlation_info = (
+                    file_name,
+                    columns[i],
+                    columns[j],
+                    res_not_applicable if pearson_corr_value is None else json.dumps({'coefficient': round(pearson_corr_value, 5), 'conclusion': pearson_conclusion}),
+                    res_not_applicable if spearman_corr_value is None else json.dumps({'coefficient': round(spearman_corr_value, 5), 'conclusion': spearman_conclusion}),
+                    res_not_applicable if kendall_corr_value is None else json.dumps({'coefficient': round(kendall_corr_value, 5), 'conclusion': kendall_conclusion})
+                    # 'null' if partial_corr_value is None else round(partial_corr_value, 5)
+                )
+                # Append information to the list of each outcome met
+                for correlation_info_list, cor_condition in zip(correlation_info_lists, [strong_cor_con, not_strong_cor_con]):
+                    if cor_condition:
+                        correlation_info_list.append(correlation_info)
 
-        # Check if output file exists and write the new data into it
-        if os.path.isfile(output_path) and os.path.getsize(output_path) > 0:
-            # Append new info to existing file
-            new_data.to_csv(output_path, mode='a', header=False, index=False)
-        else:
-            # Write to a new file if it doesn't exist
-            new_data.to_csv(output_path, mode='w', header=True, index=False)
+        # Write the rows of each outcome to its output file
+        utils.save_extracted_info_by_outcome(correlation_info_lists, [
+            # 'Dataset Name', 'Column 1', 'Column 2', 'Pearson Correlation Coefficient', 'Spearman Correlation Coefficient', 'Kendall Correlation Coefficient', 'Partial Correlation Coefficient'])
+            'Dataset Name', 'Column 1', 'Column 2', 'Pearson Correlation Coefficient', 'Spearman Correlation Coefficient', 'Kendall Correlation Coefficient'], output_names)
         print(f"[+] Dataset: " + file_name + " Done!")
-        return correlation_info_list  # Return the list of correlation info for further usage
+        return correlation_info_lists  # Return the lists of correlation info for further usage
     except Exception as e:
         print("[!] Dataset: " + file_name + f" Error: {e}")
         return None  # Return None to indicate that there was an error during the execution
@@ -118,10 +114,17 @@ def extract_correlation_info(file_name: str, output_name: str, flag=0):
 
 # main
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Extract correlation information of the processed datasets.')
+    parser.add_argument('--screening', action='store_true', help='Screen the candidate pairs first, for wide tables.')
+    parser.add_argument('--screen_threshold', type=float, default=0.2, help='Screening score above which a pair is a candidate.')
+    parser.add_argument('--sample_size', type=int, default=200, help='Non-candidate pairs sampled per dataset in screening mode.')
+    args = parser.parse_args()
+
     # Get all dataset names
     dataset_names = utils.get_dataset_name_list(path.processed_dir)
     # Process each dataset and extract the correlation info
     for dataset_name in dataset_names:
-        correlation_info_list = extract_correlation_info(file_name=dataset_name, output_name='Correlation analysis info extraction (Strongly correlated)', flag=0)
-        correlation_info_list = extract_correlation_info(file_name=dataset_name, output_name='Correlation analysis info extraction (Not strongly correlated)', flag=1)
+        correlation_info_lists = extract_correlation_info(file_name=dataset_name, output_names=['Correlation analysis info extraction (Strongly correlated)',
+                                                                                               'Correlation analysis info extraction (Not strongly correlated)'],
+                                                          screening=args.screening, screen_threshold=args.screen_threshold, sample_size=args.sample_size)
     print('End.')
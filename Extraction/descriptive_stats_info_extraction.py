@@ -4,11 +4,13 @@ import os
 main_folder_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, main_folder_path)
 
-import pandas as pd
+import argparse
 import numpy as np
 import utils
 import json
 import path
+import column_profile
+import descriptive_statistics
 
 
 
@@ -30,64 +32,82 @@ def calculate_statistic(func, col_data, default=np.nan):
         return default
 
 
+'''
+Function to format the statistics of a column (as returned by descriptive_statistics) as a row of the output
+'''
+def format_stats_row(file_name: str, col, stats: dict, data_type: str) -> tuple:
+    is_quantitative_col = (data_type == 'quant')
+    is_categorical_col = (data_type == 'cate')
+    mean_con = str(calculate_statistic(lambda x: x['mean'], stats)) if is_quantitative_col else 'Not applicable'
+    median_con = str(calculate_statistic(lambda x: x['median'], stats)) if is_quantitative_col else 'Not applicable'
+    mode_con = str(calculate_statistic(lambda x: x['mode'], stats)) if is_categorical_col else 'Not applicable'
+    range_con = str(calculate_statistic(lambda x: x['range'], stats)) if is_quantitative_col else 'Not applicable'
+    # Quartiles are not rounded
+    quartiles_con = json.dumps(calculate_statistic(lambda x: "{{'Min': {}, 'Q1': {}, 'Median': {}, 'Q3': {}, 'Max': {}}}".format(*x['quartiles']), stats)) \
+        if is_quantitative_col else 'Not applicable'
+    std_dev_con = str(calculate_statistic(lambda x: x['std'], stats)) if is_quantitative_col else 'Not applicable'
+    skewness_con = str(calculate_statistic(lambda x: x['skewness'], stats)) if is_quantitative_col else 'Not applicable'
+    kurtosis_con = str(calculate_statistic(lambda x: x['kurtosis'], stats)) if is_quantitative_col else 'Not applicable'
+    return (
+        file_name,
+        col,
+        json.dumps({'conclusion': mean_con}),
+        json.dumps({'conclusion': median_con}),
+        json.dumps({'conclusion': mode_con}),
+        json.dumps({'conclusion': range_con}),
+        json.dumps({'conclusion': quartiles_con}),
+        json.dumps({'conclusion': std_dev_con}),
+        json.dumps({'conclusion': skewness_con}),
+        json.dumps({'conclusion': kurtosis_con}),
+    )
+
+
 '''
 Function to extract descriptive statistics information
+All the statistics of a column are computed in one pass (descriptive_statistics.describe_column: one sort, one
+multi-quantile call, moments from one pass of central sums).
+With chunksize, the processed csv is instead scanned once in chunks of chunksize rows, for datasets larger than memory
+(df and profile are not used, column types come from the metadata): moments are exact, median and quartiles come from
+a quantile sketch of sketch_size values per column, exact for columns of at most sketch_size values. Above that, the
+median and quartiles are approximate (see descriptive_statistics.QuantileSketch for the rank error), so the chunked
+output can differ from the in-memory one on large datasets; raise sketch_size to keep them exact.
 '''
-def extract_descriptive_stats_info(file_name: str, output_name: str):
+def extract_descriptive_stats_info(file_name: str, output_name: str, df=None, profile=None, chunksize=None, sketch_size=4096):
     try:
-        file_path = path.processed_dir + file_name + '.csv'
-        output_path = path.info_dir + output_name + ".csv"
-        df = pd.read_csv(file_path)
-
         stats_info_list = []
 
-        # Iterate over each column of the dataframe
-        for col in df.columns:
-            is_quantitative_col = (utils.determine_data_type(series=df[col], dataset_name=file_name) == 'quant')
-            # Categorical data to be calculated as mode
-            is_categorical_col = (utils.determine_data_type(series=df[col], dataset_name=file_name) == 'cate')
-
-            # Calculate statistics
-            if is_quantitative_col or is_categorical_col:
-                col_data = df[col].dropna() if is_quantitative_col else df[col]
-                # Calculate statistics based on data type
-                mean_con = str(calculate_statistic(np.mean, col_data)) if is_quantitative_col else 'Not applicable'
-                median_con = str(calculate_statistic(np.median, col_data)) if is_quantitative_col else 'Not applicable'
-                mode_con = str(calculate_statistic(lambda x: x.mode().iloc[0] if not x.mode().empty else np.nan, col_data)) if is_categorical_col else 'Not applicable'
-                range_con = str(calculate_statistic(lambda x: x.max() - x.min(), col_data)) if is_quantitative_col else 'Not applicable'
-                quartiles_con = json.dumps(calculate_statistic(lambda x: f"{{'Min': {x.quantile(0)}, 'Q1': {x.quantile(0.25)}, 'Median': {x.quantile(0.5)}, 'Q3': {x.quantile(0.75)}, 'Max': {x.quantile(1)}}}", col_data)) \
-                    if is_quantitative_col else 'Not applicable'
-                std_dev_con = str(calculate_statistic(np.std, col_data)) if is_quantitative_col else 'Not applicable'
-                skewness_con = str(calculate_statistic(pd.Series.skew, col_data)) if is_quantitative_col else 'Not applicable'
-                kurtosis_con = str(calculate_statistic(pd.Series.kurtosis, col_data)) if is_quantitative_col else 'Not applicable'
-
-                # Append the statistics to the list
-                stats_info_list.append((
-                    file_name,
-                    col,
-                    json.dumps({'conclusion': mean_con}),
-                    json.dumps({'conclusion': median_con}),
-                    json.dumps({'conclusion': mode_con}),
-                    json.dumps({'conclusion': range_con}),
-                    json.dumps({'conclusion': quartiles_con}),
-                    json.dumps({'conclusion': std_dev_con}),
-                    json.dumps({'conclusion': skewness_con}),
-                    json.dumps({'conclusion': kurtosis_con}),
-                ))
+        if chunksize:
+            headers = list(utils.read_processed_headers(file_name))
+            data_types = {col: utils.get_data_type_from_metadata(col, file_name) for col in headers}
+            described = descriptive_statistics.describe_csv(path.processed_dir + file_name + '.csv', data_types,
+                                                            chunksize=chunksize, sketch_size=sketch_size)
+            for col, stats in described.items():
+                stats_info_list.append(format_stats_row(file_name, col, stats, data_types[col]))
+        else:
+            if df is None:
+                df = utils.load_processed_dataset(file_name)
+            if profile is None:
+                profile = column_profile.get_column_profile(file_name)
+
+            # Iterate over each column of the dataframe
+            for col in df.columns:
+                # Categorical data to be calculated as mode
+                data_type = profile.at[col, 'data_type']
+                if data_type in ('quant', 'cate'):
+                    try:
+                        stats = descriptive_statistics.describe_column(df[col], data_type)
+                    except Exception:
+                        stats = {}
+                    # Append the statistics to the list
+                    stats_info_list.append(format_stats_row(file_name, col, stats, data_type))
 
         # Create a DataFrame from the list of statistics and save it to a CSV file
         # Only record it in the final output file if there is at least one applicable statistic method
         if stats_info_list:
-            new_data = pd.DataFrame(stats_info_list, columns=[
+            utils.save_extracted_info(stats_info_list, [
                 'Dataset Name', 'Column', 'Mean', 'Median', 'Mode', 'Range', 
                 'Quartile', 'Standard Deviation', 'Skewness', 'Kurtosis'
-            ])
-            new_data = new_data.drop_duplicates()
-
-            if os.path.isfile(output_path) and os.path.getsize(output_path) > 0:
-                new_data.to_csv(output_path, mode='a', header=False, index=False)
-            else:
-                new_data.to_csv(output_path, mode='w', header=True, index=False)
+            ], output_name)
 
             print(f"[+] Dataset: " + file_name + " Done!")
         else:
@@ -100,7 +120,13 @@ def extract_descriptive_stats_info(file_name: str, output_name: str):
 
 # main
 if __name__=='__main__':
+    parser = argparse.ArgumentParser(description='Extract descriptive statistics of the processed datasets.')
+    parser.add_argument('--chunksize', type=int, default=None, help='Scan the processed csv files in chunks of this many rows (datasets larger than memory).')
+    parser.add_argument('--sketch_size', type=int, default=4096, help='Quantile sketch size per column in chunked mode: median and quartiles are exact up to this many non-missing values, approximate above.')
+    args = parser.parse_args()
+
     dataset_names = utils.get_dataset_name_list(path.processed_dir)
     for dataset_name in dataset_names:
-        stats_info_list = extract_descriptive_stats_info(file_name=dataset_name, output_name='Descriptive statistics info extraction')
+        stats_info_list = extract_descriptive_stats_info(file_name=dataset_name, output_name='Descriptive statistics info extraction',
+                                                         chunksize=args.chunksize, sketch_size=args.sketch_size)
     print('End.')
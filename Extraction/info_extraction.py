@@ -0,0 +1,313 @@
+# -*- coding: gbk -*-
+import sys
+import os
+main_folder_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, main_folder_path)
+
+import argparse
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import utils
+import path
+import column_profile
+import pair_sharding
+import extraction_manifest
+import correlation_info_extraction
+import partial_correlation_info_extraction
+import contingency_table_test_info_extraction
+import matel_haenszel_test_info_extraction
+import nomal_distribution_compliance_test_info_extraction
+import KS_distribution_comparison_info_extraction
+import other_distribution_compliance_test_info_extraction
+import variance_test_info_extraction
+import descriptive_stats_info_extraction
+
+
+'''
+Unified information extraction engine.
+Every dataset is loaded and profiled once, then all the selected plugins run over the same in-memory data
+(the typed DataFrame, its non-categorical view and the column profile), instead of every extraction script
+re-globbing the processed datasets and reloading them on its own.
+The output files and their content are the same as running the extraction scripts one by one.
+'''
+
+
+'''
+A test plugin of the engine:
+- name: name used to select the plugin on the command line;
+- extract: extraction function, called as extract(file_name=..., output_names=..., df=..., profile=...), which
+  returns None if the extraction of the dataset failed;
+- output_names: names of the output files (one per outcome), passed to extract;
+- categorical: whether the plugin works on the typed view ('cate' columns as category) or on the non-categorical one;
+- finish: called once with output_names after all datasets are processed, or None;
+- version: version of the extraction, to be increased when its rows change, so that incremental runs extract every
+  dataset again.
+'''
+class ExtractionPlugin:
+    def __init__(self, name, extract, output_names, categorical=True, finish=None, version=1):
+        self.name = name
+        self.extract = extract
+        self.output_names = output_names
+        self.categorical = categorical
+        self.finish = finish
+        self.version = version
+
+
+# Registry of test plugins, in the order of Script/info_extraction.sh
+extraction_plugins = OrderedDict()
+
+
+def register_plugin(plugin: ExtractionPlugin):
+    if plugin.name in extraction_plugins:
+        raise ValueError(f"Plugin {plugin.name} is already registered.")
+    extraction_plugins[plugin.name] = plugin
+    return plugin
+
+
+'''
+Because the partial correlation subset is overly large compared with others
+perform csv thinening to reduce and to keep balance
+'''
+def thinen_partial_correlation_outputs(output_names):
+    for output_name in output_names:
+        utils.thinen_csv_rows(n=2, file_name=output_name)
+
+
+'''
+Save the Anderson-Darling normality results shared through the cache
+'''
+def save_normality_cache(output_names):
+    utils.normality_cache.save()
+    print(utils.normality_cache.report())
+
+
+register_plugin(ExtractionPlugin(
+    'correlation', correlation_info_extraction.extract_correlation_info,
+    ['Correlation analysis info extraction (Strongly correlated)',
+     'Correlation analysis info extraction (Not strongly correlated)']))
+register_plugin(ExtractionPlugin(
+    'partial_correlation', partial_correlation_info_extraction.extract_partial_correlation_info,
+    ['Partial correlation info extraction (Strongly correlated)',
+     'Partial correlation info extraction (Not strongly correlated)'],
+    finish=thinen_partial_correlation_outputs))
+# crosstab of category columns would keep unobserved categories as empty rows
+register_plugin(ExtractionPlugin(
+    'contingency_table', contingency_table_test_info_extraction.extract_chi_square_and_fisher_info,
+    ['Chi-square and fisher exact test info extraction (Not independent)',
+     'Chi-square and fisher exact test info extraction (Independent)'],
+    categorical=False))
+register_plugin(ExtractionPlugin(
+    'ks_distribution_comparison', KS_distribution_comparison_info_extraction.extract_ks_test_info,
+    ['KS distribution comparison info extraction (Distribution significantly different)',
+     'KS distribution comparison info extraction (Distribution not significantly different)']))
+register_plugin(ExtractionPlugin(
+    'mantel_haenszel', matel_haenszel_test_info_extraction.extract_mantel_haenszel_info,
+    ['Mantel Haenszel test info extraction (Not independent)',
+     'Mantel Haenszel test info extraction (Independent)'],
+    categorical=False))
+register_plugin(ExtractionPlugin(
+    'normality', nomal_distribution_compliance_test_info_extraction.extract_normality_test_info,
+    ['Normality test info extraction (Normally distributed)',
+     'Normality test info extraction (Non-normally distributed)']))
+register_plugin(ExtractionPlugin(
+    'other_distribution', other_distribution_compliance_test_info_extraction.extract_other_distribution_test_info,
+    ['Other distribution info extraction (Compliance)',
+     'Other distribution info extraction (Not compliance)']))
+register_plugin(ExtractionPlugin(
+    'variance', variance_test_info_extraction.extract_variance_test_info,
+    ['Variance test info extraction (Variance significantly different)',
+     'Variance test info extraction (Variance not significantly different)'],
+    finish=save_normality_cache))
+# Single output file, extract takes its name as output_name
+register_plugin(ExtractionPlugin(
+    'descriptive_stats',
+    lambda file_name, output_names, df=None, profile=None: descriptive_stats_info_extraction.extract_descriptive_stats_info(
+        file_name=file_name, output_name=output_names[0], df=df, profile=profile),
+    ['Descriptive statistics info extraction']))
+
+
+'''
+Extract one dataset with the given plugins: the dataset is loaded and profiled once and shared by the plugins.
+plugin_options: {plugin name: keyword arguments passed to its extract function} (e.g. the screening mode of the
+correlation plugin).
+Return (the time spent in each plugin (seconds), the names of the plugins that failed on the dataset), or None if the
+dataset could not be loaded.
+'''
+def extract_dataset(dataset_name: str, plugins: list, plugin_options: dict = None) -> tuple:
+    plugin_options = plugin_options or {}
+    try:
+        views = {}
+        if any(not plugin.categorical for plugin in plugins):
+            views[False] = utils.load_processed_dataset(dataset_name, categorical=False)
+        if any(plugin.categorical for plugin in plugins):
+            views[True] = utils.load_processed_dataset(dataset_name)
+        profile = column_profile.get_column_profile(dataset_name)
+    except Exception as e:
+        print(f"[!] Dataset: {dataset_name} Error: {e}")
+        return None
+    timings = {}
+    failed = []
+    for plugin in plugins:
+        start = time.perf_counter()
+        if plugin.extract(file_name=dataset_name, output_names=plugin.output_names, df=views[plugin.categorical], profile=profile,
+                          **plugin_options.get(plugin.name, {})) is None:
+            failed.append(plugin.name)
+        timings[plugin.name] = time.perf_counter() - start
+    # The datasets are visited once, no need to keep them
+    utils.processed_dataset_cache.invalidate(dataset_name)
+    return timings, failed
+
+
+'''
+Task of a worker process in parallel mode: extract one dataset with its writes deferred.
+Return (the result of extract_dataset, the (output_name, frame) writes in the order they were made, normality cache
+updates), handed over to the parent process, the single writer.
+'''
+def extract_dataset_deferred(dataset_name: str, plugin_names: list, shard_workers: int = 1, plugin_options: dict = None):
+    plugins = [extraction_plugins[name] for name in plugin_names]
+    pair_sharding.workers = shard_workers
+    try:
+        with utils.collect_extracted_info() as collected:
+            extracted = extract_dataset(dataset_name, plugins, plugin_options)
+    finally:
+        # Sharding workers of this dataset, not left running in the idle dataset worker
+        pair_sharding.close_shard_pool()
+    return extracted, collected, utils.normality_cache.pop_updates()
+
+
+'''
+Run the selected plugins (all registered ones by default) over the given datasets (all processed datasets by default).
+With workers > 1, the datasets are fanned out to a pool of worker processes. Workers do not write: the parent
+process writes the frames of every dataset in dataset order, once all the datasets before it are written, so the
+output files are the same as a serial run.
+With shard_workers > 1, the pairs / triples of each dataset are also sharded over worker processes (pair_sharding),
+which helps on wide datasets; the sharding workers are started once per run and shared by all the kernels of all
+the datasets (in parallel mode, once per dataset task, shared by the kernels of the dataset), then shut down.
+With incremental, only the (plugin, dataset) whose key changed since the last incremental run are extracted (see
+extraction_manifest): the rows of every dataset are kept as fragments, and the outputs of the plugins with a new,
+changed or removed dataset are rebuilt from them (then finished) instead of appended to; the other plugins are left
+as they are.
+plugin_options ({plugin name: keyword arguments of its extract function}) are part of the manifest key of the plugin:
+changing them extracts its datasets again.
+The time spent in each plugin is returned (seconds, summed over the workers).
+'''
+def run_extraction(plugin_names: list = None, dataset_names: list = None, workers: int = 1, shard_workers: int = 1,
+                   incremental: bool = False, plugin_options: dict = None) -> dict:
+    pair_sharding.workers = shard_workers
+    plugin_options = plugin_options or {}
+    plugins = [extraction_plugins[name] for name in (plugin_names or extraction_plugins.keys())]
+    all_dataset_names = utils.get_dataset_name_list(path.processed_dir)
+    if dataset_names is None:
+        dataset_names = all_dataset_names
+    timings = OrderedDict((plugin.name, 0.0) for plugin in plugins)
+
+    # Plugins to run on every dataset: all of them, or the stale ones in incremental mode
+    tasks = OrderedDict((dataset_name, plugins) for dataset_name in dataset_names)
+    finished_plugins = plugins
+    if incremental:
+        manifest = extraction_manifest.ExtractionManifest()
+        keys = {dataset_name: manifest.dataset_key(dataset_name) for dataset_name in dataset_names}
+        # Version recorded for a plugin: its version, with its options if it has some
+        versions = {plugin.name: [plugin.version, plugin_options[plugin.name]] if plugin_options.get(plugin.name) else plugin.version
+                    for plugin in plugins}
+        tasks = OrderedDict((dataset_name, [plugin for plugin in plugins
+                                            if not manifest.is_fresh(plugin.name, versions[plugin.name], dataset_name, keys[dataset_name])])
+                            for dataset_name in dataset_names)
+        tasks = OrderedDict((dataset_name, stale) for dataset_name, stale in tasks.items() if stale)
+        # Outputs to rebuild: plugins with a stale or removed dataset, or with an output changed since the last run
+        finished_plugins = []
+        for plugin in plugins:
+            removed = [dataset_name for dataset_name in manifest.datasets(plugin.name) if dataset_name not in all_dataset_names]
+            for dataset_name in removed:
+                manifest.forget(plugin.name, dataset_name)
+                manifest.remove_fragments(plugin.output_names, dataset_name)
+            if (removed or any(plugin in stale for stale in tasks.values())
+                    or any(manifest.output_changed(output_name) for output_name in plugin.output_names)):
+                finished_plugins.append(plugin)
+        print(f"[i] Incremental extraction: {len(tasks)} of {len(dataset_names)} dataset(s) to extract, "
+              f"{len(finished_plugins)} of {len(plugins)} plugin(s) to rebuild")
+
+    def consume(dataset_name, extracted, collected):
+        dataset_timings, failed = extracted if extracted is not None else ({}, None)
+        for name, seconds in dataset_timings.items():
+            timings[name] += seconds
+        if not incremental:
+            for output_name, new_data in collected:
+                utils.write_extracted_info(new_data, output_name)
+            return
+        for plugin in tasks[dataset_name]:
+            if failed is None or plugin.name in failed:
+                # Not loaded, or the plugin failed: no rows, as in a full run, and extracted again next time
+                manifest.forget(plugin.name, dataset_name)
+                manifest.remove_fragments(plugin.output_names, dataset_name)
+            else:
+                manifest.replace_fragments(plugin.output_names, dataset_name, collected)
+                manifest.record(plugin.name, versions[plugin.name], dataset_name, keys[dataset_name])
+
+    if workers <= 1:
+        try:
+            for dataset_name, dataset_plugins in tasks.items():
+                if incremental:
+                    with utils.collect_extracted_info() as collected:
+                        consume(dataset_name, extract_dataset(dataset_name, dataset_plugins, plugin_options), collected)
+                else:
+                    consume(dataset_name, extract_dataset(dataset_name, dataset_plugins, plugin_options), [])
+        finally:
+            pair_sharding.close_shard_pool()
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(extract_dataset_deferred, dataset_name, [plugin.name for plugin in dataset_plugins], shard_workers, plugin_options)
+                       for dataset_name, dataset_plugins in tasks.items()]
+            # Single writer, in dataset order
+            for dataset_name, future in zip(tasks, futures):
+                extracted, collected, normality_updates = future.result()
+                consume(dataset_name, extracted, collected)
+                utils.normality_cache.merge_updates(normality_updates)
+
+    if incremental:
+        for plugin in finished_plugins:
+            for output_name in plugin.output_names:
+                manifest.assemble_output(output_name, all_dataset_names)
+    for plugin in finished_plugins:
+        if plugin.finish is not None:
+            plugin.finish(plugin.output_names)
+    if incremental:
+        for plugin in finished_plugins:
+            for output_name in plugin.output_names:
+                manifest.record_output(output_name)
+        manifest.save()
+    return timings
+
+
+# main
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Extract the information of all the tests from the processed datasets in one pass.')
+    parser.add_argument('--plugins', nargs='*', default=None, choices=list(extraction_plugins.keys()),
+                        help='Plugins to run, all registered plugins by default.')
+    parser.add_argument('--datasets', nargs='*', default=None, help='Datasets to process, all processed datasets by default.')
+    parser.add_argument('--list_plugins', action='store_true', help='List the registered plugins and their output files, then exit.')
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes extracting datasets in parallel (1: serial).')
+    parser.add_argument('--shard_workers', type=int, default=1, help='Worker processes sharing the pairs / triples of each dataset (1: serial).')
+    parser.add_argument('--incremental', action='store_true', help='Only extract the new or changed datasets and replace their rows in the outputs.')
+    parser.add_argument('--correlation_screening', action='store_true', help='Correlation plugin: only compute the screened candidate pairs, for wide tables.')
+    parser.add_argument('--correlation_screen_threshold', type=float, default=0.2, help='Correlation plugin: screening score above which a pair is a candidate.')
+    parser.add_argument('--correlation_sample_size', type=int, default=200, help='Correlation plugin: non-candidate pairs sampled per dataset in screening mode.')
+    args = parser.parse_args()
+
+    if args.list_plugins:
+        for plugin in extraction_plugins.values():
+            print(f"[i] {plugin.name}: " + '; '.join(plugin.output_names))
+        sys.exit(0)
+
+    plugin_options = {}
+    if args.correlation_screening:
+        plugin_options['correlation'] = {'screening': True, 'screen_threshold': args.correlation_screen_threshold,
+                                         'sample_size': args.correlation_sample_size}
+    start = time.perf_counter()
+    timings = run_extraction(plugin_names=args.plugins, dataset_names=args.datasets, workers=args.workers,
+                             shard_workers=args.shard_workers, incremental=args.incremental, plugin_options=plugin_options)
+    for name, seconds in timings.items():
+        print(f"[i] Plugin: {name} {seconds:.2f}s")
+    print(f"[i] Wall-clock: {time.perf_counter() - start:.2f}s with {max(args.workers, 1)} worker(s)")
+    print('End.')
@@ -4,13 +4,13 @@ import os
 main_folder_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, main_folder_path)
 
-import pandas as pd
 import numpy as np
-from scipy.stats import anderson, shapiro, kstest
-from statsmodels.stats.diagnostic import lilliefors
+from scipy.stats import shapiro
 import utils
 import json
 import path
+import column_profile
+import goodness_of_fit
 
 
 '''
@@ -26,70 +26,52 @@ For Shapiro-Wilk Test:
     Sample size should be less than 50.
 For Lilliefors Test:
     Sample size should be more than 50.
+Every column is tested once and its row is routed to the output of each outcome it meets:
+output_names[0] for normally distributed, output_names[1] for non-normally distributed.
 '''
 
-def extract_normality_test_info(file_name: str, output_name: str, flag=0):
+def extract_normality_test_info(file_name: str, output_names: list, df=None, profile=None):
     try:
-        file_path = path.processed_dir + file_name + '.csv'
-        output_path = path.info_dir + output_name + ".csv"
         # read csv
-        df = pd.read_csv(file_path)
-        test_info_list = []
-        # all columns
-        columns = df.columns
+        if df is None:
+            df = utils.load_processed_dataset(file_name)
+        if profile is None:
+            profile = column_profile.get_column_profile(file_name)
+        test_info_lists = [[] for _ in output_names]  # One list of rows per outcome
+        # select quant columns whose standard deviation (of non-NA values) is not zero or very small
+        # For Anderson-Darling, Shapiro-Wilk, Kolmogorov-Smirnov, Lilliefors Test, categorical data is not applicable
+        columns = [col for col in df.columns if profile.at[col, 'data_type'] == 'quant' and not profile.at[col, 'std'] < 1e-8]
+        col_samples = [df[col].dropna().to_numpy(dtype=float) for col in columns]  # Remove NA values for test
+        # Anderson-Darling, Kolmogorov-Smirnov and Lilliefors tests of all the columns at once, every column sorted once
+        # Note that standardization is needed before performing Kolmogorov-Smirnov test for normality test (done by the engine)
+        normal_results = goodness_of_fit.goodness_of_fit_tests(col_samples, ['Normal'])['Normal']
 
-        for col in columns:
-            column_data_type = utils.determine_data_type(series=df[col], dataset_name=file_name)
-            # Initialize variables
-            ad_results = 'null'
-            sw_p = 'null'
-            ks_p = 'null'
-            lf_p = 'null'
-            
-            # select quant columns
-            # if utils.is_continuous(df[col]):
-            if column_data_type == 'quant':
-                col_data = df[col].dropna()  # Remove NA values for test
-                # Check if standard deviation is zero or very small
-                if col_data.std(ddof=1) < 1e-8:
-                    continue
+        for index, col in enumerate(columns):
+            col_data = col_samples[index]
 
-                # Anderson-Darling test
-                ad_output = anderson(col_data)
-                ad_stat = ad_output.statistic
-                ad_crit = ad_output.critical_values[0] # Critical value for significance level of 15%
-                #  significance_level=array([15., 10., 5., 2.5, 1.]
-                # Build result dict for Anderson-Darling
-                ad_results = {'stat': round(ad_stat, 5), 'crit': round(ad_crit, 5)}
+            # Anderson-Darling test
+            ad_stat = normal_results['ad_stat'][index]
+            ad_crit = normal_results['ad_crit'][index]  # Critical value for significance level of 15%
+            #  significance_level=array([15., 10., 5., 2.5, 1.]
+            # Build result dict for Anderson-Darling
+            ad_results = {'stat': round(ad_stat, 5), 'crit': round(ad_crit, 5)}
 
-                # Shapiro-Wilk test if sample size is less than 50
-                if len(col_data) < 50:
-                    _, sw_p = shapiro(col_data)
-                    sw_p = 'null' if np.isnan(sw_p) else sw_p
-                else:
-                    sw_p = 'null'
-
-                # Kolmogorov-Smirnov test
-                # Note that standardization is needed before performing Kolmogorov-Smirnov test for normality test
-                col_data_normalized = (col_data - np.mean(col_data)) / np.std(col_data)
-                _, ks_p = kstest(col_data_normalized, 'norm')
-                ks_p = 'null' if np.isnan(ks_p) else ks_p
+            # Shapiro-Wilk test if sample size is less than 50
+            if len(col_data) < 50:
+                _, sw_p = shapiro(col_data)
+                sw_p = 'null' if np.isnan(sw_p) else sw_p
+            else:
+                sw_p = 'null'
 
-                # Lilliefors test if sample size is greater than 50
-                if len(col_data) > 50:
-                    _, lf_p = lilliefors(col_data)
-                    lf_p = 'null' if np.isnan(lf_p) else lf_p
-                else:
-                    lf_p = 'null'
+            # Kolmogorov-Smirnov test
+            ks_p = normal_results['ks_p'][index]
+            ks_p = 'null' if np.isnan(ks_p) else ks_p
 
-            # Categorical column
-            elif column_data_type == 'cate':
-                col_data = df[col]
-                observed = pd.crosstab(index=col_data, columns="count")
-                # For Anderson-Darling, Shapiro-Wilk, Kolmogorov-Smirnov, Lilliefors Test, categorical data is not applicable
-                ad_results = 'null'
-                sw_p = 'null'
-                ks_p = 'null'
+            # Lilliefors test if sample size is greater than 50
+            if len(col_data) > 50:
+                lf_p = normal_results['lf_p'][index]
+                lf_p = 'null' if np.isnan(lf_p) else lf_p
+            else:
                 lf_p = 'null'
 
             # If stat < crit in Anderson-Darling test: Selected variables are normally distributed), vice versa
@@ -103,11 +85,6 @@ def extract_normality_test_info(file_name: str, output_name: str, flag=0):
                 and ((ad_results != 'null' and (ad_stat >= ad_crit)))
                 and (sw_p != 'null' or ks_p != 'null' or lf_p != 'null')
             )
-            if flag == 0:
-                comp_con = norm_con
-            elif flag == 1:
-                comp_con = not_norm_con
-            
             if ad_results == 'null':
                 ad_conclusion = 'Not applicable'
             else:
@@ -128,31 +105,29 @@ def extract_normality_test_info(file_name: str, output_name: str, flag=0):
             if sw_p != 'null': sw_p = round(sw_p, 5)
             if ks_p != 'null': ks_p = round(ks_p, 5)
             if lf_p != 'null': lf_p = round(lf_p, 5)
-            if comp_con:
-                test_info_list.append((
-                    file_name,
-                    col,
-                    # json.dumps(ad_results),  # convert dict to string
-                    # sw_p,
-                    # ks_p,
-                    # lf_p
-                    json.dumps({'AD results': json.dumps(ad_results), 'conclusion': ad_conclusion}),
-                    json.dumps({'p value': sw_p, 'conclusion': sw_conclusion}),
-                    json.dumps({'p value': ks_p, 'conclusion': ks_conclusion}),
-                    json.dumps({'p value': lf_p, 'conclusion': lf_conclusion})
-                ))
+            if not (norm_con or not_norm_con):
+                continue
+            test_info = (
+                file_name,
+                col,
+                # json.dumps(ad_results),  # convert dict to string
+                # sw_p,
+                # ks_p,
+                # lf_p
+                json.dumps({'AD results': json.dumps(ad_results), 'conclusion': ad_conclusion}),
+                json.dumps({'p value': sw_p, 'conclusion': sw_conclusion}),
+                json.dumps({'p value': ks_p, 'conclusion': ks_conclusion}),
+                json.dumps({'p value': lf_p, 'conclusion': lf_conclusion})
+            )
+            for test_info_list, comp_con in zip(test_info_lists, [norm_con, not_norm_con]):
+                if comp_con:
+                    test_info_list.append(test_info)
 
-        # Append list of tuples to CSV file and remove duplicates
-        new_data = pd.DataFrame(test_info_list, columns=[
-                                'Dataset Name', 'Column', 'Anderson-Darling Test', 'Shapiro-Wilk Test of Normality', 'Kolmogorov-Smirnov Test for Normality', 'Lilliefors Test'])
-        new_data = new_data.drop_duplicates()
-        # Check if the file exists; if yes, append in new data without headers
-        if os.path.isfile(output_path) and os.path.getsize(output_path) > 0:
-            new_data.to_csv(output_path, mode='a', header=False, index=False)
-        else:
-            new_data.to_csv(output_path, mode='w', header=True, index=False)
+        # Append list of tuples of each outcome to its CSV file and remove duplicates
+        utils.save_extracted_info_by_outcome(test_info_lists, [
+            'Dataset Name', 'Column', 'Anderson-Darling Test', 'Shapiro-Wilk Test of Normality', 'Kolmogorov-Smirnov Test for Normality', 'Lilliefors Test'], output_names)
         print(f"[+] Dataset: " + file_name + " Done!")
-        return test_info_list
+        return test_info_lists
     except Exception as e:
         print("[!] Dataset: " + file_name + f" Error: {e}")
         return None
@@ -164,6 +139,6 @@ if __name__=='__main__':
     dataset_names = utils.get_dataset_name_list(path.processed_dir)
     # Extract correlation info for all the datasets
     for dataset_name in dataset_names:
-        test_info_list = extract_normality_test_info(file_name=dataset_name, output_name='Normality test info extraction (Normally distributed)', flag=0)
-        test_info_list = extract_normality_test_info(file_name=dataset_name, output_name='Normality test info extraction (Non-normally distributed)', flag=1)
+        test_info_lists = extract_normality_test_info(file_name=dataset_name, output_names=['Normality test info extraction (Normally distributed)',
+                                                                                          'Normality test info extraction (Non-normally distributed)'])
     print('End.')
\ No newline at end of file
@@ -4,89 +4,78 @@ import os
 main_folder_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, main_folder_path)
 
-import pandas as pd
-import pingouin as pg
 import utils
-import warnings
 import json
 import path
+import column_profile
+import correlation_matrix
+import pair_sharding
 
 
 '''
 Partial Correlation Coefficient
 Three quantatitive columns involved.
+The coefficients of all the triples are computed at once from the correlation matrix (closed form, same results
+as pingouin.partial_corr), and their p-values in bulk.
+Every triple is computed once and its row is routed to the output of each outcome it meets:
+output_names[0] for strongly correlated, output_names[1] for not strongly correlated.
 '''
-def extract_partial_correlation_info(file_name: str, output_name: str, flag = 0):
+def extract_partial_correlation_info(file_name: str, output_names: list, df=None, profile=None):
     try:
-        file_path = path.processed_dir + file_name + ".csv"
-        output_path = path.info_dir + output_name + ".csv"
-        df = pd.read_csv(file_path)
+        if df is None:
+            df = utils.load_processed_dataset(file_name)
+        if profile is None:
+            profile = column_profile.get_column_profile(file_name)
 
-        test_info_list = []
+        test_info_lists = [[] for _ in output_names]  # One list of rows per outcome
 
-        quantitative_columns = [col for col in df.columns if utils.determine_data_type(series=df[col],dataset_name=file_name) == "quant"]
+        quantitative_columns = [col for col in df.columns if profile.at[col, 'data_type'] == "quant"]
 
         if len(quantitative_columns) < 3:
             print(f"[!] Dataset: {file_name} does not have enough continuous columns for partial correlation analysis")
-            return None
+            return test_info_lists  # No rows (None is returned on errors)
 
-        # Iterate over all combinations of two columns with one control variable
-        for i in range(len(quantitative_columns)):
-            for j in range(i+1, len(quantitative_columns)):
-                for k in range(len(quantitative_columns)):
-                    if k == i or k == j:
-                        continue
-                    col1 = quantitative_columns[j]
-                    col2 = quantitative_columns[k]
-                    control_var = quantitative_columns[i]
+        # All combinations of two columns with one control variable: (col1, col2, control_var) positions
+        triples = [(j, k, i)
+                   for i in range(len(quantitative_columns))
+                   for j in range(i+1, len(quantitative_columns))
+                   for k in range(len(quantitative_columns)) if k != i and k != j]
+        partial_corr_values, counts = correlation_matrix.partial_correlation_triples(df[quantitative_columns].to_numpy(dtype=float), triples,
+                                                                                     workers=pair_sharding.workers)
+        p_values = correlation_matrix.correlation_pvalues(partial_corr_values, counts, covariates=1)
 
-                    # Attempt to calculate partial correlation with exception handling for RuntimeWarnings
-                    with warnings.catch_warnings():
-                        warnings.simplefilter("ignore")
-                        try:
-                            # Calculate partial correlation
-                            result = pg.partial_corr(data=df, x=col1, y=col2, covar=control_var)
-                            p_value = result['p-val'].values[0]
-                            partial_corr_value = result['r'].values[0]
+        for (j, k, i), partial_corr_value, p_value, count in zip(triples, partial_corr_values, p_values, counts):
+            col1 = quantitative_columns[j]
+            col2 = quantitative_columns[k]
+            control_var = quantitative_columns[i]
+            if count < 3:
+                print(f"[!] Unexpected error for {file_name} with variables {col1}, {col2}, and control {control_var}: Data must have at least 3 non-NAN samples.")
+                continue
 
-                            # Partial correlation coefficient abs > 0.5: strongly correlated;
-                            # otherwise not strongly correlated
-                            if flag == 0:
-                                cor_condition = (abs(partial_corr_value) > 0.5)
-                            elif flag == 1:
-                                cor_condition = (abs(partial_corr_value) <= 0.5)
-                            # Use a dict to store the results: coefficent and p value
-                            if p_value == 'null' or partial_corr_value == 'null':
-                                partial_conclusion = 'Not applicable'
-                            else:
-                                p_value = round(p_value, 5)
-                                partial_corr_value = round(partial_corr_value, 5)
-                                partial_conclusion = 'Strongly correlated' if (abs(partial_corr_value or 0) > 0.5 and (p_value <= 0.05)) else 'Not strongly correlated'
-                            partial_corr_results = {'coefficient': partial_corr_value, 'p value': p_value, 'conclusion': partial_conclusion}
-                            if cor_condition:
-                                test_info_list.append((
-                                    file_name, 
-                                    col1, 
-                                    col2, 
-                                    control_var, 
-                                    json.dumps(partial_corr_results)
-                                ))
-                        except RuntimeWarning:
-                            print(f"[!] RuntimeWarning encountered for {file_name} with variables {col1}, {col2}, and control {control_var}. Skipping this combination.")
-                        except Exception as e:
-                            print(f"[!] Unexpected error for {file_name} with variables {col1}, {col2}, and control {control_var}: {e}")
+            # Partial correlation coefficient abs > 0.5: strongly correlated;
+            # otherwise not strongly correlated (undefined coefficients are in neither)
+            cor_conditions = [(abs(partial_corr_value) > 0.5), (abs(partial_corr_value) <= 0.5)]
+            if not any(cor_conditions):
+                continue
+            # Use a dict to store the results: coefficent and p value
+            p_value = round(p_value, 5)
+            partial_corr_value = round(partial_corr_value, 5)
+            partial_conclusion = 'Strongly correlated' if (abs(partial_corr_value or 0) > 0.5 and (p_value <= 0.05)) else 'Not strongly correlated'
+            partial_corr_results = {'coefficient': partial_corr_value, 'p value': p_value, 'conclusion': partial_conclusion}
+            for test_info_list, cor_condition in zip(test_info_lists, cor_conditions):
+                if cor_condition:
+                    test_info_list.append((
+                        file_name, 
+                        col1, 
+                        col2, 
+                        control_var, 
+                        json.dumps(partial_corr_results)
+                    ))
 
-
-        # Write results to CSV file
-        new_data = pd.DataFrame(test_info_list, columns=['Dataset Name', 'Column 1', 'Column 2', 'Control Column', 'Partial Correlation Coefficient'])
-        new_data = new_data.drop_duplicates()
-
-        if os.path.isfile(output_path) and os.path.getsize(output_path) > 0:
-            new_data.to_csv(output_path, mode='a', header=False, index=False)
-        else:
-            new_data.to_csv(output_path, mode='w', header=True, index=False)
+        # Write results of each outcome to its CSV file
+        utils.save_extracted_info_by_outcome(test_info_lists, ['Dataset Name', 'Column 1', 'Column 2', 'Control Column', 'Partial Correlation Coefficient'], output_names)
         print(f"[+] Dataset: {file_name} Done!")
-        return test_info_list
+        return test_info_lists
     except Exception as e:
         print(f"[!] Dataset: {file_name} Error: {e}")
         return None
@@ -98,8 +87,8 @@ if __name__=='__main__':
     dataset_names = utils.get_dataset_name_list(path.processed_dir)
     # Extract partial correlation info for all the datasets
     for dataset_name in dataset_names:
-        extract_partial_correlation_info(file_name=dataset_name, output_name='Partial correlation info extraction (Strongly correlated)', flag=0)
-        extract_partial_correlation_info(file_name=dataset_name, output_name='Partial correlation info extraction (Not strongly correlated)', flag=1)
+        extract_partial_correlation_info(file_name=dataset_name, output_names=['Partial correlation info extraction (Strongly correlated)',
+                                                                              'Partial correlation info extraction (Not strongly correlated)'])
     print('End.')
     # Because the partial correlation subset is overly large compared with others
     # perform csv thinening to reduce and to keep balance
@@ -4,12 +4,13 @@ import os
 main_folder_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, main_folder_path)
 
-from scipy.stats import mood, levene, bartlett, f_oneway
-import pandas as pd
 import numpy as np
 import json
 import utils
 import path
+import column_profile
+import variance_statistics
+import pair_sharding
 
 
 '''
@@ -33,54 +34,63 @@ def process_result(method_name, result):
         return {'stat': 'null', 'p value': 'null', 'conclusion': 'Not applicable'}
 
 
-def extract_variance_test_info(file_name: str, output_name: str, flag=0):
+'''
+Every pair is tested once and its row is routed to the output of each outcome it meets:
+output_names[0] for significantly different, output_names[1] for not significantly different.
+Note that both conditions can hold for the same pair, in which case the row goes to both outputs.
+'''
+def extract_variance_test_info(file_name: str, output_names: list, df=None, profile=None):
     try:
-        file_path = path.processed_dir + file_name + '.csv'
-        output_path = path.info_dir + output_name + ".csv"
-        df = pd.read_csv(file_path)
-
-        test_info_list = []
-        continuous_columns = [col for col in df.columns if utils.determine_data_type(series=df[col], dataset_name=file_name) == "quant"]
-
-        for i in range(len(continuous_columns)):
-            for j in range(i + 1, len(continuous_columns)):
-                col1 = continuous_columns[i]
-                col2 = continuous_columns[j]
-
-                # Delete rows that contain missing values
-                df_clean = df.dropna(subset=[col1, col2])
-                sample1 = df_clean[col1]
-                sample2 = df_clean[col2]
-
-                # Variance test is meaningless if variance=0. Prevent a division error of zero.
-                if (sample1 <= 0).any() or (sample2 <= 0).any() or np.isinf(sample1).any() or np.isinf(sample2).any():
-                    continue
-                if np.std(sample1) == 0 or np.std(sample2) == 0:
-                    continue
-
-                normality1 = utils.is_normality_ad(sample1)
-                normality2 = utils.is_normality_ad(sample2)
-
-                # Process each test with precondition checks
-                mood_init_res = mood(sample1, sample2)
-                levene_init_res = levene(sample1, sample2)
-                bartlett_init_res = bartlett(sample1, sample2)
-                f_test_init_res = f_oneway(sample1, sample2)
-
-                # If p < 0.05, reject null hypothesis, and consider there is a significant difference between the two groups
-                # For p >= 0.05: considering there is NOT a significant difference
-                sig_diff= (any([mood_init_res[1], levene_init_res[1], bartlett_init_res[1], f_test_init_res[1]]) >= 0.05)
-                not_sig_diff = (all([mood_init_res[1], levene_init_res[1], bartlett_init_res[1], f_test_init_res[1]]) < 0.05)
-                if flag == 0:
-                    var_con = sig_diff
-                elif flag == 1:
-                    var_con = not_sig_diff
-
-                mood_results = process_result('Mood Variance Test', mood_init_res)
-                levene_results = process_result('Levene Test', levene_init_res if len(sample1) > 2 and len(sample2) > 2 else None)
-                bartlett_results = process_result('Bartlett Test', bartlett_init_res if normality1 and normality2 else None)
-                f_test_results = process_result('F-Test for Variance', f_test_init_res if normality1 and normality2 else None)
-
+        if df is None:
+            df = utils.load_processed_dataset(file_name)
+        if profile is None:
+            profile = column_profile.get_column_profile(file_name)
+
+        test_info_lists = [[] for _ in output_names]  # One list of rows per outcome
+        continuous_columns = [col for col in df.columns if profile.at[col, 'data_type'] == "quant"]
+
+        # Bartlett, Levene, F-test and Mood of all the pairs, each column on the rows of the pair
+        # (see variance_statistics.pairwise_variance_tests, pairs sharded over pair_sharding.workers processes)
+        X = df[continuous_columns].to_numpy(dtype=float)
+        present = ~np.isnan(X)
+        column_pairs = [(i, j) for i in range(len(continuous_columns)) for j in range(i + 1, len(continuous_columns))]
+        tests = variance_statistics.pairwise_variance_tests(X, column_pairs, workers=pair_sharding.workers)
+        column_values = [df[col].to_numpy() for col in continuous_columns]
+        column_normality = [None] * len(continuous_columns)
+
+        for index, (i, j) in enumerate(column_pairs):
+            col1 = continuous_columns[i]
+            col2 = continuous_columns[j]
+
+            # Pairs with a value <= 0 or infinite, or a null variance, are not tested
+            if not tests['tested'][index]:
+                continue
+
+            # Each column sample is tested once, whatever the number of pairs it is in
+            # (values in the column dtype on the rows of the pair, as the normality cache fingerprints them)
+            pair_rows = present[:, i] & present[:, j]
+            normalities = []
+            for col, is_cached in zip((i, j), tests['cached'][index]):
+                if not (is_cached and column_normality[col] is not None):
+                    normality = utils.is_normality_ad_cached(column_values[col][pair_rows], file_name, continuous_columns[col])
+                    if is_cached:
+                        column_normality[col] = normality
+                normalities.append(column_normality[col] if is_cached else normality)
+            normality1, normality2 = normalities
+            size1, size2 = tests['sizes'][index]
+            mood_init_res, levene_init_res, bartlett_init_res, f_test_init_res = tests['results'][index]
+
+            # If p < 0.05, reject null hypothesis, and consider there is a significant difference between the two groups
+            # For p >= 0.05: considering there is NOT a significant difference
+            sig_diff= (any([mood_init_res[1], levene_init_res[1], bartlett_init_res[1], f_test_init_res[1]]) >= 0.05)
+            not_sig_diff = (all([mood_init_res[1], levene_init_res[1], bartlett_init_res[1], f_test_init_res[1]]) < 0.05)
+
+            mood_results = process_result('Mood Variance Test', mood_init_res)
+            levene_results = process_result('Levene Test', levene_init_res if size1 > 2 and size2 > 2 else None)
+            bartlett_results = process_result('Bartlett Test', bartlett_init_res if normality1 and normality2 else None)
+            f_test_results = process_result('F-Test for Variance', f_test_init_res if normality1 and normality2 else None)
+
+            for test_info_list, var_con in zip(test_info_lists, [sig_diff, not_sig_diff]):
                 if var_con:
                     test_info_list.append((
                         file_name,
@@ -92,24 +102,22 @@ def extract_variance_test_info(file_name: str, output_name: str, flag=0):
                         json.dumps(f_test_results)
                     ))
 
-        new_data = pd.DataFrame(test_info_list, columns=[
-                                'Dataset Name', 'Column 1', 'Column 2', 'Mood Variance Test', 'Levene Test', 'Bartlett Test', 'F-Test for Variance'])
-        new_data = new_data.drop_duplicates()
-
-        if os.path.isfile(output_path) and os.path.getsize(output_path) > 0:
-            new_data.to_csv(output_path, mode='a', header=False, index=False)
-        else:
-            new_data.to_csv(output_path, mode='w', header=True, index=False)
+        utils.save_extracted_info_by_outcome(test_info_lists, [
+            'Dataset Name', 'Column 1', 'Column 2', 'Mood Variance Test', 'Levene Test', 'Bartlett Test', 'F-Test for Variance'], output_names)
 
         print(f"[+] Dataset: " + file_name + " Done!")
+        return test_info_lists
     except Exception as e:
         print("[!] Dataset: " + file_name + f" Error: {e}")
+        return None  # Return None to indicate that there was an error during the execution
 
 
 # main
 if __name__=='__main__':
     dataset_names = utils.get_dataset_name_list(path.processed_dir)
     for dataset_name in dataset_names:
-        test_info_list = extract_variance_test_info(file_name=dataset_name, output_name='Variance test info extraction (Variance significantly different)', flag=0)
-        test_info_list = extract_variance_test_info(file_name=dataset_name, output_name='Variance test info extraction (Variance not significantly different)', flag=1)
+        extract_variance_test_info(file_name=dataset_name, output_names=['Variance test info extraction (Variance significantly different)',
+                                                                        'Variance test info extraction (Variance not significantly different)'])
+    utils.normality_cache.save()
+    print(utils.normality_cache.report())
     print('End.')
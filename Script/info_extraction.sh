@@ -6,15 +6,23 @@ python Construction/tabular_data_preprocess.py
 echo "datasets preprocess ends..."
 
 echo "info extract starts..."
-python Extraction/correlation_info_extraction.py
-python Extraction/partial_correlation_info_extraction.py
-python Extraction/contingency_table_test_info_extraction.py
-python Extraction/KS_distribution_comparison_info_extraction.py
-python Extraction/matel_haenszel_test_info_extraction.py
-python Extraction/nomal_distribution_compliance_test_info_extraction.py
-python Extraction/other_distribution_compliance_test_info_extraction.py
-python Extraction/variance_test_info_extraction.py
-python Extraction/descriptive_stats_info_extraction.py
+# All tests in one pass over the datasets; select a subset with e.g. --plugins correlation variance,
+# extract datasets in parallel with e.g. --workers 4, and shard the pairs / triples of wide datasets with
+# e.g. --shard_workers 4 (same output files as the serial run).
+# --correlation_screening only computes the screened candidate pairs of the correlation plugin (for wide tables).
+# --incremental only extracts the new or changed datasets and replaces their rows in the outputs
+# (drop it to extract everything again, after emptying Data/Extracted Information)
+python Extraction/info_extraction.py --incremental
+# Or run the extraction scripts one by one:
+# python Extraction/correlation_info_extraction.py  (--screening: same as --correlation_screening above)
+# python Extraction/partial_correlation_info_extraction.py
+# python Extraction/contingency_table_test_info_extraction.py
+# python Extraction/KS_distribution_comparison_info_extraction.py
+# python Extraction/matel_haenszel_test_info_extraction.py
+# python Extraction/nomal_distribution_compliance_test_info_extraction.py
+# python Extraction/other_distribution_compliance_test_info_extraction.py
+# python Extraction/variance_test_info_extraction.py
+# python Extraction/descriptive_stats_info_extraction.py
 echo "info extract ends..."
 
 wait
@@ -2,4 +2,6 @@ cd ..
 
 echo "metadata framewark creation starts..."
 python Construction/metadata_helper.py
+# parallel mode (process pool, single writer), for many or large datasets:
+# python Construction/metadata_helper.py --workers 8
 echo "metadata framewark creation ends..."
\ No newline at end of file
@@ -7,10 +7,7 @@ import path
 import mappings
 import pandas as pd
 import numpy as np
-from sklearn.metrics import confusion_matrix
-import seaborn as sns
-import matplotlib.pyplot as plt
-from matplotlib.patches import Patch
+# sklearn, seaborn and matplotlib are only needed for plotting, they are imported inside the plotting functions
 
 
 '''
@@ -151,6 +148,9 @@ Answers beyond the provided range will not be considered valid:
 - Ignore these rows when the value of the task key in the extracted_answer column is not within the range of task (standard answer).
 '''
 def plot_confusion_matrix_for_task_classification(file_name: str, output_dir: str):
+    from sklearn.metrics import confusion_matrix
+    import seaborn as sns
+    import matplotlib.pyplot as plt
     file_path = path.model_ans_path + path.processed_ans_path + file_name + '.csv'
     df = pd.read_csv(file_path)
     # Pre-treatment to filter out valid 'extracted_answer'
@@ -336,6 +336,7 @@ Input: work directory containing multiple csv files of task performance to be an
 target: 'methods' or 'columns' or 'overall'
 '''
 def plot_radar_chart_for_task_performance(work_dir: str, output_name: str, target: str):
+    import matplotlib.pyplot as plt
     file_list = utils.get_dataset_name_list(work_dir)
     fig, ax = plt.subplots(figsize=(6, 6), subplot_kw=dict(polar=True))
     colors = plt.cm.tab20(np.linspace(0, 1, len(file_list)))
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+import os
+import numpy as np
+import pandas as pd
+import path
+import utils
+
+
+'''
+Column profile of a processed dataset.
+Facts about every column (type, counts, range, moments, positivity, binary flag and AD normality) are computed
+once in a vectorized pass after preprocessing, and persisted as a sidecar csv in the column profile folder.
+Extractors read these facts instead of re-deriving them per column or per column pair.
+'''
+
+
+profile_columns = [
+    'column_header', 'data_type', 'is_numeric', 'num_of_rows', 'count', 'null_count', 'nunique',
+    'is_categorical', 'is_quantitative', 'is_binary', 'min', 'max', 'mean', 'std', 'skewness', 'kurtosis',
+    'all_positive', 'is_normality'
+]
+
+
+'''
+Path of the column profile sidecar file of a dataset
+'''
+def get_profile_path(dataset_name: str):
+    return path.meta_dir + path.col_profile_dir + dataset_name + '_col_profile.csv'
+
+
+'''
+Compute the column profile of a dataset in one pass.
+- nunique / null counts are computed for all columns at once;
+- range and moments are computed on the numeric block of the DataFrame at once (NaN skipped, std with ddof=1);
+- all_positive: every non-null value is finite and greater than 0;
+- is_normality: Anderson-Darling normality (alpha=0.05) of the non-null values, only for quant columns.
+Return a DataFrame indexed by column header, in the order of df.columns.
+'''
+def build_column_profile(df: pd.DataFrame, dataset_name: str) -> pd.DataFrame:
+    columns = list(df.columns)
+    total_count = len(df)
+    profile = pd.DataFrame(index=pd.Index(columns, name='column_header'))
+    profile['data_type'] = [utils.determine_data_type(series=df[col], dataset_name=dataset_name) for col in columns]
+    profile['is_numeric'] = [pd.api.types.is_numeric_dtype(df[col]) for col in columns]
+    profile['num_of_rows'] = total_count
+    profile['count'] = df.count().values
+    profile['null_count'] = total_count - profile['count']
+    profile['nunique'] = df.nunique().values
+    # Same rules as utils.is_categorical / utils.is_quantitative (threshold 0.2)
+    unique_ratio = profile['nunique'] / total_count
+    profile['is_categorical'] = unique_ratio < 0.2
+    profile['is_quantitative'] = profile['is_numeric'] & (unique_ratio >= 0.2)
+    profile['is_binary'] = profile['nunique'] == 2
+
+    # Range and moments of the numeric block
+    numeric_columns = [col for col in columns if profile.at[col, 'is_numeric']]
+    numeric_df = df[numeric_columns].astype(float)
+    for stat_name in ['min', 'max', 'mean', 'std', 'skewness', 'kurtosis']:
+        profile[stat_name] = np.nan
+    if numeric_columns:
+        profile.loc[numeric_columns, 'min'] = numeric_df.min().values
+        profile.loc[numeric_columns, 'max'] = numeric_df.max().values
+        profile.loc[numeric_columns, 'mean'] = numeric_df.mean().values
+        profile.loc[numeric_columns, 'std'] = numeric_df.std(ddof=1).values
+        profile.loc[numeric_columns, 'skewness'] = numeric_df.skew().values
+        profile.loc[numeric_columns, 'kurtosis'] = numeric_df.kurtosis().values
+    values = numeric_df.values
+    positive = ((values > 0) & np.isfinite(values)) | np.isnan(values)
+    profile['all_positive'] = False
+    if numeric_columns:
+        profile.loc[numeric_columns, 'all_positive'] = positive.all(axis=0)
+
+    # Normality only matters for quant columns
+    profile['is_normality'] = False
+    for col in columns:
+        if profile.at[col, 'data_type'] == 'quant' and profile.at[col, 'count'] > 0:
+            profile.at[col, 'is_normality'] = utils.is_normality_ad_cached(df[col].dropna(), dataset_name, col)
+    profile['all_positive'] = profile['all_positive'].astype(bool)
+    profile['is_normality'] = profile['is_normality'].astype(bool)
+    return profile
+
+
+'''
+Compute and save the column profile of a processed dataset
+'''
+def save_column_profile(dataset_name: str, df: pd.DataFrame = None) -> pd.DataFrame:
+    if df is None:
+        df = utils.read_processed_dataset(dataset_name)
+    profile = build_column_profile(df, dataset_name)
+    os.makedirs(path.meta_dir + path.col_profile_dir, exist_ok=True)
+    profile.reset_index()[profile_columns].to_csv(get_profile_path(dataset_name), index=False)
+    return profile
+
+
+'''
+Whether the saved profile is at least as new as the processed dataset and its column metadata
+'''
+def is_profile_fresh(dataset_name: str) -> bool:
+    profile_path = get_profile_path(dataset_name)
+    if not os.path.exists(profile_path):
+        return False
+    profile_mtime = os.path.getmtime(profile_path)
+    for source_path in [path.processed_dir + dataset_name + '.csv', utils.col_meta_store.metadata_path(dataset_name)]:
+        if os.path.exists(source_path) and os.path.getmtime(source_path) > profile_mtime:
+            return False
+    return True
+
+
+'''
+Get the column profile of a dataset (indexed by column header).
+The saved sidecar file is used if it is fresh and matches the columns of df;
+otherwise the profile is rebuilt from df (or from the processed csv) and saved again.
+'''
+def get_column_profile(dataset_name: str, df: pd.DataFrame = None) -> pd.DataFrame:
+    if is_profile_fresh(dataset_name):
+        # Keep headers as raw strings, and floats exactly as written
+        profile = pd.read_csv(get_profile_path(dataset_name), converters={'column_header': str}, float_precision='round_trip')
+        if df is None or profile['column_header'].tolist() == [str(col) for col in df.columns]:
+            if df is not None:
+                profile['column_header'] = list(df.columns)
+            return profile.set_index('column_header')
+    return save_column_profile(dataset_name, df)
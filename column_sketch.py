@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+
+
+'''
+Streaming (sketch-based) column type inference for source tables larger than memory.
+The csv file is read in chunks of raw strings. For every column, the streaming statistics keep the row / null counts,
+the running numeric-parse ratio and HyperLogLog sketches of the distinct values, so memory does not grow with the table.
+Columns are then classified cate / quant / other with the same rules (and threshold) as utils.is_categorical and
+utils.is_quantitative, using the approximate distinct count instead of the exact nunique.
+'''
+
+
+# Strings parsed as booleans by pandas.read_csv (a boolean column is numeric for pandas)
+bool_strings = {'True', 'False', 'TRUE', 'FALSE', 'true', 'false'}
+
+
+'''
+Number of significant bits of every value of a uint64 array (0 for 0), computed exactly on 32-bit halves
+'''
+def bit_length(values: np.ndarray) -> np.ndarray:
+    high = (values >> np.uint64(32)).astype(np.float64)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    return np.where(high > 0, np.frexp(high)[1] + 32, np.frexp(low)[1]).astype(np.int64)
+
+
+'''
+HyperLogLog sketch of the number of distinct 64-bit hashes.
+precision p: 2^p registers, relative standard error about 1.04 / sqrt(2^p) (0.8% for p=14).
+Small cardinalities are estimated by linear counting (nearly exact).
+'''
+class HyperLogLog:
+    def __init__(self, p=14):
+        self.p = p
+        self.m = 1 << p
+        self.registers = np.zeros(self.m, dtype=np.uint8)
+
+    # Add an array of uint64 hashes
+    def add_hashes(self, hashes: np.ndarray):
+        if len(hashes) == 0:
+            return
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        index = (hashes >> np.uint64(64 - self.p)).astype(np.int64)
+        remaining = hashes & np.uint64((1 << (64 - self.p)) - 1)
+        # Position of the leftmost 1-bit in the remaining 64-p bits
+        rank = (64 - self.p) - bit_length(remaining) + 1
+        rank_max = pd.Series(rank).groupby(index).max()
+        positions = rank_max.index.values
+        self.registers[positions] = np.maximum(self.registers[positions], rank_max.values.astype(np.uint8))
+
+    # Merge another sketch with the same precision into this one
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> float:
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        raw = alpha * self.m * self.m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * self.m and zeros > 0:
+            return self.m * np.log(self.m / zeros)
+        return raw
+
+
+'''
+Hash values of a Series to uint64 (equal values give equal hashes, whatever the chunk)
+'''
+def hash_values(series: pd.Series) -> np.ndarray:
+    return pd.util.hash_pandas_object(series, index=False).values
+
+
+'''
+Streaming statistics of one column.
+Two sketches are kept: one of the raw strings, and one of the parsed numeric values.
+If every non-null value of the column parses as a number, pandas would read it as a numeric column
+(where '1' and '1.0' are the same value), so the numeric sketch is used; otherwise the raw string sketch is used.
+'''
+class StreamingColumnStats:
+    def __init__(self, p=14):
+        self.num_of_rows = 0
+        self.null_count = 0
+        self.numeric_count = 0
+        self.bool_count = 0
+        self.string_sketch = HyperLogLog(p)
+        self.numeric_sketch = HyperLogLog(p)
+        self.bool_values = set()
+
+    # Update with a chunk of raw strings (NaN for missing cells)
+    def update(self, chunk: pd.Series):
+        self.num_of_rows += len(chunk)
+        values = chunk.dropna()
+        self.null_count += len(chunk) - len(values)
+        if len(values) == 0:
+            return
+        self.string_sketch.add_hashes(hash_values(values))
+        numeric = pd.to_numeric(values, errors='coerce').dropna().astype(np.float64)
+        self.numeric_count += len(numeric)
+        # Adding 0.0 turns -0.0 into 0.0, which are the same value
+        self.numeric_sketch.add_hashes(hash_values(numeric + 0.0))
+        is_bool = values.isin(bool_strings)
+        self.bool_count += int(is_bool.sum())
+        if is_bool.any():
+            self.bool_values.update(values[is_bool].str.lower().unique())
+
+    # Merge the statistics of the same column from another part of the file
+    def merge(self, other):
+        self.num_of_rows += other.num_of_rows
+        self.null_count += other.null_count
+        self.numeric_count += other.numeric_count
+        self.bool_count += other.bool_count
+        self.string_sketch.merge(other.string_sketch)
+        self.numeric_sketch.merge(other.numeric_sketch)
+        self.bool_values.update(other.bool_values)
+
+    @property
+    def count(self):
+        return self.num_of_rows - self.null_count
+
+    # Ratio of non-null values that parse as numbers
+    @property
+    def numeric_ratio(self):
+        return self.numeric_count / self.count if self.count else 0.0
+
+    @property
+    def is_numeric(self):
+        return self.count > 0 and (self.numeric_count == self.count or self.bool_count == self.count)
+
+    # Approximate number of distinct non-null values
+    def approx_nunique(self):
+        if self.count == 0:
+            return 0
+        if self.bool_count == self.count:
+            return len(self.bool_values)
+        sketch = self.numeric_sketch if self.numeric_count == self.count else self.string_sketch
+        # A column cannot have more distinct values than non-null values
+        return min(int(round(sketch.estimate())), self.count)
+
+    # cate / quant / other, same rules as utils.is_categorical and utils.is_quantitative
+    def data_type(self, threshold=0.2):
+        if self.num_of_rows == 0:
+            return 'other'
+        ratio = self.approx_nunique() / self.num_of_rows
+        if ratio < threshold:
+            return 'cate'
+        elif self.is_numeric and ratio >= threshold:
+            return 'quant'
+        return 'other'
+
+
+'''
+Read a csv file in chunks and compute the streaming statistics of every column.
+Return {column_header: StreamingColumnStats} in the order of the columns of the file.
+'''
+def sketch_csv_columns(csv_file: str, chunksize: int = 100000, p: int = 14, **read_csv_kwargs):
+    stats = {}
+    for chunk in pd.read_csv(csv_file, chunksize=chunksize, dtype=str, **read_csv_kwargs):
+        for col in chunk.columns:
+            if col not in stats:
+                stats[col] = StreamingColumnStats(p)
+            stats[col].update(chunk[col])
+    if not stats:
+        # Header only: no chunk is produced
+        for col in pd.read_csv(csv_file, nrows=0, **read_csv_kwargs).columns:
+            stats[col] = StreamingColumnStats(p)
+    return stats
+
+
+'''
+Streaming summary of the columns of a csv file, one row per column:
+column_header, num_of_rows, null_count, numeric_ratio, approx_nunique, data_type
+'''
+def summarize_csv_columns(csv_file: str, chunksize: int = 100000, p: int = 14, threshold=0.2) -> pd.DataFrame:
+    stats = sketch_csv_columns(csv_file, chunksize=chunksize, p=p)
+    return pd.DataFrame([{
+        'column_header': col,
+        'num_of_rows': col_stats.num_of_rows,
+        'null_count': col_stats.null_count,
+        'numeric_ratio': col_stats.numeric_ratio,
+        'approx_nunique': col_stats.approx_nunique(),
+        'data_type': col_stats.data_type(threshold),
+    } for col, col_stats in stats.items()], columns=['column_header', 'num_of_rows', 'null_count', 'numeric_ratio', 'approx_nunique', 'data_type'])
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+from scipy.stats import chi2
+import pair_sharding
+
+
+'''
+Integer-coded contingency tables of categorical columns.
+Every column is factorized once into integer codes (categories in sorted order, -1 for missing values), so the
+contingency table of any pair is a single np.bincount over the combined codes instead of a pd.crosstab.
+Tables keep the full category sets of both columns; categories not observed on the complete rows of a pair are
+empty rows / columns, which pd.crosstab would not show, so they are left out of every test.
+'''
+
+
+'''
+Factorize the given columns of df into integer codes.
+Return (codes, sizes): codes is a n x k int64 matrix (sorted category order as in pd.crosstab, -1 for missing),
+sizes lists the number of categories of each column.
+'''
+def factorize_columns(df: pd.DataFrame, columns: list):
+    codes = np.empty((len(df), len(columns)), dtype=np.int64)
+    sizes = []
+    for index, col in enumerate(columns):
+        column_codes, categories = pd.factorize(df[col], sort=True)
+        codes[:, index] = column_codes
+        sizes.append(len(categories))
+    return codes, sizes
+
+
+'''
+Contingency table of two code vectors (size_x x size_y) over the rows where both are present.
+'''
+def contingency_table(codes_x: np.ndarray, codes_y: np.ndarray, size_x: int, size_y: int) -> np.ndarray:
+    complete = (codes_x >= 0) & (codes_y >= 0)
+    counts = np.bincount(codes_x[complete] * size_y + codes_y[complete], minlength=size_x * size_y)
+    return counts.reshape(size_x, size_y)
+
+
+'''
+Observed table of a contingency table: the table without its empty rows and columns, as pd.crosstab returns it.
+'''
+def observed_table(table: np.ndarray) -> np.ndarray:
+    return table[table.sum(axis=1) > 0][:, table.sum(axis=0) > 0]
+
+
+'''
+Chi-square independence tests of a list of contingency tables, in bulk: tables of the same shape are stacked and
+the prerequisites, statistics and p-values of the stack are computed at once. Empty rows / columns are masked out.
+Prerequisites (on the expected frequencies of the observed table):
+    no cell with expected frequency less than 1;
+    not more than 20% of the cells with expected frequency less than 5.
+The statistic is the one of scipy.stats.chi2_contingency (Yates' correction for 1 degree of freedom).
+Return (applicable, p_values, shapes): whether the prerequisites are met (and the table is not empty), the p-values
+(NaN where not applicable) and the shapes of the observed tables.
+'''
+def chi_square_tests(tables: list):
+    applicable = np.zeros(len(tables), dtype=bool)
+    p_values = np.full(len(tables), np.nan)
+    shapes = np.zeros((len(tables), 2), dtype=np.int64)
+    groups = {}
+    for index, table in enumerate(tables):
+        groups.setdefault(table.shape, []).append(index)
+    for indices in groups.values():
+        observed = np.stack([tables[index] for index in indices]).astype(np.float64)
+        row_totals = observed.sum(axis=2)
+        col_totals = observed.sum(axis=1)
+        total = row_totals.sum(axis=1)
+        rows = (row_totals > 0).sum(axis=1)
+        cols = (col_totals > 0).sum(axis=1)
+        cells = (row_totals > 0)[:, :, None] & (col_totals > 0)[:, None, :]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            expected = row_totals[:, :, None] * col_totals[:, None, :] / total[:, None, None]
+        # Condition 1: no cell should have expected frequency < 1
+        # Condition 2: not more than 20% of cells should have expected frequency less than 5
+        met = ~np.any(cells & (expected < 1), axis=(1, 2))
+        met &= ~(np.sum(cells & (expected < 5), axis=(1, 2)) > 0.2 * rows * cols)
+        met &= total > 0
+        dof = (rows - 1) * (cols - 1)
+        # Yates' correction, as chi2_contingency does for 1 degree of freedom
+        diff = expected - observed
+        corrected = observed + np.where((dof == 1)[:, None, None], np.minimum(0.5, np.abs(diff)) * np.sign(diff), 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            terms = np.where(cells, (corrected - expected) ** 2 / expected, 0)
+        statistics = terms.sum(axis=(1, 2))
+        p = np.where(dof == 0, 1.0, chi2.sf(statistics, np.maximum(dof, 1)))
+        applicable[indices] = met
+        p_values[indices] = np.where(met, p, np.nan)
+        shapes[indices] = np.stack([rows, cols], axis=1)
+    return applicable, p_values, shapes
+
+
+'''
+Stratified 2 x 2 tables of binary columns for a list of (strata, column 1, column 2) triples of column indices.
+codes are the 0/1 codes of the binary columns (n x b, -1 for missing). Every column is turned into one indicator per
+value, so the counts of all the (column 1, column 2) pairs within a stratum value are one matrix product of the
+indicators over the rows of that stratum; row chunks keep the indicator matrix small.
+Return a T x 2 x 2 x 2 count tensor: [triple, stratum value, column 1 value, column 2 value], over the rows where
+the three columns are present.
+With workers > 1, the triples are sharded over worker processes (pair_sharding); as the cost is the matrix products of
+the strata columns, every strata column weighs the same, however many triples it has.
+'''
+def stratified_tables(codes: np.ndarray, triples: list, chunk_rows=65536, workers: int = 1) -> np.ndarray:
+    n, b = codes.shape
+    triples = np.asarray(triples, dtype=np.int64).reshape(-1, 3)
+    if workers > 1:
+        _, strata_index, strata_triples = np.unique(triples[:, 0], return_inverse=True, return_counts=True)
+        blocks = pair_sharding.map_shards(_stratified_tables_of_triples, {'codes': codes}, triples, workers,
+                                          costs=1.0 / strata_triples[strata_index], args=(chunk_rows,))
+        return np.concatenate(blocks)
+    strata_columns = np.unique(triples[:, 0])
+    counts = np.zeros((b, 2, 2 * b, 2 * b))
+    for start in range(0, n, chunk_rows):
+        chunk = codes[start:start + chunk_rows]
+        # indicators[:, 2 * c + v] is 1 where column c has value v
+        indicators = (chunk[:, :, None] == np.arange(2)).reshape(len(chunk), 2 * b).astype(np.float64)
+        for strata_col in strata_columns:
+            for value in range(2):
+                rows = indicators[chunk[:, strata_col] == value]
+                counts[strata_col, value] += rows.T @ rows
+    counts = counts.reshape(b, 2, b, 2, b, 2)
+    return counts[triples[:, 0], :, triples[:, 1], :, triples[:, 2], :]
+
+
+def _stratified_tables_of_triples(arrays: dict, triples: np.ndarray, chunk_rows: int) -> np.ndarray:
+    return stratified_tables(arrays['codes'], triples, chunk_rows)
+
+
+'''
+Mantel-Haenszel tests (without continuity correction) of stratified 2 x 2 tables (T x strata x 2 x 2), all at once.
+As when the 2 x 2 tables of the strata are built with pd.crosstab and tested with
+statsmodels StratifiedTable(tables).test_null_odds(), a stratum only enters the test if its table has both values
+of both columns (all margins positive); the statistic and p-value are computed with the same operations.
+Return (tested, p_values): whether at least one stratum enters the test, and the p-values (NaN where not tested).
+'''
+def mantel_haenszel_tests(tables: np.ndarray):
+    tables = np.asarray(tables, dtype=np.float64)
+    a, b, c, d = tables[..., 0, 0], tables[..., 0, 1], tables[..., 1, 0], tables[..., 1, 1]
+    apb, apc, bpd, cpd = a + b, a + c, b + d, c + d
+    n = (a + c) + (b + d)
+    strata = (apb > 0) & (apc > 0) & (bpd > 0) & (cpd > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        statistic = np.where(strata, a - apb * apc / n, 0).sum(axis=1)
+        statistic = np.abs(statistic) ** 2
+        denom = apb * apc * bpd * cpd
+        denom /= (n ** 2 * (n - 1))
+        statistic /= np.where(strata, denom, 0).sum(axis=1)
+    tested = strata.any(axis=1)
+    p_values = np.where(tested, 1 - chi2.cdf(statistic, 1), np.nan)
+    return tested, p_values
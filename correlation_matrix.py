@@ -0,0 +1,485 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pair_sharding
+
+
+'''
+Correlation matrices of all the column pairs of a float matrix (NaN for missing values) in one shot.
+Missing values are handled pairwise-complete, as pandas.DataFrame.corr does: the coefficient of a pair is computed
+on the rows where both columns are present.
+Pairwise-complete sums are accumulated with matrix products over row chunks (columns shifted by their mean first,
+for numerical stability), so the cost is a few matrix products instead of one DataFrame operation per pair.
+Spearman ranks every column once; a column losing values on the complete rows of a pair is re-ranked from the
+presorted column in linear time.
+'''
+
+
+'''
+Pairwise-complete sums of a float matrix X (n rows, k columns, NaN for missing), accumulated over row chunks.
+Columns are shifted by their mean (which does not change covariances) before summing.
+Only the columns with missing values need a mask: for a pair whose second column is complete, the sums of the first
+column are its plain column sums. So the cost is one k x k matrix product and a few k x m ones (m masked columns).
+Return (count, sums, squares, products), k x k matrices where for the pair (i, j), over the rows where both are present:
+- count[i, j]: number of rows;
+- sums[i, j]: sum of column i;
+- squares[i, j]: sum of squares of column i;
+- products[i, j]: sum of products of column i and column j.
+'''
+def pairwise_complete_sums(X: np.ndarray, chunk_rows=65536):
+    X = np.asarray(X, dtype=np.float64)
+    n, k = X.shape
+    present = ~np.isnan(X)
+    shift = np.zeros(k)
+    has_values = present.any(axis=0)
+    shift[has_values] = np.nanmean(X[:, has_values], axis=0)
+    masked = np.flatnonzero(~present.all(axis=0))
+    column_sums = np.zeros(k)
+    column_squares = np.zeros(k)
+    masked_count = np.zeros((k, len(masked)))
+    masked_sums = np.zeros((k, len(masked)))
+    masked_squares = np.zeros((k, len(masked)))
+    products = np.zeros((k, k))
+    for start in range(0, n, chunk_rows):
+        chunk_present = present[start:start + chunk_rows]
+        values = np.where(chunk_present, X[start:start + chunk_rows] - shift, 0.0)
+        squared = values * values
+        column_sums += values.sum(axis=0)
+        column_squares += squared.sum(axis=0)
+        products += values.T @ values
+        if len(masked):
+            mask = chunk_present[:, masked].astype(np.float64)
+            masked_count += chunk_present.T.astype(np.float64) @ mask
+            masked_sums += values.T @ mask
+            masked_squares += squared.T @ mask
+    count = np.full((k, k), float(n))
+    count[:, masked] = masked_count
+    count[masked, :] = masked_count.T
+    sums = np.repeat(column_sums[:, None], k, axis=1)
+    sums[:, masked] = masked_sums
+    squares = np.repeat(column_squares[:, None], k, axis=1)
+    squares[:, masked] = masked_squares
+    return count, sums, squares, products
+
+
+'''
+Pearson correlation matrix from pairwise-complete sums, together with the centered sums of squares of column i
+(ss_x[i, j]) over the complete rows of the pair, used to detect constant columns.
+'''
+def pearson_from_sums(count, sums, squares, products):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ss_x = squares - sums * sums / count
+        sp = products - sums * sums.T / count
+        corr = sp / np.sqrt(ss_x * ss_x.T)
+    return corr, ss_x
+
+
+'''
+Average ranks (1-based, ties averaged as scipy.stats.rankdata 'average') of sorted values
+'''
+def average_ranks_of_sorted(sorted_values: np.ndarray) -> np.ndarray:
+    n = len(sorted_values)
+    if n == 0:
+        return np.zeros(0)
+    new_run = sorted_values[1:] != sorted_values[:-1]
+    if new_run.all():
+        return np.arange(1.0, n + 1)  # No ties
+    # Start position of every run of equal values, and the end position (exclusive)
+    starts = np.flatnonzero(np.r_[True, new_run])
+    ends = np.r_[starts[1:], n]
+    return np.repeat((starts + ends + 1) / 2.0, ends - starts)
+
+
+'''
+Rank every column of a float matrix X (n rows, k columns, NaN for missing values) on its own values.
+Return (order, sorted_values, own_count, ranks): k x n row order of every column (NaN sorted last), its sorted values,
+its number of values, and its average ranks (NaN for missing).
+'''
+def rank_columns(X: np.ndarray):
+    columns = np.ascontiguousarray(X.T)  # One contiguous row per column
+    k, n = columns.shape
+    order = np.argsort(columns, axis=1, kind='stable')  # NaN sorted last
+    sorted_values = np.take_along_axis(columns, order, axis=1)
+    own_count = (~np.isnan(columns)).sum(axis=1)
+    ranks = np.full((k, n), np.nan)
+    for col in range(k):
+        ranks[col, order[col, :own_count[col]]] = average_ranks_of_sorted(sorted_values[col, :own_count[col]])
+    return order, sorted_values, own_count, ranks
+
+
+'''
+Sums shared by the screening and the exact correlation matrices of a float matrix X (NaN for missing values):
+'values': pairwise_complete_sums of X; 'ranking': rank_columns of X; 'ranks': pairwise_complete_sums of the own
+ranks of the columns.
+'''
+def correlation_sums(X: np.ndarray, chunk_rows=65536) -> dict:
+    X = np.asarray(X, dtype=np.float64)
+    ranking = rank_columns(X)
+    return {'values': pairwise_complete_sums(X, chunk_rows=chunk_rows), 'ranking': ranking,
+            'ranks': pairwise_complete_sums(ranking[3].T, chunk_rows=chunk_rows)}
+
+
+'''
+Correlation matrices of all the column pairs of a float matrix X (n rows, k columns, NaN for missing values).
+Return a dict of k x k matrices:
+- 'count': number of complete rows of the pair;
+- 'valid': the pair has at least 2 complete rows and neither column is constant on them
+  (the pairs an extractor would skip are False);
+- 'pearson', 'spearman': correlation coefficients, pairwise-complete (NaN where not valid);
+- 'pcorr': partial correlation of the two columns given no other, as DataFrame.pcorr (pingouin) on the two columns,
+  i.e. computed from the 2 x 2 covariance matrix with each variance on the own rows of the column.
+pairs (k x k boolean matrix) restricts the per-pair work (constant checks, Spearman re-ranking, partial correlation)
+to the given pairs, e.g. the candidates of screen_correlated_pairs; the other pairs are not valid.
+precomputed: the correlation_sums of X when already computed (by the screening), not computed again.
+'''
+def pairwise_correlation_matrices(X: np.ndarray, chunk_rows=65536, pairs: np.ndarray = None, precomputed: dict = None) -> dict:
+    X = np.asarray(X, dtype=np.float64)
+    n, k = X.shape
+    present = ~np.isnan(X)
+    if precomputed is None:
+        precomputed = correlation_sums(X, chunk_rows=chunk_rows)
+    count, sums, squares, products = precomputed['values']
+    order, sorted_values, own_count, ranks = precomputed['ranking']
+    pearson, ss_x = pearson_from_sums(count, sums, squares, products)
+
+    # Constant check: a column constant on the complete rows has a centered sum of squares of 0 (up to rounding),
+    # candidates under a loose relative tolerance are checked exactly
+    valid = count >= 2
+    if pairs is not None:
+        valid &= pairs | pairs.T
+    with np.errstate(invalid='ignore'):
+        candidates = valid & ((ss_x <= 1e-8 * squares) | (ss_x.T <= 1e-8 * squares.T))
+    for i, j in zip(*np.nonzero(np.triu(candidates, 1))):
+        rows = present[:, i] & present[:, j]
+        if np.ptp(X[rows, i]) == 0 or np.ptp(X[rows, j]) == 0:
+            valid[i, j] = valid[j, i] = False
+    np.fill_diagonal(valid, False)
+    pearson[~valid] = np.nan
+
+    # Spearman: rank every column once on its own values (from the presorted column); if the complete rows of a pair
+    # keep all the values of a column, its ranks are the ranks in the pair, otherwise the column is re-ranked on
+    # the complete rows from its presorted values, in linear time
+    columns_present = np.ascontiguousarray(present.T)
+    spearman, _ = pearson_from_sums(*precomputed['ranks'])
+    rerank = valid & ((count != own_count[:, None]) | (count != own_count[None, :]))
+    for i, j in zip(*np.nonzero(np.triu(rerank, 1))):
+        rows = columns_present[i] & columns_present[j]
+        pair_ranks = []
+        for col, other in ((i, j), (j, i)):
+            if count[i, j] == own_count[col]:
+                pair_ranks.append(ranks[col, rows])
+            else:
+                keep = columns_present[other][order[col, :own_count[col]]]
+                col_ranks = np.empty(n)
+                col_ranks[order[col, :own_count[col]][keep]] = average_ranks_of_sorted(sorted_values[col, :own_count[col]][keep])
+                pair_ranks.append(col_ranks[rows])
+        # Mean of the ranks of m values is (m + 1) / 2, ties included
+        x = pair_ranks[0] - (count[i, j] + 1) / 2
+        y = pair_ranks[1] - (count[i, j] + 1) / 2
+        spearman[i, j] = spearman[j, i] = np.dot(x, y) / np.sqrt(np.dot(x, x) * np.dot(y, y))
+    spearman[~valid] = np.nan
+
+    # Partial correlation of two columns as pingouin computes it: pseudo-inverse of the 2 x 2 covariance matrix
+    # (pairwise-complete covariance, each variance on the own rows of the column)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        covariance = (products - sums * (sums.T / count)) / (count - 1)
+        variance = np.diag(ss_x) / (own_count - 1.0)
+        rows, cols = np.triu_indices(k, 1)
+        stacked = np.empty((len(rows), 2, 2))
+        stacked[:, 0, 0] = variance[rows]
+        stacked[:, 1, 1] = variance[cols]
+        stacked[:, 0, 1] = stacked[:, 1, 0] = covariance[rows, cols]
+        pair_valid = valid[rows, cols]
+        pcorr = np.full((k, k), np.nan)
+        if pair_valid.any():
+            inverse = np.linalg.pinv(stacked[pair_valid], hermitian=True)
+            scale = np.sqrt(1 / np.diagonal(inverse, axis1=1, axis2=2))
+            values = -inverse[:, 0, 1] * scale[:, 0] * scale[:, 1]
+            pcorr[rows[pair_valid], cols[pair_valid]] = values
+            pcorr[cols[pair_valid], rows[pair_valid]] = values
+    return {'count': count, 'valid': valid, 'pearson': pearson, 'spearman': spearman, 'pcorr': pcorr}
+
+
+'''
+Screening of the column pairs of a wide float matrix X (n rows, k columns, NaN for missing values) that may be strongly
+correlated, from two blocked matrix products: pairwise-complete Pearson, and Pearson of the ranks of every column on
+its own values (the Spearman coefficient of the pairs without missing values, an approximation otherwise: no
+per-pair re-ranking). Return the k x k boolean matrix of the candidate pairs, whose screening score
+max(|Pearson|, |Spearman|) is greater than threshold. precomputed: the correlation_sums of X, if already computed.
+With threshold <= 0.25, a pair whose Kendall tau is above 0.5 is a candidate: |3 tau - 2 rho| <= 1 (Daniels) gives
+|rho| > 0.25. The default leaves a margin for ties, missing values and the partial correlation (on own-row variances).
+'''
+def screen_correlated_pairs(X: np.ndarray, threshold=0.2, chunk_rows=65536, precomputed: dict = None) -> np.ndarray:
+    if precomputed is None:
+        precomputed = correlation_sums(X, chunk_rows=chunk_rows)
+    pearson, _ = pearson_from_sums(*precomputed['values'])
+    spearman, _ = pearson_from_sums(*precomputed['ranks'])
+    with np.errstate(invalid='ignore'):
+        candidates = np.fmax(np.abs(pearson), np.abs(spearman)) > threshold
+    np.fill_diagonal(candidates, False)
+    return candidates
+
+
+'''
+Pairs to compute exactly in screening mode: the candidates of screen_correlated_pairs, plus a random sample of
+sample_size other pairs (so that the weak pairs are still represented). Return (selected, candidates, precomputed):
+k x k boolean matrices, and the correlation_sums of X, to be passed on to pairwise_correlation_matrices.
+'''
+def screened_pairs(X: np.ndarray, threshold=0.2, sample_size=200, seed=0, chunk_rows=65536):
+    precomputed = correlation_sums(X, chunk_rows=chunk_rows)
+    candidates = screen_correlated_pairs(X, threshold=threshold, chunk_rows=chunk_rows, precomputed=precomputed)
+    selected = candidates.copy()
+    others = np.argwhere(np.triu(~candidates, 1))
+    if len(others) and sample_size > 0:
+        rng = np.random.default_rng(seed)
+        sample = others[np.sort(rng.choice(len(others), size=min(sample_size, len(others)), replace=False))]
+        selected[sample[:, 0], sample[:, 1]] = selected[sample[:, 1], sample[:, 0]] = True
+    return selected, candidates, precomputed
+
+
+# Compiled discordant pair count used by scipy.stats.kendalltau (Fenwick tree over y, x ties skipped), the primary
+# path of count_discordant_pairs; the merge sort count below is the fallback if this private function is not available
+try:
+    from scipy.stats._stats import _kendall_dis
+except ImportError:
+    _kendall_dis = None
+
+
+'''
+Number of inversions (pairs p < q with values[p] > values[q]) of an array of non-negative integers, by a bottom-up
+merge sort (log2(n) levels): at every level, adjacent sorted runs of width elements are merged, and each
+value of a right run is an inversion with the values of its left run greater than it. The runs of all the blocks are
+merged at once, values being offset by their block so that the runs of a level form two globally sorted arrays.
+'''
+def count_inversions(values: np.ndarray) -> int:
+    arranged = np.asarray(values, dtype=np.int64)
+    n = len(arranged)
+    if n < 2:
+        return 0
+    span = int(arranged.max()) + 1
+    positions = np.arange(n)
+    inversions = 0
+    width = 1
+    while width < n:
+        block = positions // (2 * width)
+        right = positions - block * 2 * width >= width
+        keys = block * span + arranged
+        left_keys, right_keys = keys[~right], keys[right]
+        # Left values of the block at most each right value (left runs before the block are full, all smaller keys)
+        left_at_most = np.searchsorted(left_keys, right_keys, side='right') - block[right] * width
+        inversions += int((width - left_at_most).sum())
+        # Right values of the block smaller than each left value (ties keep the left value first, the merge is stable)
+        right_below = np.searchsorted(right_keys, left_keys, side='left') - block[~right] * width
+        new_position = np.empty(n, dtype=np.int64)
+        new_position[~right] = positions[~right] + right_below
+        new_position[right] = positions[right] - width + left_at_most
+        merged = np.empty_like(arranged)
+        merged[new_position] = arranged
+        arranged = merged
+        width *= 2
+    return inversions
+
+
+'''
+Number of discordant pairs (x[p] < x[q] and y[p] > y[q]) of dense ranks x (ascending) and y (from 1), as _kendall_dis:
+the compiled count of scipy if available, else the inversions of y minus those within groups of tied x (the inversions
+of the key (x, y)), counted by merge sort.
+'''
+def count_discordant_pairs(x: np.ndarray, y: np.ndarray) -> int:
+    if _kendall_dis is not None:
+        return _kendall_dis(np.ascontiguousarray(x, dtype=np.intp), np.ascontiguousarray(y, dtype=np.intp))
+    x = np.asarray(x, dtype=np.int64)
+    y = np.asarray(y, dtype=np.int64)
+    return count_inversions(y) - count_inversions(x * (int(y.max()) + 1) + y)
+
+
+'''
+Number of tied pairs from the dense ranks of values (as scipy.stats.kendalltau counts xtie / ytie)
+'''
+def count_tied_pairs(dense_ranks: np.ndarray) -> int:
+    return count_tied_pairs_of_counts(np.bincount(dense_ranks))
+
+
+def count_tied_pairs_of_counts(counts: np.ndarray) -> int:
+    counts = counts.astype(np.int64)
+    counts = counts[counts > 1]
+    return int((counts * (counts - 1) // 2).sum())
+
+
+'''
+Kendall tau-b of all the column pairs of a float matrix X (n rows, k columns, NaN for missing values), pairwise-complete,
+equal to scipy.stats.kendalltau (as used by DataFrame.corr(method='kendall')) on the complete rows of each pair.
+Every column is sorted once (its order and dense ranks are reused by all its pairs): the rows of a pair are taken in the
+order of the first column, and the discordant pairs are counted on the ranks of the second in O(n log n).
+Only the pairs where pairs[i, j] is True are computed (all pairs with at least 2 complete rows by default);
+return a k x k matrix, NaN elsewhere. With workers > 1, the pairs are sharded over worker processes (pair_sharding).
+'''
+def pairwise_kendall_tau(X: np.ndarray, pairs: np.ndarray = None, workers: int = 1) -> np.ndarray:
+    X = np.asarray(X, dtype=np.float64)
+    n, k = X.shape
+    columns = np.ascontiguousarray(X.T)
+    present = ~np.isnan(columns)
+    own_count = present.sum(axis=1)
+    order = np.argsort(columns, axis=1, kind='stable')  # NaN sorted last
+    dense_ranks = np.zeros((k, n), dtype=np.intp)  # 1-based dense ranks, 0 for missing
+    tied_pairs = np.zeros(k, dtype=np.int64)  # Tied pairs of every column on its own rows
+    for col in range(k):
+        sorted_values = columns[col, order[col, :own_count[col]]]
+        dense_ranks[col, order[col, :own_count[col]]] = np.r_[True, sorted_values[1:] != sorted_values[:-1]].cumsum()
+        tied_pairs[col] = count_tied_pairs(dense_ranks[col, present[col]])
+
+    tau = np.full((k, k), np.nan)
+    if pairs is None:
+        pairs = (present.astype(np.float64) @ present.T.astype(np.float64)) >= 2
+    pair_list = np.argwhere(np.triu(pairs, 1))
+    arrays = {'order': order, 'dense_ranks': dense_ranks, 'present': present, 'own_count': own_count, 'tied_pairs': tied_pairs}
+    values = np.concatenate([np.empty(0)] + pair_sharding.map_shards(_kendall_tau_of_pairs, arrays, pair_list, workers))
+    tau[pair_list[:, 0], pair_list[:, 1]] = tau[pair_list[:, 1], pair_list[:, 0]] = values
+    return tau
+
+
+'''
+Kendall tau-b of a block of pairs (p x 2 array of column positions) from the sorted columns prepared by
+pairwise_kendall_tau; NaN for the pairs with less than 2 complete rows or a constant column.
+'''
+def _kendall_tau_of_pairs(arrays: dict, pairs: np.ndarray) -> np.ndarray:
+    order, dense_ranks, present = arrays['order'], arrays['dense_ranks'], arrays['present']
+    own_count, tied_pairs = arrays['own_count'], arrays['tied_pairs']
+    n = order.shape[1]
+    tau = np.full(len(pairs), np.nan)
+    for index, (i, j) in enumerate(pairs):
+        rows = order[i, :own_count[i]]  # Rows in the order of column i
+        complete = own_count[j] == n  # Column j has no missing values
+        if not complete:
+            rows = rows[present[j, rows]]
+        size = len(rows)
+        if size < 2:
+            continue
+        x = dense_ranks[i, rows]
+        y = dense_ranks[j, rows]
+        if complete and own_count[i] == n:
+            xtie, ytie = int(tied_pairs[i]), int(tied_pairs[j])
+        else:
+            xtie, ytie = count_tied_pairs(x), count_tied_pairs(y)
+        tot = (size * (size - 1)) // 2
+        if xtie == tot or ytie == tot:
+            continue
+        # Pairs tied in both columns (none if one of them has no ties)
+        ntie = 0
+        if xtie and ytie:
+            joint = x.astype(np.int64) * (int(y.max()) + 1) + y
+            if joint.max() < 4 * size:
+                joint_counts = np.bincount(joint)
+            else:
+                _, joint_counts = np.unique(joint, return_counts=True)
+            ntie = count_tied_pairs_of_counts(joint_counts)
+        dis = count_discordant_pairs(x, y)
+        con_minus_dis = tot - xtie - ytie + ntie - 2 * dis
+        value = con_minus_dis / np.sqrt(tot - xtie) / np.sqrt(tot - ytie)
+        tau[index] = min(1., max(-1., value))
+    return tau
+
+
+'''
+First-order partial correlations r(x, y | control) of column triples of a float matrix X (NaN for missing values),
+equal to pingouin.partial_corr(data, x, y, covar=control) on the same columns (listwise deletion within each triple).
+triples: int array (t x 3) of column positions (x, y, control).
+- Triples are grouped by the set of their columns with missing values, so that a group shares its complete rows;
+  within a group the closed form on the correlation matrix of those rows is vectorized over all the triples:
+  r = (r_xy - r_xc * r_yc) / sqrt((1 - r_xc^2) * (1 - r_yc^2));
+- Ill-conditioned triples (collinear or constant columns, or badly scaled covariance matrices, where the
+  pseudo-inverse of pingouin truncates or loses precision) are computed as pingouin does: pseudo-inverse of the
+  3 x 3 covariance matrix of their complete rows, batched.
+Return (r, count): arrays of the coefficients (NaN where undefined or count < 3) and the number of complete rows.
+With workers > 1, the triples are sharded over worker processes (pair_sharding).
+'''
+def partial_correlation_triples(X: np.ndarray, triples: np.ndarray, workers: int = 1):
+    X = np.asarray(X, dtype=np.float64)
+    triples = np.asarray(triples, dtype=np.intp).reshape(-1, 3)
+    present = ~np.isnan(X)
+
+    # Group the triples by their columns with missing values (the empty group has all the rows):
+    # key of a triple = its sorted masked columns, -1 for the others; the triples of a group are kept in their order
+    masked = ~present.all(axis=0)
+    keys = np.sort(np.where(masked[triples], triples, -1), axis=1)
+    _, group_of_triples = np.unique(keys.reshape(-1, 3), axis=0, return_inverse=True)
+    order = np.argsort(group_of_triples.ravel(), kind='stable')
+    group_sizes = np.bincount(group_of_triples.ravel()) if len(triples) else np.zeros(0, dtype=np.int64)
+    group_starts = np.concatenate([[0], np.cumsum(group_sizes)[:-1]]).astype(np.int64)
+
+    # The triples are sharded in group order; a block computes the correlation matrix of a group on the columns of
+    # the whole group, so that the results do not depend on the number of workers
+    arrays = {'X': X, 'triples': triples[order], 'group_starts': group_starts, 'group_sizes': group_sizes,
+              'groups': group_of_triples.ravel()[order]}
+    blocks = pair_sharding.map_shards(_partial_correlation_of_triples, arrays, np.arange(len(triples)), workers)
+    r = np.full(len(triples), np.nan)
+    count = np.zeros(len(triples), dtype=np.int64)
+    r[order] = np.concatenate([np.empty(0)] + [block[0] for block in blocks])
+    count[order] = np.concatenate([np.zeros(0, dtype=np.int64)] + [block[1] for block in blocks])
+    return r, count
+
+
+'''
+Partial correlations of a contiguous block of the triples sorted by group (see partial_correlation_triples).
+The triples of group g are triples[group_starts[g]:group_starts[g] + group_sizes[g]]. Return (r, count) of the block.
+'''
+def _partial_correlation_of_triples(arrays: dict, block: np.ndarray):
+    X, triples, groups = arrays['X'], arrays['triples'], arrays['groups']
+    present = ~np.isnan(X)
+    masked = ~present.all(axis=0)
+    r = np.full(len(block), np.nan)
+    count = np.zeros(len(block), dtype=np.int64)
+    if not len(block):
+        return r, count
+    first = block[0]
+    # Runs of the same group within the block
+    run_starts = np.flatnonzero(np.r_[True, groups[block[1:]] != groups[block[:-1]]])
+
+    ill_conditioned = []
+    for members in np.split(block, run_starts[1:]):
+        group_start = arrays['group_starts'][groups[members[0]]]
+        masked_columns = [col for col in triples[members[0]] if masked[col]]
+        rows = present[:, masked_columns].all(axis=1)
+        count[members - first] = rows.sum()
+        if count[members[0] - first] <= 2:
+            continue
+        columns = np.unique(triples[group_start:group_start + arrays['group_sizes'][groups[members[0]]]])
+        positions = np.searchsorted(columns, triples[members])
+        values = X[rows][:, columns]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            R = np.corrcoef(values, rowvar=False)
+            variance = np.var(values, axis=0)[positions]
+            r_xy = R[positions[:, 0], positions[:, 1]]
+            r_xc = R[positions[:, 0], positions[:, 2]]
+            r_yc = R[positions[:, 1], positions[:, 2]]
+            determinant = 1 - r_xy ** 2 - r_xc ** 2 - r_yc ** 2 + 2 * r_xy * r_xc * r_yc
+            closed_form = (r_xy - r_xc * r_yc) / np.sqrt((1 - r_xc ** 2) * (1 - r_yc ** 2))
+            # Lower bound of the ratio of the extreme eigenvalues of the 3 x 3 covariance matrix
+            condition_bound = determinant / 27 * variance.min(axis=1) / variance.max(axis=1)
+        well_conditioned = np.isfinite(closed_form) & (condition_bound > 1e-6)
+        r[members[well_conditioned] - first] = closed_form[well_conditioned]
+        ill_conditioned.extend(members[~well_conditioned])
+
+    # As pingouin for the ill-conditioned triples: covariance of the complete rows of the triple, then pseudo-inverse
+    if ill_conditioned:
+        covariances = []
+        for t in ill_conditioned:
+            rows = present[:, triples[t]].all(axis=1)
+            covariances.append(np.cov(X[rows][:, triples[t]].T, ddof=1))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            inverse = np.linalg.pinv(np.array(covariances), hermitian=True)
+            D = np.zeros_like(inverse)
+            D[:, [0, 1, 2], [0, 1, 2]] = np.sqrt(1 / np.diagonal(inverse, axis1=1, axis2=2))
+            r[np.array(ill_conditioned) - first] = -(D @ inverse @ D)[:, 0, 1]
+    return r, count
+
+
+'''
+Two-sided p-values of (partial) correlation coefficients, as pingouin: t = r * sqrt(dof / (1 - r^2)) with
+dof = count - covariates - 2, vectorized.
+'''
+def correlation_pvalues(r: np.ndarray, count: np.ndarray, covariates=0) -> np.ndarray:
+    from scipy.stats import t
+    dof = np.asarray(count) - covariates - 2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        tval = r * np.sqrt(dof / (1 - r ** 2))
+        return 2 * t.sf(np.abs(tval), dof)
@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+
+
+'''
+Descriptive statistics of columns in one pass, in memory or over a csv file read in chunks.
+- Moments (mean, standard deviation, skewness, kurtosis) come from the central sums of one pass over the values
+  (StreamingMoments). Chunks are combined with the pairwise update of the central moments (Welford / Chan / Pebay),
+  so a file larger than memory gives exact moments in one scan; on a single chunk, the operations are those of
+  pandas (mean, std with ddof=0, skew, kurtosis).
+- Min, max, median and quartiles come from one sort and one multi-quantile call; over chunks, from a mergeable
+  quantile sketch (QuantileSketch) whose size sets the accuracy, exact as long as the sketch holds every value.
+- The mode of a categorical column comes from its value counts, merged over the chunks.
+'''
+QUARTILES = [0, 0.25, 0.5, 0.75, 1]
+
+
+# As pandas nanops: central sums below 1e-14 are floating-point noise
+def _zero_out_fperr(value):
+    return value.dtype.type(0) if np.abs(value) < 1e-14 else value
+
+
+'''
+Streaming central moments of a numeric column: size n, sum, mean and the central sums m2, m3, m4.
+update() adds a chunk of values (no missing values); merge() adds the moments of another part of the column.
+'''
+class StreamingMoments:
+    def __init__(self):
+        self.n = 0
+        self.sum = np.float64(0.0)
+        self.mean = np.float64(np.nan)
+        self.m2 = self.m3 = self.m4 = np.float64(0.0)
+
+    def update(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return
+        # Two passes over the chunk: its mean, then the powers of the deviations from it
+        total = values.sum(dtype=np.float64)
+        mean = total / len(values)
+        adjusted = values - mean
+        adjusted2 = adjusted ** 2
+        self.sum += total
+        self._combine(len(values), mean, adjusted2.sum(dtype=np.float64), (adjusted2 * adjusted).sum(dtype=np.float64),
+                      (adjusted2 ** 2).sum(dtype=np.float64))
+
+    def merge(self, other):
+        if other.n:
+            self.sum += other.sum
+            self._combine(other.n, other.mean, other.m2, other.m3, other.m4)
+
+    def _combine(self, n_b, mean_b, m2_b, m3_b, m4_b):
+        if self.n == 0:
+            self.n, self.mean, self.m2, self.m3, self.m4 = n_b, mean_b, m2_b, m3_b, m4_b
+            return
+        n_a, mean_a, m2_a, m3_a, m4_a = self.n, self.mean, self.m2, self.m3, self.m4
+        n = n_a + n_b
+        delta = mean_b - mean_a
+        delta_n = delta / n
+        self.mean = mean_a + delta_n * n_b
+        self.m2 = m2_a + m2_b + delta * delta_n * n_a * n_b
+        self.m3 = (m3_a + m3_b + delta * delta_n ** 2 * n_a * n_b * (n_a - n_b)
+                   + 3 * delta_n * (n_a * m2_b - n_b * m2_a))
+        self.m4 = (m4_a + m4_b + delta * delta_n ** 3 * n_a * n_b * (n_a * n_a - n_a * n_b + n_b * n_b)
+                   + 6 * delta_n ** 2 * (n_a * n_a * m2_b + n_b * n_b * m2_a) + 4 * delta_n * (n_a * m3_b - n_b * m3_a))
+        self.n = n
+
+    # Population standard deviation (ddof=0), as np.std
+    def std(self):
+        return np.sqrt(self.m2 / self.n) if self.n else np.float64(np.nan)
+
+    # Adjusted Fisher-Pearson skewness G1, as pandas Series.skew
+    def skewness(self):
+        count = np.float64(self.n)
+        if count < 3:
+            return np.nan
+        m2, m3 = _zero_out_fperr(self.m2), _zero_out_fperr(self.m3)
+        if m2 == 0:
+            return 0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return (count * (count - 1) ** 0.5 / (count - 2)) * (m3 / m2 ** 1.5)
+
+    # Adjusted excess kurtosis G2, as pandas Series.kurtosis
+    def kurtosis(self):
+        count = np.float64(self.n)
+        if count < 4:
+            return np.nan
+        with np.errstate(invalid='ignore', divide='ignore'):
+            adj = 3 * (count - 1) ** 2 / ((count - 2) * (count - 3))
+            numerator = _zero_out_fperr(count * (count + 1) * (count - 1) * self.m4)
+            denominator = _zero_out_fperr((count - 2) * (count - 3) * self.m2 ** 2)
+            if denominator == 0:
+                return 0
+            return numerator / denominator - adj
+
+
+'''
+Mergeable quantile sketch of a numeric column (compactors, as in the KLL / MRL sketches).
+Values enter level 0 with weight 1; when a level holds more than size values, they are sorted and every other one
+(from a random offset) moves to the next level with twice the weight. A query ranks the weighted values.
+The rank error is at most log2(n / size) / size of the n values (much less in practice, the offsets being random), and
+the quantiles are exact (as np.percentile, linear interpolation) while the sketch holds every value.
+Min and max are kept exactly.
+'''
+class QuantileSketch:
+    def __init__(self, size=4096, seed=0):
+        self.size = size
+        self.levels = [np.empty(0)]
+        self.n = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values: np.ndarray):
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return
+        self.n += len(values)
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compact()
+
+    def merge(self, other):
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        for level, values in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level] = np.concatenate([self.levels[level], values])
+        self._compact()
+
+    def _compact(self):
+        level = 0
+        while level < len(self.levels):
+            values = self.levels[level]
+            if len(values) > self.size:
+                values = np.sort(values)
+                # An even number of values is compacted, so that the total weight does not change
+                keep = values[len(values) - len(values) % 2:]
+                promoted = values[:len(values) - len(values) % 2][self._rng.integers(2)::2]
+                self.levels[level] = keep
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    @property
+    def exact(self):
+        return len(self.levels) == 1
+
+    '''
+    Quantiles of the column at the probabilities qs (np.nan if the column is empty)
+    '''
+    def quantiles(self, qs) -> np.ndarray:
+        qs = np.asarray(qs, dtype=np.float64)
+        if self.n == 0:
+            return np.full(len(qs), np.nan)
+        if self.exact:
+            return np.percentile(self.levels[0], qs * 100)
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level_values), 2.0 ** level) for level, level_values in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        values, cumulative = values[order], np.cumsum(weights[order])
+        ranks = qs * (self.n - 1)
+        result = values[np.minimum(np.searchsorted(cumulative, ranks, side='right'), len(values) - 1)]
+        return np.where(qs <= 0, self.min, np.where(qs >= 1, self.max, result))
+
+
+'''
+Descriptive statistics of one column in memory (quant: non-missing values; cate: all the values).
+Return a dict with 'mean', 'median', 'range', 'quartiles' (values at QUARTILES), 'std', 'skewness' and 'kurtosis' for
+a quant column, 'mode' for a cate one; values are numpy scalars as pandas returns them (range keeps the column dtype).
+'''
+def describe_column(series: pd.Series, data_type: str) -> dict:
+    if data_type == 'cate':
+        modes = series.mode()
+        return {'mode': modes.iloc[0] if not modes.empty else np.nan}
+    values = series.dropna().to_numpy()
+    moments = StreamingMoments()
+    moments.update(values)
+    if len(values) == 0:
+        return {'mean': np.nan, 'median': np.nan, 'range': np.nan, 'quartiles': np.full(len(QUARTILES), np.nan),
+                'std': np.nan, 'skewness': np.nan, 'kurtosis': np.nan}
+    sorted_values = np.sort(values)
+    middle = len(sorted_values) // 2
+    floats = sorted_values[middle - 1:middle + 1].astype(np.float64)
+    return {
+        # As pandas: the values are summed in float64 as they are (the moments sum them converted to float64 first)
+        'mean': values.sum(dtype=np.float64) / len(values),
+        # As np.median: middle value, or mean of the two middle values
+        'median': floats[-1] if len(sorted_values) % 2 else (floats[0] + floats[1]) / 2,
+        'range': sorted_values[-1] - sorted_values[0],
+        'quartiles': np.percentile(sorted_values, np.array(QUARTILES) * 100),
+        'std': moments.std(),
+        'skewness': moments.skewness(),
+        'kurtosis': moments.kurtosis(),
+    }
+
+
+'''
+Descriptive statistics of the columns of a csv file read in chunks (one scan, memory independent of the file size).
+data_types: {column_header: 'quant' / 'cate' / other}, the other columns are skipped.
+Quant columns keep streaming moments and a quantile sketch of sketch_size values (median and quartiles are exact as
+long as the column has at most sketch_size values); cate columns keep the counts of their values, read as text and
+typed at the end as a full read_csv would type them.
+Return {column_header: dict as describe_column} in the order of the columns of the file.
+'''
+def describe_csv(csv_file: str, data_types: dict, chunksize: int = 100000, sketch_size: int = 4096) -> dict:
+    columns = list(pd.read_csv(csv_file, nrows=0).columns)
+    quant_columns = [col for col in columns if data_types.get(col) == 'quant']
+    cate_columns = [col for col in columns if data_types.get(col) == 'cate']
+    moments = {col: StreamingMoments() for col in quant_columns}
+    sketches = {col: QuantileSketch(sketch_size) for col in quant_columns}
+    # Exact min / max in the dtype of the column (the range of an integer column stays an integer)
+    minimums, maximums, integer = {}, {}, {col: True for col in quant_columns}
+    counts = {col: pd.Series(dtype=np.int64) for col in cate_columns}
+    reader = pd.read_csv(csv_file, usecols=quant_columns + cate_columns, dtype={col: str for col in cate_columns},
+                         chunksize=chunksize)
+    for chunk in reader:
+        for col in quant_columns:
+            series = pd.to_numeric(chunk[col], errors='coerce').dropna()
+            if series.empty:
+                continue
+            integer[col] = integer[col] and pd.api.types.is_integer_dtype(series)
+            values = series.to_numpy()
+            moments[col].update(values)
+            sketches[col].update(values)
+            minimums[col] = min(minimums.get(col, values.min()), values.min())
+            maximums[col] = max(maximums.get(col, values.max()), values.max())
+        for col in cate_columns:
+            counts[col] = counts[col].add(chunk[col].value_counts(), fill_value=0)
+
+    described = {}
+    for col in columns:
+        if col in moments:
+            if moments[col].n == 0:
+                described[col] = describe_column(pd.Series([], dtype=np.float64), 'quant')
+                continue
+            value_range = maximums[col] - minimums[col]
+            described[col] = {
+                'mean': moments[col].sum / moments[col].n,
+                'median': sketches[col].quantiles([0.5])[0],
+                'range': value_range if integer[col] else np.float64(value_range),
+                'quartiles': sketches[col].quantiles(QUARTILES),
+                'std': moments[col].std(),
+                'skewness': moments[col].skewness(),
+                'kurtosis': moments[col].kurtosis(),
+            }
+        elif col in counts:
+            described[col] = {'mode': _mode_of_counts(counts[col])}
+    return described
+
+
+# Mode from the counts of the text values of a column: values typed as numbers when they all are, then, as
+# Series.mode, the smallest of the most frequent values
+def _mode_of_counts(counts: pd.Series):
+    if counts.empty:
+        return np.nan
+    try:
+        values = pd.to_numeric(pd.Series(counts.index))
+    except (ValueError, TypeError):
+        values = pd.Series(counts.index)
+    counts = pd.Series(counts.values).groupby(values.values).sum()
+    return counts.index[counts.values == counts.max()].sort_values()[0]
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import json
+import os
+import path
+import utils
+
+
+'''
+Manifest of the incremental extraction (Extraction/info_extraction.py --incremental).
+The manifest records, for every plugin and dataset, the key it was extracted with: plugin version, content hash of the
+processed dataset and content hash of its column metadata. A (plugin, dataset) whose key is unchanged is not
+extracted again; new or changed datasets are.
+The rows of every (output, dataset) are kept as a csv fragment, written as the extraction writes them; an output is
+rebuilt by concatenating the fragments of its datasets in dataset order (with one header), which gives the same file
+as a full run, so the rows of a changed dataset are replaced instead of appended again.
+Both live in the metadata folder; the stamps (size, mtime) of the outputs written by the last incremental run are
+kept too, so that an output modified or deleted since then is rebuilt.
+'''
+
+
+'''
+Content hash of a file, None if it does not exist
+'''
+def file_hash(file_path, chunk_size=1 << 20):
+    if not os.path.exists(file_path):
+        return None
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExtractionManifest:
+    def __init__(self, manifest_path=None, fragment_dir=None):
+        self.manifest_path = manifest_path if manifest_path is not None else path.meta_dir + path.extraction_manifest_file
+        self.fragment_dir = fragment_dir if fragment_dir is not None else path.meta_dir + path.extraction_fragment_dir
+        # plugin name -> {dataset name: [plugin version, dataset hash, metadata hash]}
+        self.entries = {}
+        # output name -> [size, mtime_ns] of the output file written by the last incremental run
+        self.outputs = {}
+        if os.path.exists(self.manifest_path) and os.path.getsize(self.manifest_path) > 0:
+            with open(self.manifest_path, 'r', encoding='utf-8') as file:
+                saved = json.load(file)
+            self.entries = saved.get('entries', {})
+            self.outputs = saved.get('outputs', {})
+
+    # Content hashes of the processed dataset and of its column metadata
+    @staticmethod
+    def dataset_key(dataset_name):
+        return [file_hash(path.processed_dir + dataset_name + '.csv'),
+                file_hash(utils.col_meta_store.metadata_path(dataset_name))]
+
+    def is_fresh(self, plugin_name, version, dataset_name, key):
+        return self.entries.get(plugin_name, {}).get(dataset_name) == [version] + list(key)
+
+    def record(self, plugin_name, version, dataset_name, key):
+        self.entries.setdefault(plugin_name, {})[dataset_name] = [version] + list(key)
+
+    def forget(self, plugin_name, dataset_name):
+        self.entries.get(plugin_name, {}).pop(dataset_name, None)
+
+    def datasets(self, plugin_name):
+        return list(self.entries.get(plugin_name, {}))
+
+    def fragment_path(self, output_name, dataset_name):
+        return f"{self.fragment_dir}{output_name}/{dataset_name}.csv"
+
+    def remove_fragments(self, output_names, dataset_name):
+        for output_name in output_names:
+            fragment_path = self.fragment_path(output_name, dataset_name)
+            if os.path.exists(fragment_path):
+                os.remove(fragment_path)
+
+    '''
+    Replace the fragments of a dataset for the given outputs by the frames of its extraction ((output_name, frame)
+    in the order they were saved), written as utils.write_extracted_info writes them.
+    '''
+    def replace_fragments(self, output_names, dataset_name, collected):
+        self.remove_fragments(output_names, dataset_name)
+        for output_name, new_data in collected:
+            if output_name not in output_names:
+                continue
+            fragment_path = self.fragment_path(output_name, dataset_name)
+            os.makedirs(os.path.dirname(fragment_path), exist_ok=True)
+            if os.path.isfile(fragment_path) and os.path.getsize(fragment_path) > 0:
+                new_data.to_csv(fragment_path, mode='a', header=False, index=False)
+            else:
+                new_data.to_csv(fragment_path, mode='w', header=True, index=False)
+
+    '''
+    Rebuild an output file from the fragments of the datasets, in the given order: the first fragment is copied
+    whole, the others without their header line. No fragment: no output file.
+    '''
+    def assemble_output(self, output_name, dataset_names):
+        output_path = path.info_dir + output_name + '.csv'
+        temp_path = f"{output_path}.{os.getpid()}.tmp"
+        written = False
+        with open(temp_path, 'wb') as output:
+            for dataset_name in dataset_names:
+                fragment_path = self.fragment_path(output_name, dataset_name)
+                if not os.path.exists(fragment_path):
+                    continue
+                with open(fragment_path, 'rb') as fragment:
+                    if written:
+                        fragment.readline()  # Header
+                    output.write(fragment.read())
+                written = True
+        if written:
+            os.replace(temp_path, output_path)
+        else:
+            os.remove(temp_path)
+            if os.path.exists(output_path):
+                os.remove(output_path)
+
+    @staticmethod
+    def output_stamp(output_name):
+        output_path = path.info_dir + output_name + '.csv'
+        if not os.path.exists(output_path):
+            return None
+        stat = os.stat(output_path)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    # Whether an output was modified or deleted since the last incremental run wrote it
+    def output_changed(self, output_name):
+        return self.outputs.get(output_name) != self.output_stamp(output_name)
+
+    def record_output(self, output_name):
+        self.outputs[output_name] = self.output_stamp(output_name)
+
+    # Persist the manifest (written to a temporary file then renamed)
+    def save(self):
+        os.makedirs(os.path.dirname(self.manifest_path) or '.', exist_ok=True)
+        temp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump({'entries': self.entries, 'outputs': self.outputs}, file, indent=1)
+        os.replace(temp_path, self.manifest_path)
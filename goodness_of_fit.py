@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+from scipy.stats import distributions
+
+# p-value table of statsmodels lilliefors (pvalmethod='table'); the public lilliefors is run per column if this private
+# table is not available
+try:
+    from statsmodels.stats._lilliefors import lilliefors_table_norm
+except ImportError:
+    lilliefors_table_norm = None
+
+
+'''
+One-sample goodness-of-fit tests of many columns in one shot.
+Every sample is sorted once and all the sorted samples are packed into one array, so each theoretical CDF (normal,
+exponential, uniform, gamma with shape 2) is evaluated once over all the columns. The KS, Lilliefors and
+Anderson-Darling statistics are then derived per column from the same empirical CDF (the rank i / n of the sorted
+values), with the same operations as scipy.stats.kstest, statsmodels lilliefors and scipy.stats.anderson.
+Location / scale estimates are computed on the samples in their original order, as those functions do.
+'''
+GOF_DISTRIBUTIONS = ['Normal', 'Exponential', 'Uniform', 'Gamma']
+
+# Critical values of the Anderson-Darling normality test (significance levels 15, 10, 5, 2.5, 1 %), as scipy.stats.anderson
+_Avals_norm = np.array([0.576, 0.656, 0.787, 0.918, 1.092])
+
+
+'''
+Sorted samples packed into one array.
+Return (values, starts, sizes, segments): concatenated sorted samples, start and size of each sample, and the sample
+index of every value.
+'''
+def pack_sorted_samples(samples: list):
+    sizes = np.array([len(sample) for sample in samples], dtype=np.int64)
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int64)
+    values = np.concatenate([np.sort(sample) for sample in samples]) if len(samples) else np.empty(0)
+    segments = np.repeat(np.arange(len(samples)), sizes)
+    return values, starts, sizes, segments
+
+
+'''
+Two-sided KS statistics of packed sorted samples from their CDF values, as scipy.stats.kstest:
+D+ = max(i / n - F(x_i)), D- = max(F(x_i) - (i - 1) / n), D = max(D+, D-), per sample.
+'''
+def ks_statistics(cdfvals: np.ndarray, starts: np.ndarray, sizes: np.ndarray, segments: np.ndarray) -> np.ndarray:
+    ranks = np.arange(len(cdfvals)) - starts[segments]  # i - 1
+    n = sizes[segments].astype(np.float64)
+    d_plus = np.maximum.reduceat((ranks + 1.0) / n - cdfvals, starts)
+    d_minus = np.maximum.reduceat(cdfvals - ranks / n, starts)
+    return np.where(d_plus > d_minus, d_plus, d_minus)
+
+
+'''
+p-values of the one-sample KS test (scipy.stats.kstest, mode 'auto' is always exact) for statistics d and sizes n.
+'''
+def ks_pvalues(d: np.ndarray, sizes: np.ndarray) -> np.ndarray:
+    return np.clip(distributions.kstwo.sf(d, sizes), 0, 1)
+
+
+'''
+Anderson-Darling normality statistics of packed sorted samples standardized with the sample standard deviation
+(w = (x - mean) / std, ddof=1), as scipy.stats.anderson: A2 = -n - sum((2i - 1) / n * (log F(w_i) + log S(w_{n+1-i}))).
+The sum of each sample is taken over its own contiguous terms, so it is accumulated as np.sum does on one sample.
+Return (statistics, critical values at the 15% significance level).
+'''
+def anderson_norm_statistics(w: np.ndarray, starts: np.ndarray, sizes: np.ndarray, segments: np.ndarray):
+    logcdf = distributions.norm.logcdf(w)
+    logsf = distributions.norm.logsf(w)
+    ranks = np.arange(len(w)) - starts[segments]
+    n = sizes[segments]
+    reversed_logsf = logsf[starts[segments] + n - 1 - ranks]
+    terms = (2 * (ranks + 1) - 1.0) / n * (logcdf + reversed_logsf)
+    statistics = np.array([-size - np.sum(terms[start:start + size]) for start, size in zip(starts, sizes)], dtype=np.float64)
+    critical = np.array([np.around(_Avals_norm / (1.0 + 4.0 / size - 25.0 / size / size), 3)[0] for size in sizes])
+    return statistics, critical
+
+
+'''
+Goodness-of-fit tests of a list of samples (non-empty 1-D float arrays without missing values) against the given distributions.
+Return a dict: distribution name -> dict of arrays aligned with samples:
+- every distribution: 'ks_stat', 'ks_p' (scipy.stats.kstest); the normal test standardizes with the population
+  standard deviation (ddof=0), the uniform test rescales every sample to [0, 1] with its min and max;
+- 'Normal' also: 'lf_stat', 'lf_p' (statsmodels lilliefors, table p-values, NaN below 4 values) and
+  'ad_stat', 'ad_crit' (scipy.stats.anderson, critical value at the 15% significance level).
+'''
+def goodness_of_fit_tests(samples: list, distribution_names: list = GOF_DISTRIBUTIONS) -> dict:
+    if not samples:
+        return {name: {} for name in distribution_names}
+    samples = [np.asarray(sample, dtype=np.float64) for sample in samples]
+    values, starts, sizes, segments = pack_sorted_samples(samples)
+    results = {}
+    for name in distribution_names:
+        if name == 'Normal':
+            means = np.array([np.mean(sample) for sample in samples])
+            population_stds = np.array([np.std(sample) for sample in samples])
+            sample_stds = np.array([np.std(sample, ddof=1) if len(sample) > 1 else np.nan for sample in samples])
+            # One normal CDF evaluation for the KS test (ddof=0) and one for Lilliefors and Anderson-Darling (ddof=1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                z = (values - means[segments]) / population_stds[segments]
+                w = (values - means[segments]) / sample_stds[segments]
+            ks_stat = ks_statistics(distributions.norm.cdf(z), starts, sizes, segments)
+            lf_stat = ks_statistics(distributions.norm.cdf(w), starts, sizes, segments)
+            lf_p = np.full(len(samples), np.nan)
+            for index, (d, size) in enumerate(zip(lf_stat, sizes)):
+                if size >= 4:
+                    if lilliefors_table_norm is not None:
+                        lf_p[index] = lilliefors_table_norm.prob(d, size)
+                    else:
+                        from statsmodels.stats.diagnostic import lilliefors
+                        lf_p[index] = lilliefors(samples[index], dist='norm', pvalmethod='table')[1]
+            ad_stat, ad_crit = anderson_norm_statistics(w, starts, sizes, segments)
+            results[name] = {'ks_stat': ks_stat, 'ks_p': ks_pvalues(ks_stat, sizes),
+                             'lf_stat': lf_stat, 'lf_p': lf_p, 'ad_stat': ad_stat, 'ad_crit': ad_crit}
+            continue
+        if name == 'Exponential':
+            cdfvals = distributions.expon.cdf(values)
+        elif name == 'Uniform':
+            minimums = np.array([np.min(sample) for sample in samples])
+            maximums = np.array([np.max(sample) for sample in samples])
+            with np.errstate(divide='ignore', invalid='ignore'):
+                cdfvals = distributions.uniform.cdf((values - minimums[segments]) / (maximums[segments] - minimums[segments]))
+        elif name == 'Gamma':
+            cdfvals = distributions.gamma(2).cdf(values)  # Use shape=2 for gamma
+        else:
+            raise ValueError(f"Unknown distribution: {name}")
+        ks_stat = ks_statistics(cdfvals, starts, sizes, segments)
+        results[name] = {'ks_stat': ks_stat, 'ks_p': ks_pvalues(ks_stat, sizes)}
+    return results
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+from functools import lru_cache
+from math import gcd
+import numpy as np
+from scipy.stats import distributions, ks_2samp
+import pair_sharding
+
+# Exact p-value helper of ks_2samp; ks_2samp_exact_test runs the public ks_2samp on the pair if this private helper
+# is not available
+try:
+    from scipy.stats._stats_py import _attempt_exact_2kssamp
+except ImportError:
+    _attempt_exact_2kssamp = None
+
+
+'''
+Two-sample Kolmogorov-Smirnov tests of many column pairs from presorted columns.
+scipy.stats.ks_2samp sorts both samples on every call; here every column is sorted once and the statistic of a pair
+is computed by merging the two sorted columns (a stable sort of two sorted runs is a linear merge).
+As in ks_2samp, missing values are not dropped: NaN sorts after every value and counts in the sample size.
+The p-value follows ks_2samp (two-sided, mode 'auto'): exact when both samples have at most 10000 values (asymptotic
+if the exact computation fails), asymptotic otherwise.
+'''
+MAX_AUTO_N = 10000  # As in ks_2samp, 'auto' is exact if n1, n2 <= MAX_AUTO_N
+
+
+'''
+Sort every sample once (NaN last, as np.sort does).
+'''
+def sorted_samples(samples: list) -> list:
+    return [np.sort(np.asarray(sample, dtype=np.float64)) for sample in samples]
+
+
+'''
+Two-sided KS statistic of two sorted samples: the largest distance between their empirical CDFs, evaluated (with
+side='right' counts, as ks_2samp does) at the last element of every run of equal values of the merged samples.
+'''
+def ks_2samp_statistic(sorted1: np.ndarray, sorted2: np.ndarray) -> float:
+    n1, n2 = len(sorted1), len(sorted2)
+    merged = np.concatenate([sorted1, sorted2])
+    order = np.argsort(merged, kind='stable')
+    values = merged[order]
+    count1 = np.cumsum(order < n1)
+    count2 = np.arange(1, n1 + n2 + 1) - count1
+    nan = np.isnan(values)
+    last = np.ones(n1 + n2, dtype=bool)
+    last[:-1] = (values[1:] != values[:-1]) & ~(nan[1:] & nan[:-1])
+    cddiffs = count1[last] / n1 - count2[last] / n2
+    minS = np.clip(-np.min(cddiffs), 0, 1)
+    maxS = np.max(cddiffs)
+    return minS if minS > maxS else maxS
+
+
+'''
+Exact two-sided p-value of ks_2samp for sample sizes n1, n2 and the statistic rounded to h / lcm(n1, n2), through
+the private scipy helper. The exact computation only depends on (n1, n2, h), so it is cached across pairs.
+'''
+@lru_cache(maxsize=None)
+def _exact_test(n1, n2, h):
+    g = gcd(n1, n2)
+    lcm = (n1 // g) * n2
+    return _attempt_exact_2kssamp(n1, n2, g, h / lcm, 'two-sided')
+
+
+'''
+Exact two-sided test of ks_2samp for the statistic d of the sorted samples sorted1 and sorted2, as used by mode 'auto'
+when max(n1, n2) <= MAX_AUTO_N. Return (success, statistic, p_value); as in ks_2samp, the statistic is rounded to
+h / lcm(n1, n2). When the exact computation fails, ks_2samp falls back to the asymptotic p-value.
+Without the private scipy helper, the public ks_2samp tests the pair itself (its result, exact or not, is returned
+as a success).
+'''
+def ks_2samp_exact_test(d: float, sorted1: np.ndarray, sorted2: np.ndarray):
+    if _attempt_exact_2kssamp is None:
+        statistic, p_value = ks_2samp(sorted1, sorted2)[:2]
+        return True, statistic, p_value
+    n1, n2 = len(sorted1), len(sorted2)
+    g = gcd(n1, n2)
+    lcm = (n1 // g) * n2
+    success, exact_d, prob = _exact_test(n1, n2, int(np.round(d * lcm)))
+    return success, exact_d, float(np.clip(prob, 0, 1)) if success else prob
+
+
+'''
+Asymptotic two-sided p-values of ks_2samp for statistics d of samples of sizes n1 and n2 (arrays), in one call.
+'''
+def ks_2samp_asymptotic_pvalues(d, n1, n2) -> np.ndarray:
+    m = np.maximum(n1, n2).astype(np.float64)
+    n = np.minimum(n1, n2).astype(np.float64)
+    en = m * n / (m + n)
+    return np.clip(distributions.kstwo.sf(d, np.round(en)), 0, 1)
+
+
+'''
+Two-sample KS tests of the given pairs (i, j) of samples, all pairs by default.
+Every sample is sorted once and reused by all its pairs; the asymptotic p-values are computed in one call at the end.
+With workers > 1, the pairs are sharded over worker processes sharing the sorted samples (pair_sharding).
+Return (statistics, p_values), arrays aligned with pairs.
+'''
+def pairwise_ks_2samp(samples: list, pairs: list = None, workers: int = 1):
+    if pairs is None:
+        pairs = [(i, j) for i in range(len(samples)) for j in range(i + 1, len(samples))]
+    presorted = sorted_samples(samples)
+    sizes = np.array([len(sample) for sample in presorted], dtype=np.int64)
+    # Sorted samples packed into one array: sample i is values[starts[i]:starts[i] + sizes[i]]
+    arrays = {'values': np.concatenate([np.empty(0)] + presorted), 'starts': np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int64), 'sizes': sizes}
+    pair_array = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+    blocks = pair_sharding.map_shards(_ks_2samp_of_pairs, arrays, pair_array, workers)
+    statistics = np.concatenate([np.empty(0)] + [block[0] for block in blocks])
+    p_values = np.concatenate([np.empty(0)] + [block[1] for block in blocks])
+    asymptotic = np.concatenate([np.zeros(0, dtype=bool)] + [block[2] for block in blocks])
+    if asymptotic.any():
+        n1, n2 = sizes[pair_array[asymptotic, 0]], sizes[pair_array[asymptotic, 1]]
+        p_values[asymptotic] = ks_2samp_asymptotic_pvalues(statistics[asymptotic], n1, n2)
+    return statistics, p_values
+
+
+'''
+KS statistics and exact p-values of a block of pairs (p x 2 array) of the packed sorted samples prepared by
+pairwise_ks_2samp. Return (statistics, p_values, asymptotic): the pairs flagged asymptotic still need their p-value.
+'''
+def _ks_2samp_of_pairs(arrays: dict, pairs: np.ndarray):
+    values, starts, sizes = arrays['values'], arrays['starts'], arrays['sizes']
+    statistics = np.empty(len(pairs))
+    p_values = np.full(len(pairs), np.nan)
+    asymptotic = np.zeros(len(pairs), dtype=bool)
+    for index, (i, j) in enumerate(pairs):
+        sorted1 = values[starts[i]:starts[i] + sizes[i]]
+        sorted2 = values[starts[j]:starts[j] + sizes[j]]
+        statistics[index] = ks_2samp_statistic(sorted1, sorted2)
+        asymptotic[index] = max(sizes[i], sizes[j]) > MAX_AUTO_N
+        if not asymptotic[index]:
+            success, exact_d, prob = ks_2samp_exact_test(statistics[index], sorted1, sorted2)
+            if success:
+                statistics[index], p_values[index] = exact_d, prob
+            else:
+                asymptotic[index] = True
+    return statistics, p_values, asymptotic
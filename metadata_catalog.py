@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+import os
+import glob
+import json
+import sqlite3
+import urllib.request
+import numpy as np
+import pandas as pd
+import path
+
+
+'''
+Consolidated metadata catalog (SQLite) of 'Dataset metadata.csv' and every '<dataset>_col_meta.csv'.
+The csv files stay the editable source of metadata. The catalog records the mtime and size of every source file,
+and a refresh only re-imports the files that are new or changed (and drops the ones that were removed).
+Column metadata is indexed on (dataset, column_header).
+It is the single source of column metadata of the stages: utils.col_meta_store reads its tables from the catalog.
+The catalog is only written by refresh (metadata_helper builds it, preprocessing updates it); lookups open it
+read-only and, when it is missing or a source file changed since it was imported (mtime and size), read that csv
+file instead. Every process keeps one read-only connection to the catalog, and one for writing while refreshing.
+'''
+
+
+col_meta_suffix = '_col_meta.csv'
+dataset_meta_file = 'Dataset metadata.csv'
+col_meta_fields = ['dataset', 'column_header', 'data_type', 'column_description', 'num_of_rows', 'is_normality']
+
+schema = '''
+CREATE TABLE IF NOT EXISTS source_files (
+    file_path TEXT PRIMARY KEY,
+    dataset TEXT,
+    mtime_ns INTEGER,
+    size INTEGER,
+    csv_columns TEXT
+);
+CREATE TABLE IF NOT EXISTS datasets (
+    dataset TEXT PRIMARY KEY,
+    dataset_description TEXT,
+    url TEXT
+);
+CREATE TABLE IF NOT EXISTS column_metadata (
+    dataset TEXT NOT NULL,
+    column_header TEXT,
+    position INTEGER NOT NULL,
+    data_type TEXT,
+    column_description TEXT,
+    num_of_rows INTEGER,
+    is_normality INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_column_metadata ON column_metadata (dataset, column_header);
+'''
+
+
+'''
+Convert a csv cell to a value storable in SQLite (NaN as NULL)
+'''
+def to_sql_value(value):
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if isinstance(value, (bool, np.bool_)):
+        return int(value)
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    return value
+
+
+class MetadataCatalog:
+    def __init__(self, db_path=None, meta_folder=None):
+        self.meta_folder = meta_folder if meta_folder is not None else path.meta_dir
+        self.db_path = db_path if db_path is not None else self.meta_folder + path.metadata_catalog_file
+        self.col_meta_folder = self.meta_folder + path.col_meta_dir
+        self._conn = None
+        self._conn_pid = None
+        self._read_conn = None
+        self._read_conn_pid = None
+
+    # Writing connection of this process, opened (and the schema created) on first refresh; a forked worker opens its own
+    def connect(self):
+        if self._conn is None or self._conn_pid != os.getpid():
+            self._conn = sqlite3.connect(self.db_path, timeout=60)
+            self._conn.executescript(schema)
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    # Read-only connection of this process, None if the catalog has not been built
+    def connect_readonly(self):
+        if self._read_conn is None or self._read_conn_pid != os.getpid():
+            if not os.path.exists(self.db_path):
+                return None
+            uri = 'file:' + urllib.request.pathname2url(os.path.abspath(self.db_path)) + '?mode=ro'
+            self._read_conn = sqlite3.connect(uri, uri=True, timeout=60)
+            self._read_conn_pid = os.getpid()
+        return self._read_conn
+
+    def close(self):
+        for conn, pid in [(self._conn, self._conn_pid), (self._read_conn, self._read_conn_pid)]:
+            if conn is not None and pid == os.getpid():
+                conn.close()
+        self._conn = self._read_conn = None
+        self._conn_pid = self._read_conn_pid = None
+
+    # Paths of all source csv files and the dataset they describe ('' for the dataset-level metadata)
+    def list_sources(self):
+        sources = {}
+        dataset_meta_path = self.meta_folder + dataset_meta_file
+        if os.path.exists(dataset_meta_path):
+            sources[dataset_meta_path] = ''
+        for file_path in sorted(glob.glob(os.path.join(self.col_meta_folder, '*' + col_meta_suffix))):
+            file_path = self.col_meta_folder + os.path.basename(file_path)
+            sources[file_path] = os.path.basename(file_path)[:-len(col_meta_suffix)]
+        return sources
+
+    def col_meta_path(self, dataset_name):
+        return self.col_meta_folder + dataset_name + col_meta_suffix
+
+    # Import one source file into the catalog (within an open transaction)
+    def _import_source(self, conn, file_path, dataset_name, stamp):
+        if dataset_name == '':
+            df = pd.read_csv(file_path)
+            conn.execute('DELETE FROM datasets')
+            conn.executemany(
+                'INSERT OR REPLACE INTO datasets (dataset, dataset_description, url) VALUES (?, ?, ?)',
+                [tuple(to_sql_value(row.get(field)) for field in ['dataset', 'dataset_description', 'url'])
+                 for row in df.to_dict('records')])
+        else:
+            # Column headers are kept as the raw strings written in the csv
+            df = pd.read_csv(file_path, converters={'column_header': str})
+            conn.execute('DELETE FROM column_metadata WHERE dataset = ?', (dataset_name,))
+            conn.executemany(
+                'INSERT INTO column_metadata (dataset, column_header, position, data_type, column_description, num_of_rows, is_normality) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(dataset_name, to_sql_value(row.get('column_header')), position, to_sql_value(row.get('data_type')),
+                  to_sql_value(row.get('column_description')), to_sql_value(row.get('num_of_rows')), to_sql_value(row.get('is_normality')))
+                 for position, row in enumerate(df.to_dict('records'))])
+        conn.execute('INSERT OR REPLACE INTO source_files (file_path, dataset, mtime_ns, size, csv_columns) VALUES (?, ?, ?, ?, ?)',
+                     (file_path, dataset_name, stamp[0], stamp[1], json.dumps(list(df.columns))))
+
+    # Remove a source file (and what was imported from it) from the catalog
+    def _drop_source(self, conn, file_path, dataset_name):
+        if dataset_name == '':
+            conn.execute('DELETE FROM datasets')
+        else:
+            conn.execute('DELETE FROM column_metadata WHERE dataset = ?', (dataset_name,))
+        conn.execute('DELETE FROM source_files WHERE file_path = ?', (file_path,))
+
+    '''
+    Incrementally bring the catalog up to date with the csv files.
+    only: optional {file_path: dataset} subset of sources to check; all sources by default (removed files are dropped).
+    rebuild: re-import every source file.
+    Return the number of (re-)imported and dropped source files.
+    '''
+    def refresh(self, only=None, rebuild=False):
+        sources = self.list_sources() if only is None else only
+        imported = dropped = 0
+        conn = self.connect()
+        with conn:
+            if rebuild:
+                for table in ['source_files', 'datasets', 'column_metadata']:
+                    conn.execute('DELETE FROM ' + table)
+            known = {row[0]: (row[1], row[2], row[3]) for row in conn.execute(
+                'SELECT file_path, dataset, mtime_ns, size FROM source_files')}
+            for file_path, dataset_name in sources.items():
+                if not os.path.exists(file_path):
+                    if file_path in known:
+                        self._drop_source(conn, file_path, dataset_name)
+                        dropped += 1
+                    continue
+                stat = os.stat(file_path)
+                stamp = (stat.st_mtime_ns, stat.st_size)
+                if file_path in known and known[file_path][1:] == stamp:
+                    continue
+                self._import_source(conn, file_path, dataset_name, stamp)
+                imported += 1
+            if only is None:
+                for file_path, (dataset_name, _, _) in known.items():
+                    if file_path not in sources:
+                        self._drop_source(conn, file_path, dataset_name)
+                        dropped += 1
+        return imported, dropped
+
+    # Refresh the column metadata of one dataset only
+    def refresh_dataset(self, dataset_name):
+        return self.refresh(only={self.col_meta_path(dataset_name): dataset_name})
+
+    '''
+    Read-only connection to the catalog if it holds the current version of a source file (same mtime and size as
+    when it was imported, or absent from both), None otherwise: the lookup then reads the csv file itself.
+    '''
+    def _current_connection(self, file_path):
+        try:
+            conn = self.connect_readonly()
+            if conn is None:
+                return None
+            row = conn.execute('SELECT mtime_ns, size FROM source_files WHERE file_path = ?', (file_path,)).fetchone()
+        except sqlite3.DatabaseError:  # Catalog file without the schema (e.g. being created)
+            return None
+        if not os.path.exists(file_path):
+            return conn if row is None else None
+        stat = os.stat(file_path)
+        return conn if row is not None and tuple(row) == (stat.st_mtime_ns, stat.st_size) else None
+
+    # Rows of column metadata (as stored in the catalog) and the csv columns of a dataset, from its csv file
+    def _read_col_meta_csv(self, dataset_name):
+        file_path = self.col_meta_path(dataset_name)
+        if not os.path.exists(file_path):
+            return [], col_meta_fields
+        df = pd.read_csv(file_path, converters={'column_header': str})
+        # As on import, the dataset is the one the file is named after
+        rows = [(dataset_name,) + tuple(to_sql_value(row.get(field)) for field in col_meta_fields[1:]) for row in df.to_dict('records')]
+        return rows, list(df.columns)
+
+    '''
+    Rows of column metadata as a DataFrame laid out like the csv file
+    (same columns, NaN for empty cells, integer num_of_rows and boolean is_normality when complete)
+    '''
+    def _to_frame(self, csv_columns, rows):
+        df = pd.DataFrame(rows, columns=col_meta_fields).fillna(value=np.nan)
+        if df['num_of_rows'].notna().all():
+            df['num_of_rows'] = df['num_of_rows'].astype('int64')
+        if df['is_normality'].notna().all():
+            df['is_normality'] = df['is_normality'].astype(bool)
+        return df[[col for col in csv_columns if col in col_meta_fields]]
+
+    def _csv_columns(self, conn, dataset_name):
+        csv_columns = conn.execute('SELECT csv_columns FROM source_files WHERE file_path = ?', (self.col_meta_path(dataset_name),)).fetchone()
+        return json.loads(csv_columns[0]) if csv_columns else col_meta_fields
+
+    # Column metadata of every column of a dataset, in csv order
+    def get_dataset_columns(self, dataset_name) -> pd.DataFrame:
+        conn = self._current_connection(self.col_meta_path(dataset_name))
+        if conn is None:
+            rows, csv_columns = self._read_col_meta_csv(dataset_name)
+            return self._to_frame(csv_columns, rows)
+        rows = conn.execute('SELECT ' + ', '.join(col_meta_fields) + ' FROM column_metadata WHERE dataset = ? ORDER BY position',
+                            (dataset_name,)).fetchall()
+        return self._to_frame(self._csv_columns(conn, dataset_name), rows)
+
+    # Column metadata of a set of columns of a dataset, in csv order
+    def get_columns_info(self, dataset_name, column_headers) -> pd.DataFrame:
+        column_headers = [str(header) for header in column_headers]
+        conn = self._current_connection(self.col_meta_path(dataset_name))
+        if conn is None:
+            rows, csv_columns = self._read_col_meta_csv(dataset_name)
+            selected = set(column_headers)
+            return self._to_frame(csv_columns, [row for row in rows if row[1] in selected])
+        rows = []
+        # Stay below the SQLite limit of host parameters
+        for start in range(0, len(column_headers), 500):
+            batch = column_headers[start:start + 500]
+            rows += conn.execute('SELECT position, ' + ', '.join(col_meta_fields) + ' FROM column_metadata '
+                                 'WHERE dataset = ? AND column_header IN (' + ', '.join('?' * len(batch)) + ')',
+                                 [dataset_name] + batch).fetchall()
+        rows = [row[1:] for row in sorted(rows, key=lambda row: row[0])]
+        return self._to_frame(self._csv_columns(conn, dataset_name), rows)
+
+    # Dataset-level metadata (description and url) of a dataset, None if not recorded
+    def get_dataset_info(self, dataset_name):
+        dataset_meta_path = self.meta_folder + dataset_meta_file
+        conn = self._current_connection(dataset_meta_path)
+        if conn is None:
+            if not os.path.exists(dataset_meta_path):
+                return None
+            df = pd.read_csv(dataset_meta_path)
+            rows = [tuple(to_sql_value(row.get(field)) for field in ['dataset', 'dataset_description', 'url'])
+                    for row in df.to_dict('records') if row.get('dataset') == dataset_name]
+            row = rows[-1] if rows else None  # As INSERT OR REPLACE on import, the last row of a dataset is kept
+        else:
+            row = conn.execute('SELECT dataset, dataset_description, url FROM datasets WHERE dataset = ?', (dataset_name,)).fetchone()
+        return dict(zip(['dataset', 'dataset_description', 'url'], row)) if row else None
+
+    # Names of all datasets with column metadata in the catalog (none if it has not been built)
+    def list_datasets(self):
+        conn = self.connect_readonly()
+        if conn is None:
+            return []
+        return [row[0] for row in conn.execute('SELECT DISTINCT dataset FROM column_metadata ORDER BY dataset')]
+
+
+# Catalog shared by every stage within a process
+metadata_catalog = MetadataCatalog()
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+import os
+from concurrent.futures import ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+import numpy as np
+
+
+'''
+Sharding of the pair / triple index space of one dataset over worker processes.
+The candidate pairs (or triples) of a wide table are cut into contiguous blocks of balanced cost, and every block is
+handed to a worker process. The arrays of the dataset (numeric matrix, sorted columns, codes...) are published once
+in shared memory: workers map them zero-copy instead of receiving a pickled copy per block. The results of the
+blocks are returned in block order, so concatenating them gives the results in the canonical order of the items.
+The worker processes are started once (shard_pool) and reused by every kernel of every dataset of an extraction run.
+'''
+workers = 1  # Worker processes used by the pair / triple kernels of the extractors (1: serial)
+MIN_ITEMS_PER_SHARD = 64  # Fewer items are not worth a process round trip
+SHARDS_PER_WORKER = 4  # More blocks than workers, so that a slow block does not leave the other workers idle
+
+
+'''
+Contiguous blocks [start, stop) of n_items items of balanced total cost (costs: one per item, all equal by default).
+'''
+def balanced_shards(n_items: int, n_shards: int, costs=None) -> list:
+    n_shards = max(1, min(n_shards, n_items))
+    if costs is None:
+        bounds = np.linspace(0, n_items, n_shards + 1).round().astype(np.int64)
+    else:
+        cumulative = np.cumsum(np.asarray(costs, dtype=np.float64))
+        targets = cumulative[-1] * np.arange(1, n_shards) / n_shards
+        bounds = np.concatenate([[0], np.searchsorted(cumulative, targets, side='right'), [n_items]])
+    return [(int(start), int(stop)) for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+
+
+'''
+Arrays published in shared memory for the duration of a with block.
+handles (name -> (shared memory name, shape, dtype)) is what the workers receive to map them (attach_arrays).
+'''
+class SharedArrays:
+    def __init__(self, arrays: dict):
+        self._arrays = arrays
+        self._blocks = []
+        self.handles = {}
+
+    def __enter__(self):
+        for name, array in self._arrays.items():
+            array = np.ascontiguousarray(array)
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            self._blocks.append(block)
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+            self.handles[name] = (block.name, array.shape, array.dtype.str)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+
+'''
+Map shared arrays from their handles, as read-only arrays.
+Return (arrays, blocks): the blocks must be closed (close_blocks) once the arrays are no longer used.
+'''
+def attach_arrays(handles: dict):
+    arrays, blocks = {}, {}
+    for name, (block_name, shape, dtype) in handles.items():
+        if block_name not in blocks:
+            blocks[block_name] = shared_memory.SharedMemory(name=block_name)
+        array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=blocks[block_name].buf)
+        array.flags.writeable = False
+        arrays[name] = array
+    return arrays, list(blocks.values())
+
+
+def close_blocks(blocks: list):
+    for block in blocks:
+        try:
+            block.close()
+        except BufferError:
+            pass  # Arrays still referenced (e.g. by the traceback of an error), the mapping goes with them
+
+
+# Task of a worker process: the blocks of the shard are mapped for the call only (results must not be views of them)
+def _run_shard(function, handles, items, args):
+    arrays, blocks = attach_arrays(handles)
+    try:
+        return function(arrays, items, *args)
+    finally:
+        del arrays
+        close_blocks(blocks)
+
+
+# Pool of worker processes of this process, shared by the map_shards calls (see shard_pool), and its (pid, size)
+_pool = None
+_pool_key = None
+
+
+'''
+Pool of n_workers worker processes, started on first use and reused by every later map_shards call of this process
+(e.g. all the kernels of all the datasets of an extraction run), instead of a pool per call; a pool of another
+size, or inherited from a parent process, is replaced. close_shard_pool shuts it down.
+'''
+def shard_pool(n_workers: int) -> ProcessPoolExecutor:
+    global _pool, _pool_key
+    key = (os.getpid(), n_workers)
+    if _pool is None or _pool_key != key:
+        close_shard_pool()
+        _pool = ProcessPoolExecutor(max_workers=n_workers)
+        _pool_key = key
+    return _pool
+
+
+def close_shard_pool():
+    global _pool, _pool_key
+    if _pool is not None and _pool_key[0] == os.getpid():
+        _pool.shutdown()
+    _pool = None
+    _pool_key = None
+
+
+'''
+Apply function(arrays, block, *args) to contiguous blocks of items (a list or array of pairs / triples), with
+n_workers worker processes sharing the arrays (dict of numpy arrays) zero-copy; function must be a module-level
+function so that it can be sent to the workers, and its results must not be views of the arrays.
+The blocks run on pool if given, else on the shared pool of n_workers processes (shard_pool).
+Return the list of the results of the blocks, in block order (one block run in this process when n_workers <= 1 or
+when there are too few items to share).
+'''
+def map_shards(function, arrays: dict, items, n_workers: int = 1, costs=None, args=(), pool: ProcessPoolExecutor = None) -> list:
+    n_shards = min(n_workers * SHARDS_PER_WORKER, len(items) // MIN_ITEMS_PER_SHARD)
+    if n_workers <= 1 or n_shards <= 1:
+        return [function(arrays, items, *args)]
+    shards = balanced_shards(len(items), n_shards, costs)
+    executor = pool if pool is not None else shard_pool(n_workers)
+    with SharedArrays(arrays) as shared:
+        futures = [executor.submit(_run_shard, function, shared.handles, items[start:stop], args) for start, stop in shards]
+        # The pool outlives the call: every block is done with the shared arrays before they are released
+        wait(futures)
+        return [future.result() for future in futures]
@@ -6,8 +6,14 @@ confusion_matrix_dir = 'Confusion Matrix/'
 
 meta_dir = 'Data/Metadata/'
 col_meta_dir = 'Column Metadata/'
+col_profile_dir = 'Column Profile/'
+metadata_catalog_file = 'Metadata Catalog.sqlite'
+normality_cache_file = 'Normality Cache.csv'
+extraction_manifest_file = 'Extraction Manifest.json'
+extraction_fragment_dir = 'Extraction Fragments/'
 dataset_dir = 'Data/Origin Dataset/'
 processed_dir = 'Data/Processed Dataset/'
+processed_binary_dir = 'Columnar Cache/'
 info_dir = 'Data/Extracted Information/'
 manual_dir = 'Manual Filtered Information/'
 
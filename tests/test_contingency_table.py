@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+import sys
+import os
+main_folder_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, main_folder_path)
+
+import numpy as np
+import pandas as pd
+import pytest
+from statsmodels.stats.contingency_tables import StratifiedTable
+import contingency_table
+
+
+'''
+Parity of the tensorized Mantel-Haenszel tests (stratified_tables + mantel_haenszel_tests) with the former per-triple
+path: df.groupby on the strata column, one pd.crosstab per stratum, StratifiedTable(...).test_null_odds().
+'''
+
+
+def make_binary_frame(seed, rows=400):
+    rng = np.random.default_rng(seed)
+    latent = rng.random(rows)
+    df = pd.DataFrame({
+        'a': np.where(latent < 0.5, 'yes', 'no'),
+        'b': (latent + rng.normal(scale=0.3, size=rows) > 0.5).astype(int),
+        'c': rng.integers(0, 2, rows),
+        'd': rng.choice(['x', 'y'], rows, p=[0.9, 0.1]),
+        'e': np.where(rng.random(rows) < 0.5, 1.0, 2.0),
+    })
+    df.loc[rng.random(rows) < 0.05, 'c'] = np.nan  # Missing values
+    df['f'] = np.where(df['a'] == 'yes', 'p', rng.choice(['p', 'q'], rows))  # Strata of 'a' without a 2x2 table
+    return df
+
+
+def per_triple_test(df, strata_col, col1, col2):
+    tables = []
+    for _, group in df.groupby(strata_col):
+        table = pd.crosstab(group[col1], group[col2])
+        if table.shape == (2, 2):
+            tables.append(table)
+    if not tables:
+        return None
+    result = StratifiedTable(tables).test_null_odds()
+    return result.statistic, result.pvalue
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_mantel_haenszel_tests_match_statsmodels(seed):
+    df = make_binary_frame(seed)
+    columns = list(df.columns)
+    codes, _ = contingency_table.factorize_columns(df, columns)
+    triples = [(i, j, k) for i in range(len(columns)) for j in range(i + 1, len(columns)) for k in range(j + 1, len(columns))]
+    tested, p_values = contingency_table.mantel_haenszel_tests(contingency_table.stratified_tables(codes, triples))
+    for index, (i, j, k) in enumerate(triples):
+        expected = per_triple_test(df, columns[i], columns[j], columns[k])
+        assert tested[index] == (expected is not None), (columns[i], columns[j], columns[k])
+        if expected is not None:
+            assert p_values[index] == pytest.approx(expected[1], rel=1e-10, abs=1e-14), (columns[i], columns[j], columns[k])
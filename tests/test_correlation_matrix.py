@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+import sys
+import os
+main_folder_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, main_folder_path)
+
+import numpy as np
+import pytest
+from scipy.stats import kendalltau
+import correlation_matrix
+
+
+'''
+Parity of the Kendall tau kernel with scipy.stats.kendalltau, through the compiled discordant pair count of scipy and
+through the in-repo merge sort fallback (forced by hiding the private scipy function).
+'''
+
+
+def make_table(seed, rows=300, cols=6):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(rows, cols))
+    X[:, 1] = X[:, 0] + rng.normal(scale=0.5, size=rows)
+    X[:, 2] = np.round(X[:, 2] * 2)  # Ties
+    X[:, 3] = rng.integers(0, 3, rows)  # Many ties
+    X[rng.random(rows) < 0.1, 4] = np.nan  # Missing values
+    X[:, 5] = -X[:, 2] + rng.integers(0, 2, rows)
+    return X
+
+
+def scipy_kendall_tau(X):
+    k = X.shape[1]
+    tau = np.full((k, k), np.nan)
+    for i in range(k):
+        for j in range(i + 1, k):
+            rows = ~np.isnan(X[:, i]) & ~np.isnan(X[:, j])
+            tau[i, j] = tau[j, i] = kendalltau(X[rows, i], X[rows, j]).statistic
+    return tau
+
+
+@pytest.fixture(params=['compiled', 'fallback'])
+def discordant_count(request, monkeypatch):
+    if request.param == 'fallback':
+        monkeypatch.setattr(correlation_matrix, '_kendall_dis', None)
+    return request.param
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_pairwise_kendall_tau_matches_scipy(discordant_count, seed):
+    X = make_table(seed)
+    expected = scipy_kendall_tau(X)
+    tau = correlation_matrix.pairwise_kendall_tau(X)
+    off_diagonal = ~np.eye(X.shape[1], dtype=bool)
+    np.testing.assert_allclose(tau[off_diagonal], expected[off_diagonal], rtol=0, atol=1e-10)
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_count_inversions_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    values = rng.integers(0, rng.integers(1, 10), rng.integers(0, 60))
+    expected = sum(int(values[p] > values[q]) for p in range(len(values)) for q in range(p + 1, len(values)))
+    assert correlation_matrix.count_inversions(values) == expected
+
+
+def test_fallback_discordant_pairs_match_compiled_count():
+    if correlation_matrix._kendall_dis is None:
+        pytest.skip('scipy.stats._stats._kendall_dis is not available')
+    rng = np.random.default_rng(0)
+    for size in [2, 3, 17, 1000, 5000]:
+        x = np.sort(rng.integers(1, max(2, size // 4), size))
+        y = rng.integers(1, max(2, size // 3), size)
+        compiled = correlation_matrix.count_discordant_pairs(x, y)
+        assert correlation_matrix.count_inversions(y) - correlation_matrix.count_inversions(x * (int(y.max()) + 1) + y) == compiled
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+import sys
+import os
+main_folder_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, main_folder_path)
+
+import numpy as np
+import pytest
+from scipy.stats import anderson, kstest
+from statsmodels.stats.diagnostic import lilliefors
+import goodness_of_fit
+
+
+'''
+Parity of the batched goodness-of-fit tests with scipy.stats.kstest, statsmodels lilliefors and scipy.stats.anderson,
+field by field, through the private Lilliefors p-value table of statsmodels and through the per-column public
+lilliefors fallback (forced by hiding the private table).
+'''
+
+
+def make_samples(seed):
+    rng = np.random.default_rng(seed)
+    return [
+        rng.normal(5, 2, size=50),
+        rng.exponential(size=120),
+        rng.uniform(1, 3, size=30),
+        rng.gamma(2, size=200),
+        np.round(rng.normal(size=80), 1),  # Ties
+        rng.normal(size=3),  # Too small for Lilliefors
+        rng.lognormal(size=1000),
+    ]
+
+
+def expected_fields(sample, name):
+    if name == 'Normal':
+        ks = kstest((sample - np.mean(sample)) / np.std(sample), 'norm')
+        fields = {'ks_stat': ks.statistic, 'ks_p': ks.pvalue}
+        if len(sample) >= 4:
+            fields['lf_stat'], fields['lf_p'] = lilliefors(sample, dist='norm', pvalmethod='table')
+        else:
+            fields['lf_p'] = np.nan
+        ad = anderson(sample)
+        fields['ad_stat'], fields['ad_crit'] = ad.statistic, ad.critical_values[0]
+        return fields
+    if name == 'Exponential':
+        ks = kstest(sample, 'expon')
+    elif name == 'Uniform':
+        ks = kstest((sample - np.min(sample)) / (np.max(sample) - np.min(sample)), 'uniform')
+    else:
+        ks = kstest(sample, 'gamma', args=(2,))
+    return {'ks_stat': ks.statistic, 'ks_p': ks.pvalue}
+
+
+@pytest.fixture(params=['private table', 'public lilliefors'])
+def lilliefors_p_values(request, monkeypatch):
+    if request.param == 'public lilliefors':
+        monkeypatch.setattr(goodness_of_fit, 'lilliefors_table_norm', None)
+    return request.param
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_goodness_of_fit_tests_match_public_functions(lilliefors_p_values, seed):
+    samples = make_samples(seed)
+    results = goodness_of_fit.goodness_of_fit_tests(samples)
+    for name in goodness_of_fit.GOF_DISTRIBUTIONS:
+        for index, sample in enumerate(samples):
+            for field, expected in expected_fields(sample, name).items():
+                value = results[name][field][index]
+                if np.isnan(expected):
+                    assert np.isnan(value), (name, index, field)
+                else:
+                    assert value == pytest.approx(expected, rel=1e-10, abs=1e-12), (name, index, field)
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+import sys
+import os
+main_folder_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, main_folder_path)
+
+import numpy as np
+import pytest
+from scipy.stats import ks_2samp
+import ks_comparison
+
+
+'''
+Parity of the presorted two-sample KS tests with scipy.stats.ks_2samp, through the private exact p-value helper of
+scipy and through the public ks_2samp fallback (forced by hiding the private helper).
+'''
+
+
+def make_samples(seed):
+    rng = np.random.default_rng(seed)
+    return [
+        rng.normal(size=40),
+        rng.normal(0.3, 1, size=60),
+        np.round(rng.normal(size=60) * 2),  # Ties, same size as the previous sample
+        rng.exponential(size=25),
+        rng.integers(0, 5, 300).astype(float),
+        rng.normal(size=12000),  # Asymptotic p-values (more than MAX_AUTO_N values)
+    ]
+
+
+@pytest.fixture(params=['private helper', 'public fallback'])
+def exact_test(request, monkeypatch):
+    if request.param == 'public fallback':
+        monkeypatch.setattr(ks_comparison, '_attempt_exact_2kssamp', None)
+    ks_comparison._exact_test.cache_clear()
+    return request.param
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_pairwise_ks_2samp_matches_scipy(exact_test, seed):
+    samples = make_samples(seed)
+    statistics, p_values = ks_comparison.pairwise_ks_2samp(samples)
+    pairs = [(i, j) for i in range(len(samples)) for j in range(i + 1, len(samples))]
+    for index, (i, j) in enumerate(pairs):
+        expected = ks_2samp(samples[i], samples[j])
+        assert statistics[index] == pytest.approx(expected.statistic, rel=0, abs=1e-12)
+        assert p_values[index] == pytest.approx(expected.pvalue, rel=1e-10, abs=1e-14)
+
+
+def test_pairwise_ks_2samp_subset_of_pairs(exact_test):
+    samples = make_samples(0)
+    pairs = [(0, 3), (4, 1)]
+    statistics, p_values = ks_comparison.pairwise_ks_2samp(samples, pairs)
+    for index, (i, j) in enumerate(pairs):
+        expected = ks_2samp(samples[i], samples[j])
+        assert (statistics[index], p_values[index]) == pytest.approx((expected.statistic, expected.pvalue), rel=1e-10, abs=1e-14)
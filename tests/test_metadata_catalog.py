@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+import sys
+import os
+main_folder_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, main_folder_path)
+
+import json
+import pandas as pd
+import pytest
+import path
+from metadata_catalog import MetadataCatalog
+
+
+'''
+Lookups of the metadata catalog are read-only: they never create or write the catalog, and read the csv file of a
+source that is not (or no longer) imported; both ways give the same frames.
+'''
+
+
+@pytest.fixture
+def meta_folder(tmp_path):
+    folder = str(tmp_path) + '/'
+    os.makedirs(folder + path.col_meta_dir)
+    pd.DataFrame({'dataset': ['Toy', 'Other'], 'dataset_description': ['A toy dataset', None], 'url': ['http://toy', None]}) \
+        .to_csv(folder + 'Dataset metadata.csv', index=False)
+    write_col_meta(folder, ['x', '2', 'label'], ['quant', 'quant', 'cate'])
+    return folder
+
+
+def write_col_meta(folder, headers, data_types):
+    pd.DataFrame({'dataset': 'Toy', 'column_header': headers, 'data_type': data_types,
+                  'column_description': [f'Column {header}' for header in headers],
+                  'num_of_rows': 10, 'is_normality': [data_type == 'quant' for data_type in data_types]}) \
+        .to_csv(folder + path.col_meta_dir + 'Toy_col_meta.csv', index=False)
+
+
+def lookups(catalog):
+    return (catalog.get_dataset_columns('Toy'), catalog.get_columns_info('Toy', ['label', 2]),
+            catalog.get_dataset_info('Toy'), catalog.get_dataset_info('Missing'), catalog.get_dataset_columns('Missing'))
+
+
+def assert_same_lookups(first, second):
+    for frame1, frame2 in [(first[0], second[0]), (first[1], second[1]), (first[4], second[4])]:
+        pd.testing.assert_frame_equal(frame1, frame2)
+    assert first[2:4] == second[2:4]
+
+
+def test_lookups_do_not_create_the_catalog(meta_folder):
+    catalog = MetadataCatalog(meta_folder=meta_folder)
+    columns, selected, info, missing_info, _ = lookups(catalog)
+    assert not os.path.exists(catalog.db_path)
+    assert columns['column_header'].tolist() == ['x', '2', 'label']
+    assert selected['column_header'].tolist() == ['2', 'label']
+    assert info == {'dataset': 'Toy', 'dataset_description': 'A toy dataset', 'url': 'http://toy'}
+    assert missing_info is None
+    assert catalog.list_datasets() == []
+
+
+def test_catalog_and_csv_lookups_match(meta_folder):
+    from_csv = lookups(MetadataCatalog(meta_folder=meta_folder))
+    catalog = MetadataCatalog(meta_folder=meta_folder)
+    assert catalog.refresh() == (2, 0)
+    stamp = os.stat(catalog.db_path).st_mtime_ns
+    assert_same_lookups(lookups(catalog), from_csv)
+    assert catalog.list_datasets() == ['Toy']
+    assert os.stat(catalog.db_path).st_mtime_ns == stamp
+
+
+def test_changed_source_is_read_from_csv_until_refresh(meta_folder):
+    catalog = MetadataCatalog(meta_folder=meta_folder)
+    catalog.refresh()
+    write_col_meta(meta_folder, ['x', 'y'], ['quant', 'cate'])
+    os.utime(catalog.col_meta_path('Toy'), ns=(1, 1))  # Same size would otherwise be possible, change the mtime
+    stamp = os.stat(catalog.db_path).st_mtime_ns
+    assert catalog.get_dataset_columns('Toy')['column_header'].tolist() == ['x', 'y']
+    assert os.stat(catalog.db_path).st_mtime_ns == stamp
+    conn = catalog.connect_readonly()
+    assert json.loads(conn.execute('SELECT csv_columns FROM source_files WHERE dataset = ?', ('Toy',)).fetchone()[0])
+    assert [row[0] for row in conn.execute("SELECT column_header FROM column_metadata WHERE dataset = 'Toy' ORDER BY position")] == ['x', '2', 'label']
+    assert catalog.refresh() == (1, 0)
+    assert catalog.get_dataset_columns('Toy')['column_header'].tolist() == ['x', 'y']
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+import sys
+import os
+main_folder_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, main_folder_path)
+
+import numpy as np
+import pytest
+import correlation_matrix
+import pair_sharding
+import variance_statistics
+
+
+'''
+Sharded kernels give the results of the serial run, on one pool of worker processes reused across calls.
+'''
+
+
+@pytest.fixture
+def table():
+    rng = np.random.default_rng(0)
+    X = 10 + rng.normal(size=(300, 20))
+    X[:, ::2] = np.round(X[:, ::2])
+    X[rng.random(300) < 0.05, 3] = np.nan
+    yield X
+    pair_sharding.close_shard_pool()
+
+
+def test_sharded_kernels_match_serial_run_on_one_pool(table):
+    pairs = [(i, j) for i in range(table.shape[1]) for j in range(i + 1, table.shape[1])]
+    serial_tau = correlation_matrix.pairwise_kendall_tau(table)
+    serial_tests = variance_statistics.pairwise_variance_tests(table, pairs)
+    np.testing.assert_array_equal(correlation_matrix.pairwise_kendall_tau(table, workers=2), serial_tau)
+    pool = pair_sharding._pool
+    assert pool is not None
+    sharded_tests = variance_statistics.pairwise_variance_tests(table, pairs, workers=2)
+    assert pair_sharding._pool is pool
+    for key in serial_tests:
+        np.testing.assert_array_equal(sharded_tests[key], serial_tests[key])
+    pair_sharding.close_shard_pool()
+    assert pair_sharding._pool is None
+
+
+def test_shard_pool_is_replaced_for_another_size(table):
+    pool = pair_sharding.shard_pool(2)
+    assert pair_sharding.shard_pool(2) is pool
+    assert pair_sharding.shard_pool(3) is not pool
@@ -6,13 +6,12 @@ import re
 import csv
 import json
 import path
+import metadata_catalog
 import pandas as pd
 import numpy as np
-from scipy.stats import anderson
-from scipy.stats import spearmanr, kendalltau
-from scipy.stats import chi2_contingency
-from sklearn.utils import shuffle
-from sklearn.model_selection import train_test_split
+from collections import OrderedDict
+from contextlib import contextmanager
+# scipy and sklearn are heavy to import, they are imported inside the functions that use them
 
 
 '''
@@ -54,8 +53,12 @@ def is_quantitative(series, threshold=0.2):
 
 '''
 Test the data type of each column of a file: categorical data, quant data, other
+streaming: read the file in chunks and use approximate distinct counts (for files larger than memory), see column_sketch
 '''
-def check_column_types_for_a_file(csv_file):
+def check_column_types_for_a_file(csv_file, streaming=False, chunksize=100000):
+    if streaming:
+        import column_sketch
+        return column_sketch.summarize_csv_columns(csv_file, chunksize=chunksize)['data_type'].tolist()
     df = pd.read_csv(csv_file)
     column_types = []
     for column in df.columns:
@@ -69,20 +72,85 @@ def check_column_types_for_a_file(csv_file):
     return column_types
 
 
+"""
+In-process store of column metadata tables (<dataset>_col_meta.csv under the column metadata folder), in front of the
+metadata catalog (metadata_catalog), which is the single source of metadata: a table is queried from the catalog
+(which re-imports the csv file if it changed) once, and indexed by 'column_header' (as text, as in the csv file).
+A cached table is queried again when the mtime (or size) of its file changes, the same stamp as the catalog uses.
+At most max_datasets tables are kept, and the least recently used one is evicted first.
+Tables returned by the store are shared, so treat them as read-only.
+"""
+class ColumnMetadataStore:
+    def __init__(self, catalog=None, max_datasets=64):
+        self.catalog = catalog if catalog is not None else metadata_catalog.metadata_catalog
+        self.max_datasets = max_datasets
+        # dataset_name -> (file stamp, metadata DataFrame, {column_header: [row positions]})
+        self._cache = OrderedDict()
+
+    def metadata_path(self, dataset_name):
+        return self.catalog.col_meta_path(dataset_name)
+
+    # Load (or reuse) the cached entry of a dataset, raise FileNotFoundError if no metadata file
+    def _get_entry(self, dataset_name):
+        stat = os.stat(self.metadata_path(dataset_name))
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        entry = self._cache.get(dataset_name)
+        if entry is not None and entry[0] == stamp:
+            self._cache.move_to_end(dataset_name)
+            return entry
+        metadata = self.catalog.get_dataset_columns(dataset_name)
+        positions = {}
+        if 'column_header' in metadata.columns:
+            for pos, header in enumerate(metadata['column_header'].tolist()):
+                positions.setdefault(header, []).append(pos)
+        entry = (stamp, metadata, positions)
+        self._cache[dataset_name] = entry
+        self._cache.move_to_end(dataset_name)
+        # Evict least recently used tables
+        while len(self._cache) > self.max_datasets:
+            self._cache.popitem(last=False)
+        return entry
+
+    # Whole column metadata table of a dataset
+    def get_metadata(self, dataset_name) -> pd.DataFrame:
+        return self._get_entry(dataset_name)[1]
+
+    # Metadata rows of one column (an empty DataFrame if the column is not recorded)
+    def lookup(self, dataset_name, column_header) -> pd.DataFrame:
+        _, metadata, positions = self._get_entry(dataset_name)
+        return metadata.iloc[positions.get(str(column_header), [])]
+
+    # Recorded data type of a column, None if not recorded or empty
+    def get_data_type(self, column_name, dataset_name):
+        _, metadata, positions = self._get_entry(dataset_name)
+        rows = positions.get(str(column_name))
+        if rows:
+            data_type = metadata['data_type'].iat[rows[0]]
+            # Check if data_type is not NaN and not empty
+            if pd.notna(data_type) and data_type.strip():
+                return data_type
+        return None
+
+    # Drop a cached dataset (or all of them) so that it is re-read on the next access
+    def invalidate(self, dataset_name=None):
+        if dataset_name is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(dataset_name, None)
+
+
+# Store shared by every stage within a process
+col_meta_store = ColumnMetadataStore()
+
+
 """
 Tries to get the data type of a column from its metadata.
 Returns None if the metadata entry is not found or if the type is empty.
 """
 def get_data_type_from_metadata(column_name, dataset_name):
-    metadata_file = f"{path.meta_dir + path.col_meta_dir}{dataset_name}_col_meta.csv"
+    metadata_file = col_meta_store.metadata_path(dataset_name)
     try:
-        metadata = pd.read_csv(metadata_file)
-        dtype_row = metadata[metadata['column_header'] == column_name]
-        if not dtype_row.empty:
-            data_type = dtype_row['data_type'].values[0]
-            # Check if data_type is not NaN and not empty
-            if pd.notna(data_type) and data_type.strip():
-                return data_type
+        return col_meta_store.get_data_type(column_name, dataset_name)
     except FileNotFoundError:
         print(f"Metadata file {metadata_file} not found.")
     except Exception as e:
@@ -104,7 +172,174 @@ def determine_data_type(series, dataset_name, threshold=0.2):
         return "quant"
     else: # other
         return "other"
-   
+
+
+"""
+Columnar binary copy of a processed dataset: uncompressed Feather (Arrow IPC), so that it can be memory-mapped.
+It is written next to the processed csv by tabular_data_preprocess, and preferred by readers when it is at least as new
+as the csv. pyarrow is optional: without it, readers fall back to the csv.
+"""
+def get_processed_binary_path(dataset_name):
+    return path.processed_dir + path.processed_binary_dir + dataset_name + '.feather'
+
+
+def is_processed_binary_fresh(dataset_name):
+    binary_path = get_processed_binary_path(dataset_name)
+    csv_path = path.processed_dir + dataset_name + '.csv'
+    if not os.path.exists(binary_path):
+        return False
+    return not os.path.exists(csv_path) or os.stat(binary_path).st_mtime_ns >= os.stat(csv_path).st_mtime_ns
+
+
+'''
+Write the columnar binary copy of a processed dataset from its csv
+(the csv is parsed again, so that the binary copy holds exactly what readers of the csv get).
+Return the output path, or None if pyarrow is not installed.
+'''
+def save_processed_binary(dataset_name):
+    try:
+        from pyarrow import feather
+    except ImportError:
+        print(f"[!] pyarrow is not installed, no columnar copy for dataset {dataset_name}")
+        return None
+    df = pd.read_csv(path.processed_dir + dataset_name + '.csv')
+    output_path = get_processed_binary_path(dataset_name)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    feather.write_feather(df, output_path, compression='uncompressed')
+    return output_path
+
+
+'''
+Read a processed dataset, from its columnar binary copy (memory-mapped) if fresh, otherwise from the csv.
+usecols: optional list of column positions to read.
+The result is the same as pd.read_csv of the processed csv.
+'''
+def read_processed_dataset(dataset_name, usecols=None) -> pd.DataFrame:
+    if is_processed_binary_fresh(dataset_name):
+        try:
+            from pyarrow import feather
+        except ImportError:
+            feather = None
+        if feather is not None:
+            df = feather.read_table(get_processed_binary_path(dataset_name), columns=usecols, memory_map=True).to_pandas()
+            # Arrow nulls of string / boolean columns come back as None, read_csv gives NaN
+            # (only the object columns with nulls are reassigned, by position so that duplicated headers are kept)
+            for i in np.flatnonzero((df.dtypes == object).values):
+                column = df.iloc[:, i]
+                nulls = column.isna()
+                if nulls.any():
+                    df.isetitem(i, column.mask(nulls, np.nan))
+            return df
+    return pd.read_csv(path.processed_dir + dataset_name + '.csv', usecols=usecols)
+
+
+'''
+Column headers of a processed dataset (from the columnar binary copy if fresh, otherwise from the csv)
+'''
+def read_processed_headers(dataset_name):
+    if is_processed_binary_fresh(dataset_name):
+        try:
+            import pyarrow
+            from pyarrow import ipc
+            with pyarrow.memory_map(get_processed_binary_path(dataset_name)) as source:
+                return pd.Index(ipc.open_file(source).schema.names)
+        except ImportError:
+            pass
+    return pd.read_csv(path.processed_dir + dataset_name + '.csv', nrows=0).columns
+
+
+"""
+Bounded in-process cache of typed processed datasets (see load_processed_dataset).
+Entries are keyed by dataset name and load options, and reloaded when the processed dataset (csv or columnar copy)
+or its column metadata changes.
+At most max_datasets entries and max_bytes of DataFrame memory are kept, the least recently used entry is evicted first.
+"""
+class ProcessedDatasetCache:
+    def __init__(self, max_datasets=8, max_bytes=1024 * 1024 * 1024):
+        self.max_datasets = max_datasets
+        self.max_bytes = max_bytes
+        # (dataset_name, options) -> (file stamps, DataFrame, memory bytes)
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _stamps(self, dataset_name):
+        stamps = []
+        for file_path in [path.processed_dir + dataset_name + '.csv', get_processed_binary_path(dataset_name),
+                          col_meta_store.metadata_path(dataset_name)]:
+            if os.path.exists(file_path):
+                stat = os.stat(file_path)
+                stamps.append((stat.st_mtime_ns, stat.st_size))
+            else:
+                stamps.append(None)
+        return tuple(stamps)
+
+    def get(self, dataset_name, options, loader):
+        key = (dataset_name, options)
+        stamps = self._stamps(dataset_name)
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] == stamps:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        df = loader()
+        self._cache[key] = (stamps, df, int(df.memory_usage(deep=True).sum()))
+        self._cache.move_to_end(key)
+        # Evict least recently used entries (the one just loaded is always kept)
+        while len(self._cache) > 1 and (len(self._cache) > self.max_datasets or
+                                        sum(item[2] for item in self._cache.values()) > self.max_bytes):
+            self._cache.popitem(last=False)
+        return df
+
+    # Drop cached entries of a dataset (or all of them)
+    def invalidate(self, dataset_name=None):
+        for key in [key for key in self._cache if dataset_name is None or key[0] == dataset_name]:
+            del self._cache[key]
+
+
+# Cache shared by every stage within a process
+processed_dataset_cache = ProcessedDatasetCache()
+
+
+"""
+Load a processed dataset with dtypes from its column metadata:
+- 'cate' columns as pandas category (categorical=True), or as inferred by read_csv (categorical=False);
+- 'quant' columns as inferred by read_csv, downcast to the smallest integer type / float32 if downcast=True (float32 is lossy);
+- 'other' columns are not loaded unless keep_other=True;
+- columns without a recorded type are loaded as inferred by read_csv.
+Column order follows the csv. Results are cached (see ProcessedDatasetCache); the returned DataFrame is a shallow copy
+of the cached one, so adding or replacing columns is safe, but values must not be modified in place.
+The categorical view is derived from the cached non-categorical one, so a dataset is read once whichever views are used.
+"""
+def load_processed_dataset(dataset_name, categorical=True, downcast=False, keep_other=False, use_cache=True) -> pd.DataFrame:
+    def loader():
+        try:
+            metadata = col_meta_store.get_metadata(dataset_name)
+            data_types = dict(zip(metadata['column_header'].astype(str), metadata['data_type']))
+        except FileNotFoundError:
+            data_types = {}
+        if categorical:
+            df = load_processed_dataset(dataset_name, categorical=False, downcast=downcast, keep_other=keep_other, use_cache=use_cache)
+            for col in df.columns:
+                if data_types.get(str(col)) == 'cate':
+                    df[col] = df[col].astype('category')
+            return df
+        headers = read_processed_headers(dataset_name)
+        # Select columns by position, so that duplicated headers are handled as read_csv does
+        positions = [i for i, col in enumerate(headers) if keep_other or data_types.get(str(col)) != 'other']
+        df = read_processed_dataset(dataset_name, usecols=positions)
+        for col in df.columns:
+            if data_types.get(str(col)) == 'quant' and downcast:
+                if pd.api.types.is_integer_dtype(df[col]):
+                    df[col] = pd.to_numeric(df[col], downcast='integer')
+                elif pd.api.types.is_float_dtype(df[col]):
+                    df[col] = pd.to_numeric(df[col], downcast='float')
+        return df
+    if not use_cache:
+        return loader()
+    return processed_dataset_cache.get(dataset_name, (categorical, downcast, keep_other), loader).copy(deep=False)
+
 
 '''
 Check if it is a number (int or float)
@@ -117,33 +352,106 @@ def is_number(s):
         return False
 
 
+'''
+Parse a Series of strings with float() semantics, without calling float() from Python per cell.
+Only strings in plain decimal / scientific notation (the common case) are parsed here;
+ok marks them, other strings (e.g. 'inf', '1_000', non-ASCII digits, invalid text) are left for the caller.
+Return: (float ndarray, bool ndarray ok)
+'''
+_plain_float_pattern = r'^[ \t\n\r\f\v]*[+-]?(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?[ \t\n\r\f\v]*$'
+
+def parse_plain_float_strings(strings: pd.Series):
+    ok = strings.str.match(_plain_float_pattern).fillna(False).to_numpy(dtype=bool)
+    values = np.full(len(strings), np.nan)
+    # astype(float) on str objects applies float() semantics in C
+    values[ok] = strings.to_numpy(dtype=object)[ok].astype(float)
+    return values, ok
+
+
+'''
+Convert a column value by value, like series.apply(convert_cell), in a vectorized way:
+- plain numpy numeric columns are cast to float at once (convert_cell is float() for them);
+- each distinct string is converted only once by convert_strings, which works on a Series of distinct strings with
+  whole-column string operations and returns (object ndarray of results, bool ndarray of strings it could not convert);
+  the strings it could not convert are given to convert_cell;
+- other values (e.g. NaN) are given to convert_cell.
+The result (values and dtype) is identical to series.apply(convert_cell).
+'''
+def convert_column_values(series: pd.Series, convert_strings, convert_cell) -> pd.Series:
+    if series.empty:
+        return series.apply(convert_cell)
+    if isinstance(series.dtype, np.dtype) and series.dtype.kind in 'biuf':
+        return series.astype(float)
+    values = series.to_numpy(dtype=object).copy()
+    is_str = np.array([isinstance(x, str) for x in values], dtype=bool)
+    if is_str.any():
+        codes, uniques = pd.factorize(values[is_str])
+        unique_strings = pd.Series(uniques, dtype=object)
+        unique_results, unconverted = convert_strings(unique_strings)
+        for pos in np.flatnonzero(unconverted):
+            unique_results[pos] = convert_cell(unique_strings.iat[pos])
+        values[is_str] = unique_results[codes]
+    for pos in np.flatnonzero(~is_str):
+        values[pos] = convert_cell(values[pos])
+    # Same dtype inference as Series.apply: float64 if every value is a float, object otherwise
+    return pd.Series(values, index=series.index, name=series.name, dtype=object).infer_objects()
+
+
 '''
 Functions for processing and transforming special quant data
 '''
-def process_special_cont_data(series):
-    def convert_value(x):
-        if isinstance(x, str):
-            if '%' in x:
-                try:
-                    return float(x.replace('%', '')) / 100
-                except ValueError:
-                    return None
-            elif 'M' in x or 'm' in x:
-                try:
-                    return float(x.lower().replace('m', '')) * 1e6
-                except ValueError:
-                    return None
-            elif 'K' in x or 'k' in x:
-                try:
-                    return float(x.lower().replace('k', '')) * 1e3
-                except ValueError:
-                    return None
-        else:
+def convert_special_cont_value(x):
+    if isinstance(x, str):
+        if '%' in x:
             try:
-                return float(x)
-            except (ValueError, TypeError):
+                return float(x.replace('%', '')) / 100
+            except ValueError:
                 return None
-    return series.apply(convert_value)
+        elif 'M' in x or 'm' in x:
+            try:
+                return float(x.lower().replace('m', '')) * 1e6
+            except ValueError:
+                return None
+        elif 'K' in x or 'k' in x:
+            try:
+                return float(x.lower().replace('k', '')) * 1e3
+            except ValueError:
+                return None
+    else:
+        try:
+            return float(x)
+        except (ValueError, TypeError):
+            return None
+
+
+# convert_special_cont_value over a Series of distinct strings, see convert_column_values
+def convert_special_cont_strings(strings: pd.Series):
+    results = np.full(len(strings), None, dtype=object)
+    unconverted = np.zeros(len(strings), dtype=bool)
+    has_pct = strings.str.contains('%', regex=False).to_numpy(dtype=bool)
+    has_m = ~has_pct & strings.str.contains('[Mm]', regex=True).to_numpy(dtype=bool)
+    has_k = ~(has_pct | has_m) & strings.str.contains('[Kk]', regex=True).to_numpy(dtype=bool)
+    # Strings without any of the markers are converted to None
+    for mask, cleaned, scale in [
+        (has_pct, strings[has_pct].str.replace('%', '', regex=False), None),
+        (has_m, strings[has_m].str.lower().str.replace('m', '', regex=False), 1e6),
+        (has_k, strings[has_k].str.lower().str.replace('k', '', regex=False), 1e3)
+    ]:
+        if not mask.any():
+            continue
+        number, ok = parse_plain_float_strings(cleaned)
+        number = number / 100 if scale is None else number * scale
+        pos = np.flatnonzero(mask)
+        results[pos[ok]] = number[ok].tolist()
+        unconverted[pos[~ok]] = True
+    return results, unconverted
+
+
+'''
+Vectorized convert_special_cont_value over a whole column, identical to series.apply(convert_special_cont_value)
+'''
+def process_special_cont_data(series):
+    return convert_column_values(series, convert_special_cont_strings, convert_special_cont_value)
 
 
 '''
@@ -165,6 +473,63 @@ def random_select_mini_dataset(input_file, n, output_file):
     result.to_csv(output_file, index=False)
 
 
+'''
+Write rows of extracted information (list of tuples) to an output csv of the extracted information folder.
+Duplicated rows are removed; rows are appended if the file already has content, otherwise the file is written with a header.
+While writes are deferred (see collect_extracted_info), the rows are recorded instead of written.
+'''
+def save_extracted_info(info_list, columns, output_name):
+    new_data = pd.DataFrame(info_list, columns=columns)
+    new_data = new_data.drop_duplicates()  # Remove potential duplicates
+    if _extracted_info_collector is not None:
+        _extracted_info_collector.append((output_name, new_data))
+        return
+    write_extracted_info(new_data, output_name)
+
+
+'''
+Write a frame of extracted information to its output csv (append if the file has content, else with a header)
+'''
+def write_extracted_info(new_data, output_name):
+    output_path = path.info_dir + output_name + ".csv"
+    # Check if output file exists and write the new data into it
+    if os.path.isfile(output_path) and os.path.getsize(output_path) > 0:
+        # Append new info to existing file
+        new_data.to_csv(output_path, mode='a', header=False, index=False)
+    else:
+        # Write to a new file if it doesn't exist
+        new_data.to_csv(output_path, mode='w', header=True, index=False)
+
+
+# List of (output_name, frame) recording the deferred writes, None when writes are not deferred
+_extracted_info_collector = None
+
+
+'''
+Defer the writes of extracted information within a with block: save_extracted_info records (output_name, frame)
+in the yielded list instead of writing, so that a single writer can write them later (write_extracted_info) in a
+chosen order, e.g. the workers of a parallel extraction hand their frames to the parent process.
+'''
+@contextmanager
+def collect_extracted_info():
+    global _extracted_info_collector
+    previous_collector = _extracted_info_collector
+    _extracted_info_collector = []
+    try:
+        yield _extracted_info_collector
+    finally:
+        _extracted_info_collector = previous_collector
+
+
+'''
+Write the rows of every outcome of a single extraction pass, each to its own output csv (see save_extracted_info).
+info_lists[flag] holds the rows of output_names[flag].
+'''
+def save_extracted_info_by_outcome(info_lists, columns, output_names):
+    for info_list, output_name in zip(info_lists, output_names):
+        save_extracted_info(info_list, columns, output_name)
+
+
 """
 Thinen a CSV file by keeping every nth row, starting from the second row (excluding the header).
 Aim: reduce overly large file to keep the final dataset more balanced.
@@ -204,6 +569,7 @@ Aiming to facilitate test procedures
 Same dataset rows should be together but same methods or task types gethering together should be avoided.
 '''
 def reorganize_shuffle_dataset(input_dir, file_name):
+    from sklearn.utils import shuffle
     try:
         input_file_path = input_dir + file_name + '.csv'
         # Load dataset from the input file
@@ -233,6 +599,7 @@ def reorganize_shuffle_dataset(input_dir, file_name):
 Perform Anderson-Darling test for normality.
 '''
 def is_normality_ad(sample, alpha=0.05):
+    from scipy.stats import anderson
     result = anderson(sample)
     significance_levels = result.significance_level
     critical_values = result.critical_values
@@ -243,6 +610,98 @@ def is_normality_ad(sample, alpha=0.05):
     return False  # If no significance level is found, return false
 
 
+'''
+Fingerprint of the values of a sample (order and missing values included, index and name ignored)
+'''
+def fingerprint_values(sample):
+    import hashlib
+    hashes = pd.util.hash_pandas_object(pd.Series(sample), index=False).values
+    return f"{len(hashes)}-{hashlib.blake2b(hashes.tobytes(), digest_size=16).hexdigest()}"
+
+
+"""
+Cache of Anderson-Darling normality results (is_normality_ad), keyed by (dataset, column, data fingerprint, alpha).
+A column sample is tested once: preprocessing, the column profile and the extractors share the results.
+Results are kept in process and persisted in the metadata folder by save(), which merges them with the results already
+saved by other processes. hits / misses count the lookups of this process.
+"""
+class NormalityCache:
+    def __init__(self, cache_path=None):
+        self.cache_path = cache_path if cache_path is not None else path.meta_dir + path.normality_cache_file
+        # (dataset, column_header, fingerprint, alpha) -> bool, loaded from the cache file on first use
+        self._results = None
+        self._new_results = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _read(cache_path):
+        if not os.path.exists(cache_path) or os.path.getsize(cache_path) == 0:
+            return {}
+        saved = pd.read_csv(cache_path, converters={'dataset': str, 'column_header': str, 'fingerprint': str})
+        return {(row.dataset, row.column_header, row.fingerprint, float(row.alpha)): bool(row.is_normality)
+                for row in saved.itertuples(index=False)}
+
+    def is_normality(self, sample, dataset_name, column_name, alpha=0.05):
+        if self._results is None:
+            self._results = self._read(self.cache_path)
+        key = (str(dataset_name), str(column_name), fingerprint_values(sample), float(alpha))
+        if key in self._results:
+            self.hits += 1
+            return self._results[key]
+        self.misses += 1
+        result = bool(is_normality_ad(sample, alpha))
+        self._results[key] = result
+        self._new_results[key] = result
+        return result
+
+    # Persist the results of this process (merged with the saved ones, written to a temporary file then renamed)
+    def save(self):
+        if not self._new_results:
+            return
+        results = self._read(self.cache_path)
+        results.update(self._new_results)
+        saved = pd.DataFrame([key + (value,) for key, value in results.items()],
+                             columns=['dataset', 'column_header', 'fingerprint', 'alpha', 'is_normality'])
+        os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+        temp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        saved.to_csv(temp_path, index=False)
+        os.replace(temp_path, self.cache_path)
+        self._new_results = {}
+
+    # Hand over the results and lookup counts of this process since the last call (e.g. from a worker process),
+    # to be merged into another process' cache with merge_updates
+    def pop_updates(self):
+        updates = (self._new_results, self.hits, self.misses)
+        self._new_results = {}
+        self.hits = 0
+        self.misses = 0
+        return updates
+
+    def merge_updates(self, updates):
+        new_results, hits, misses = updates
+        if self._results is None:
+            self._results = self._read(self.cache_path)
+        self._results.update(new_results)
+        self._new_results.update(new_results)
+        self.hits += hits
+        self.misses += misses
+
+    def report(self):
+        return f"[i] Normality cache: {self.hits} hit(s), {self.misses} miss(es)."
+
+
+# Cache shared by every stage within a process
+normality_cache = NormalityCache()
+
+
+'''
+Anderson-Darling normality test of a column sample, through the normality cache
+'''
+def is_normality_ad_cached(sample, dataset_name, column_name, alpha=0.05):
+    return normality_cache.is_normality(sample, dataset_name, column_name, alpha)
+
+
 '''
 New extraction function:
 Extracts and returns the first JSON object found within the first pair of braces in the input string.
@@ -308,27 +767,23 @@ Return:
 - A DataFrame containing the metadata of the dataset.
 """
 def get_metadata(dataset_name):
-    # Construct the path to the metadata file based on the dataset name
-    metadata_file_path = f'Data/Metadata/Column Metadata/{dataset_name}_col_meta.csv'
-    # Load and return the metadata file
-    metadata_df = pd.read_csv(metadata_file_path)
+    # Metadata is loaded through the shared store, copy it so that callers are free to modify it
+    metadata_df = col_meta_store.get_metadata(dataset_name).copy()
     return metadata_df
 
 
 """
-Given metadata and a JSON string of relevant columns, returns the information for these columns from the metadata.
+Given a dataset and a JSON string of relevant columns, returns the information for these columns from the metadata.
 Parameters: 
-- metadata_df: A DataFrame containing the metadata of a dataset.
+- dataset_name: Name of the dataset.
 - relevant_columns_json: A JSON string representing the list of relevant columns and their properties.
 Return:
-- A DataFrame containing the metadata information for the relevant columns.
+- A DataFrame containing the metadata information for the relevant columns (indexed lookup in the metadata catalog).
 """
-def get_relevant_columns_info(metadata_df, relevant_columns_json):
+def get_relevant_columns_info(dataset_name, relevant_columns_json):
     # Parse the JSON string to extract column headers
     relevant_columns_list = [item['column_header'] for item in json.loads(relevant_columns_json)]
-    # Filter the metadata to only include rows with column headers that match the relevant columns
-    relevant_info_df = metadata_df[metadata_df['column_header'].isin(relevant_columns_list)]
-    return relevant_info_df
+    return metadata_catalog.metadata_catalog.get_columns_info(dataset_name, relevant_columns_list)
 
 
 '''
@@ -339,6 +794,7 @@ def split_benchmark(dataset_name: str, test_ratio: float=0.1):
     # Make sure that the ratio parameter is valid
     if not 0 <= test_ratio <= 1:
         raise ValueError("[!] Test set ratio must be between 0 and 1.") 
+    from sklearn.model_selection import train_test_split
     df = pd.read_csv(path.integ_dataset_path + path.balance_path +  dataset_name + '.csv')
     # Randomly divide the dataset
     train_df, test_df = train_test_split(df, test_size=test_ratio)
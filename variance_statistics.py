@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+from scipy import special
+from scipy.stats import distributions
+import pair_sharding
+
+
+'''
+Two-sample variance tests (Bartlett, Levene, one-way F and Mood) from per-sample sufficient statistics.
+Bartlett, Levene (centered on the median) and the F-test only need, per sample, its size, mean, variance and the
+absolute deviations from its median (their mean and sum of squared deviations); those are computed once per sample
+(sample_statistics) and a pair costs O(1) for these three tests. Mood's test only needs the ranks of the two samples
+in the pooled sample, obtained by merging the two presorted samples.
+Bartlett, Levene and Mood use the same operations as scipy.stats.bartlett, levene and mood, so their results are the
+same; the F statistic comes from the group means and variances instead of the pooled sums of squares of
+scipy.stats.f_oneway, which only differs by floating-point rounding.
+'''
+
+
+'''
+Sufficient statistics of a sample (1-D float array without missing values):
+size, mean, variance (ddof=1), population standard deviation, median, mean absolute deviation from the median,
+sum of squared deviations of the absolute deviations from their mean, and the sorted sample.
+'''
+def sample_statistics(sample: np.ndarray) -> dict:
+    sample = np.asarray(sample, dtype=np.float64)
+    median = np.median(sample, axis=0)
+    deviations = abs(sample - median)
+    mean_deviation = np.mean(deviations, axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return {
+            'n': len(sample),
+            'mean': np.mean(sample),
+            'var': np.var(sample, ddof=1),
+            'std': np.std(sample),
+            'median': median,
+            'mean_deviation': mean_deviation,
+            'deviation_ss': np.sum((deviations - mean_deviation) ** 2, axis=0),
+            'sorted': np.sort(sample),
+        }
+
+
+'''
+Bartlett's test of two samples from their statistics, as scipy.stats.bartlett. Return (statistic, p-value).
+'''
+def bartlett_test(stats1: dict, stats2: dict):
+    k = 2
+    Ni = np.array([stats1['n'], stats2['n']], dtype=np.float64)
+    ssq = np.array([stats1['var'], stats2['var']], dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        Ntot = np.sum(Ni, axis=0)
+        spsq = np.sum((Ni - 1) * ssq, axis=0) / (1.0 * (Ntot - k))
+        numer = (Ntot * 1.0 - k) * np.log(spsq) - np.sum((Ni - 1.0) * np.log(ssq), axis=0)
+        denom = 1.0 + 1.0 / (3 * (k - 1)) * ((np.sum(1.0 / (Ni - 1.0), axis=0)) - 1.0 / (Ntot - k))
+        T = numer / denom
+    return T, distributions.chi2.sf(T, k - 1)
+
+
+'''
+Levene's test (center='median') of two samples from their statistics, as scipy.stats.levene. Return (statistic, p-value).
+'''
+def levene_test(stats1: dict, stats2: dict):
+    k = 2
+    Ni = np.array([stats1['n'], stats2['n']], dtype=np.float64)
+    Zbari = np.array([stats1['mean_deviation'], stats2['mean_deviation']], dtype=np.float64)
+    Ntot = np.sum(Ni, axis=0)
+    Zbar = 0.0
+    for i in range(k):
+        Zbar += Zbari[i] * Ni[i]
+    Zbar /= Ntot
+    numer = (Ntot - k) * np.sum(Ni * (Zbari - Zbar) ** 2, axis=0)
+    dvar = 0.0
+    for deviation_ss in (stats1['deviation_ss'], stats2['deviation_ss']):
+        dvar += deviation_ss
+    denom = (k - 1.0) * dvar
+    with np.errstate(divide='ignore', invalid='ignore'):
+        W = numer / denom
+    return W, distributions.f.sf(W, k - 1, Ntot - k)
+
+
+'''
+One-way F-test of two samples from their sizes, means and variances:
+F = between-group mean square / within-group mean square. Return (statistic, p-value).
+'''
+def f_oneway_test(stats1: dict, stats2: dict):
+    n1, n2 = stats1['n'], stats2['n']
+    bign = n1 + n2
+    grand_mean = (n1 * stats1['mean'] + n2 * stats2['mean']) / bign
+    ssbn = n1 * (stats1['mean'] - grand_mean) ** 2 + n2 * (stats2['mean'] - grand_mean) ** 2
+    sswn = (n1 - 1) * stats1['var'] + (n2 - 1) * stats2['var']
+    dfbn, dfwn = 1, bign - 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        f = np.float64(ssbn / dfbn) / np.float64(sswn / dfwn)
+    return f, special.fdtrc(dfbn, dfwn, f)
+
+
+'''
+Mood's test of two samples from their sorted values, as scipy.stats.mood (two-sided). Return (statistic, p-value).
+The pooled sample is the stable merge of the two sorted samples; its runs of equal values give the pooled ranks
+without ties, or the counts t_j (pooled) and a_j (first sample) of the tie-corrected statistic.
+'''
+def mood_test(sorted1: np.ndarray, sorted2: np.ndarray):
+    n, m = len(sorted1), len(sorted2)
+    N = m + n
+    if N < 3:
+        raise ValueError("Not enough observations.")
+    pooled = np.concatenate([sorted1, sorted2])
+    order = np.argsort(pooled, kind='stable')
+    sorted_xy = pooled[order]
+    from_first = order < n
+    diffs = np.diff(sorted_xy)
+    if 0 in diffs:
+        # Classes of equal values: t (pooled counts), a (counts of the first sample), S (cumulative pooled counts)
+        starts = np.flatnonzero(np.concatenate(([1], diffs)) != 0)
+        t = np.diff(np.append(starts, N))
+        a = np.add.reduceat(from_first.astype(int), starts)
+        psi = (np.arange(1, N + 1) - (N + 1) / 2) ** 2
+        phis = np.add.reduceat(psi, starts) / t
+        T = np.cumsum(phis * a)[-1]
+        t = np.concatenate(([0], t))
+        S = np.cumsum(t)
+        S_i_m1 = np.concatenate(([0], S[:-1]))
+        E_0_T = n * (N * N - 1) / 12
+        varM = (m * n * (N + 1.0) * (N ** 2 - 4) / 180 -
+                m * n / (180 * N * (N - 1)) * np.sum(
+                    t * (t ** 2 - 1) * (t ** 2 - 4 + (15 * (N - S - S_i_m1) ** 2))
+                ))
+        z = (T - E_0_T) / np.sqrt(varM)
+    else:
+        Ri = np.flatnonzero(from_first) + 1.0
+        M = np.sum((Ri - (N + 1.0) / 2) ** 2, axis=0)
+        mnM = n * (N * N - 1.0) / 12
+        varM = m * n * (N + 1.0) * (N + 2) * (N - 2) / 180
+        z = (M - mnM) / np.sqrt(varM)
+    return z, 2 * distributions.norm.sf(np.abs(z))
+
+
+'''
+Variance tests of the given pairs (i, j) of the columns of a float matrix X (NaN for missing values), each pair on
+the rows where both columns are present. A column keeps the statistics of its non-missing values (computed once) if
+the other column is present wherever it is, else they are computed on the rows of the pair.
+A pair is not tested if a column has a value <= 0 or infinite on the rows of the pair, or a null standard deviation.
+With workers > 1, the pairs are sharded over worker processes (pair_sharding).
+Return a dict of arrays aligned with pairs:
+- 'tested': whether the pair is tested;
+- 'sizes' (p x 2): number of rows of the pair; 'cached' (p x 2): whether each column kept its own statistics;
+- 'results' (p x 4 x 2): (statistic, p-value) of Mood, Levene, Bartlett and the F-test, in this order.
+'''
+def pairwise_variance_tests(X: np.ndarray, pairs: list, workers: int = 1) -> dict:
+    X = np.asarray(X, dtype=np.float64)
+    pair_array = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+    blocks = pair_sharding.map_shards(_variance_tests_of_pairs, {'X': X}, pair_array, workers)
+    return {key: np.concatenate([block[key] for block in blocks]) for key in ('tested', 'sizes', 'cached', 'results')}
+
+
+def _variance_tests_of_pairs(arrays: dict, pairs: np.ndarray) -> dict:
+    X = arrays['X']
+    present = ~np.isnan(X)
+    column_stats = {}
+    column_positive = {}  # Every non-missing value of the column is finite and > 0
+    tested = np.zeros(len(pairs), dtype=bool)
+    sizes = np.zeros((len(pairs), 2), dtype=np.int64)
+    cached = np.zeros((len(pairs), 2), dtype=bool)
+    results = np.full((len(pairs), 4, 2), np.nan)
+    for index, (i, j) in enumerate(pairs):
+        pair_rows = present[:, i] & present[:, j]
+        samples, stats = [], []
+        for position, col in enumerate((i, j)):
+            if col not in column_stats:
+                values = X[present[:, col], col]
+                column_stats[col] = sample_statistics(values)
+                column_positive[col] = bool(((values > 0) & np.isfinite(values)).all())
+            cached[index, position] = not (present[:, col] & ~pair_rows).any()
+            samples.append(X[pair_rows, col])
+            stats.append(column_stats[col] if cached[index, position] else sample_statistics(samples[-1]))
+        sizes[index] = len(samples[0]), len(samples[1])
+
+        # Variance test is meaningless if variance=0. Prevent a division error of zero.
+        if not (column_positive[i] and column_positive[j]):
+            if any((sample <= 0).any() or np.isinf(sample).any() for sample in samples):
+                continue
+        if stats[0]['std'] == 0 or stats[1]['std'] == 0:
+            continue
+        tested[index] = True
+        results[index] = [mood_test(stats[0]['sorted'], stats[1]['sorted']), levene_test(stats[0], stats[1]),
+                          bartlett_test(stats[0], stats[1]), f_oneway_test(stats[0], stats[1])]
+    return {'tested': tested, 'sizes': sizes, 'cached': cached, 'results': results}